@@ -0,0 +1,43 @@
+"""add_problem_engagement_counters
+
+Revision ID: 3f9a2c7d1e84
+Revises: 727faa180945
+Create Date: 2025-10-20 10:12:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a2c7d1e84'
+down_revision: Union[str, Sequence[str], None] = '727faa180945'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('problems', sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('problems', sa.Column('like_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('problems', sa.Column('dislike_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('problems', sa.Column('bookmark_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill counters from the existing comments, votes and bookmarks
+    op.execute("""
+        UPDATE problems SET
+            comment_count = (SELECT COUNT(*) FROM comments WHERE comments.problem_id = problems.id),
+            like_count = (SELECT COUNT(*) FROM votes WHERE votes.problem_id = problems.id AND votes.vote_type = 'like'),
+            dislike_count = (SELECT COUNT(*) FROM votes WHERE votes.problem_id = problems.id AND votes.vote_type = 'dislike'),
+            bookmark_count = (SELECT COUNT(*) FROM bookmarks WHERE bookmarks.problem_id = problems.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('problems', 'bookmark_count')
+    op.drop_column('problems', 'dislike_count')
+    op.drop_column('problems', 'like_count')
+    op.drop_column('problems', 'comment_count')
@@ -0,0 +1,60 @@
+"""add_foreign_key_and_filter_indexes
+
+Revision ID: 5b7e13c9a4d6
+Revises: d2e6b94f0c17
+Create Date: 2025-10-21 16:05:37.281940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e13c9a4d6'
+down_revision: Union[str, Sequence[str], None] = 'd2e6b94f0c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # Feed, forum problem lists and keyset pagination (forum_id IS NULL / = ?, ORDER BY created_at, id)
+    ('ix_problems_forum_id_created_at', 'problems', ['forum_id', 'created_at', 'id']),
+    # Profile problem lists
+    ('ix_problems_author_id_created_at', 'problems', ['author_id', 'created_at']),
+    # Comment threads, replies and profile comment lists
+    ('ix_comments_problem_id_created_at', 'comments', ['problem_id', 'created_at']),
+    ('ix_comments_parent_comment_id_created_at', 'comments', ['parent_comment_id', 'created_at']),
+    ('ix_comments_author_id_created_at', 'comments', ['author_id', 'created_at']),
+    # Vote counts per problem and type (user lookups use uix_user_problem)
+    ('ix_votes_problem_id_vote_type', 'votes', ['problem_id', 'vote_type']),
+    # Bookmark lists per user and counts per problem
+    ('ix_bookmarks_user_id_created_at', 'bookmarks', ['user_id', 'created_at']),
+    ('ix_bookmarks_problem_id', 'bookmarks', ['problem_id']),
+    # Follower lookups (following lookups use uix_follower_following)
+    ('ix_follows_following_id', 'follows', ['following_id']),
+    # Notification lists and unread counts
+    ('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at']),
+    # "My forums" (forum lookups use unique_forum_membership)
+    ('ix_forum_memberships_user_id', 'forum_memberships', ['user_id']),
+    # Forum chat history and keyset pagination
+    ('ix_forum_messages_forum_id_created_at', 'forum_messages', ['forum_id', 'created_at', 'id']),
+    # Reply threads
+    ('ix_forum_replies_parent_message_id_created_at', 'forum_replies', ['parent_message_id', 'created_at']),
+    # Admin user list and action log pagination
+    ('ix_users_created_at', 'users', ['created_at', 'id']),
+    ('ix_admin_actions_created_at', 'admin_actions', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,37 @@
+"""add_forum_message_reply_count
+
+Revision ID: 7a1f3e9b6c42
+Revises: e4b8c2a7d913
+Create Date: 2025-10-23 09:41:15.872304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1f3e9b6c42'
+down_revision: Union[str, Sequence[str], None] = 'e4b8c2a7d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('forum_messages', sa.Column('reply_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing non-deleted replies
+    op.execute("""
+        UPDATE forum_messages SET
+            reply_count = (
+                SELECT COUNT(*) FROM forum_replies
+                WHERE forum_replies.parent_message_id = forum_messages.id AND forum_replies.is_deleted = false
+            )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('forum_messages', 'reply_count')
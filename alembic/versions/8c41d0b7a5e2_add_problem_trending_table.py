@@ -0,0 +1,38 @@
+"""add_problem_trending_table
+
+Revision ID: 8c41d0b7a5e2
+Revises: 3f9a2c7d1e84
+Create Date: 2025-10-20 15:31:09.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d0b7a5e2'
+down_revision: Union[str, Sequence[str], None] = '3f9a2c7d1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are populated by the trending rebuild that runs on application startup
+    op.create_table('problem_trending',
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('engagement_score', sa.Float(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('problem_id')
+    )
+    op.create_index('ix_problem_trending_score', 'problem_trending', ['score', 'problem_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_problem_trending_score', table_name='problem_trending')
+    op.drop_table('problem_trending')
@@ -0,0 +1,35 @@
+"""add_settings_version_table
+
+Revision ID: a9d3f61c2b58
+Revises: 5b7e13c9a4d6
+Create Date: 2025-10-22 10:14:09.553217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f61c2b58'
+down_revision: Union[str, Sequence[str], None] = '5b7e13c9a4d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    settings_version = op.create_table('settings_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Settings services read and bump the single row with id 1
+    op.bulk_insert(settings_version, [{'id': 1, 'version': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('settings_version')
@@ -0,0 +1,36 @@
+"""add_email_campaign_progress
+
+Revision ID: c3d85a1e7f20
+Revises: b6c0e2f8d4a1
+Create Date: 2025-10-24 16:27:05.310462
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d85a1e7f20'
+down_revision: Union[str, Sequence[str], None] = 'b6c0e2f8d4a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('email_campaigns', sa.Column('sent_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('email_campaigns', sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('email_campaigns', sa.Column('last_user_id', sa.Integer(), nullable=True))
+    op.add_column('email_campaigns', sa.Column('started_at', sa.DateTime(), nullable=True))
+    op.add_column('email_campaigns', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('email_campaigns', 'heartbeat_at')
+    op.drop_column('email_campaigns', 'started_at')
+    op.drop_column('email_campaigns', 'last_user_id')
+    op.drop_column('email_campaigns', 'failed_count')
+    op.drop_column('email_campaigns', 'sent_count')
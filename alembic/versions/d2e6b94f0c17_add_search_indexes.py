@@ -0,0 +1,53 @@
+"""add_search_indexes
+
+Revision ID: d2e6b94f0c17
+Revises: 8c41d0b7a5e2
+Create Date: 2025-10-21 09:48:22.406913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e6b94f0c17'
+down_revision: Union[str, Sequence[str], None] = '8c41d0b7a5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match search_service.search_document for PROBLEM_SEARCH_FIELDS / FORUM_SEARCH_FIELDS
+PROBLEM_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')"
+)
+FORUM_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Full-text and trigram indexes are Postgres features; other databases use the ILIKE fallback
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Expression indexes are kept current by Postgres itself, no trigger or extra column needed
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_problems_search ON problems USING GIN (({PROBLEM_SEARCH_DOCUMENT}))")
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_forums_search ON forums USING GIN (({FORUM_SEARCH_DOCUMENT}))")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_username_trgm ON users USING GIN (username gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_users_username_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_forums_search")
+    op.execute("DROP INDEX IF EXISTS ix_problems_search")
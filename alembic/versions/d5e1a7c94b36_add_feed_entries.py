@@ -0,0 +1,54 @@
+"""add_feed_entries
+
+Revision ID: d5e1a7c94b36
+Revises: c3d85a1e7f20
+Create Date: 2025-10-27 15:41:09.274318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e1a7c94b36'
+down_revision: Union[str, Sequence[str], None] = 'c3d85a1e7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feed_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'problem_id', name='uix_feed_entry_user_problem')
+    )
+    op.create_index(op.f('ix_feed_entries_id'), 'feed_entries', ['id'], unique=False)
+    op.create_index('ix_feed_entries_user_id_created_at', 'feed_entries', ['user_id', 'created_at', 'problem_id'], unique=False)
+    op.create_index('ix_feed_entries_user_id_author_id', 'feed_entries', ['user_id', 'author_id'], unique=False)
+
+    # Build timelines for existing follows; the periodic trim caps their length afterwards
+    op.execute("""
+        INSERT INTO feed_entries (user_id, problem_id, author_id, created_at)
+        SELECT follows.follower_id, problems.id, problems.author_id, COALESCE(problems.created_at, CURRENT_TIMESTAMP)
+        FROM follows
+        JOIN problems ON problems.author_id = follows.following_id
+        WHERE problems.forum_id IS NULL AND follows.follower_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_feed_entries_user_id_author_id', table_name='feed_entries')
+    op.drop_index('ix_feed_entries_user_id_created_at', table_name='feed_entries')
+    op.drop_index(op.f('ix_feed_entries_id'), table_name='feed_entries')
+    op.drop_table('feed_entries')
@@ -0,0 +1,41 @@
+"""add_forum_message_changes
+
+Revision ID: e4b8c2a7d913
+Revises: a9d3f61c2b58
+Create Date: 2025-10-22 15:32:48.106724
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8c2a7d913'
+down_revision: Union[str, Sequence[str], None] = 'a9d3f61c2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('forum_message_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('forum_id', sa.Integer(), nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=False),
+    sa.Column('change_type', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['forum_id'], ['forums.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_forum_message_changes_forum_id_id', 'forum_message_changes', ['forum_id', 'id'], unique=False)
+    # Newest message per forum and after_id/before_id scans
+    op.create_index('ix_forum_messages_forum_id_id', 'forum_messages', ['forum_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_forum_messages_forum_id_id', table_name='forum_messages')
+    op.drop_index('ix_forum_message_changes_forum_id_id', table_name='forum_message_changes')
+    op.drop_table('forum_message_changes')
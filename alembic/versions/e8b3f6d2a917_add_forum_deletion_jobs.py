@@ -0,0 +1,55 @@
+"""add_forum_deletion_jobs
+
+Revision ID: e8b3f6d2a917
+Revises: d5e1a7c94b36
+Create Date: 2025-10-28 10:12:47.581903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3f6d2a917'
+down_revision: Union[str, Sequence[str], None] = 'd5e1a7c94b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('forum_deletion_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('forum_id', sa.Integer(), nullable=False),
+    sa.Column('forum_title', sa.String(), nullable=False),
+    sa.Column('requested_by', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), server_default='running', nullable=False),
+    sa.Column('stage', sa.String(), nullable=True),
+    sa.Column('drafts_created', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rows_deleted', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_forum_deletion_jobs_id'), 'forum_deletion_jobs', ['id'], unique=False)
+    op.create_index('ix_forum_deletion_jobs_forum_id_status', 'forum_deletion_jobs', ['forum_id', 'status'], unique=False)
+    # Lookups made by the chunked deletes
+    op.create_index('ix_forum_replies_forum_id', 'forum_replies', ['forum_id'], unique=False)
+    op.create_index('ix_forum_messages_problem_id', 'forum_messages', ['problem_id'], unique=False)
+    op.create_index('ix_problem_images_problem_id', 'problem_images', ['problem_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_problem_images_problem_id', table_name='problem_images')
+    op.drop_index('ix_forum_messages_problem_id', table_name='forum_messages')
+    op.drop_index('ix_forum_replies_forum_id', table_name='forum_replies')
+    op.drop_index('ix_forum_deletion_jobs_forum_id_status', table_name='forum_deletion_jobs')
+    op.drop_index(op.f('ix_forum_deletion_jobs_id'), table_name='forum_deletion_jobs')
+    op.drop_table('forum_deletion_jobs')
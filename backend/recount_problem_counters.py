@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Script to recompute the denormalized comment/like/dislike/bookmark counters on problems
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "venv"))
+
+from database import get_db
+from problem_service import recount_problem_counters
+
+def recount(problem_ids=None):
+    """Recount counters for all problems, or only the given problem ids"""
+    db = next(get_db())
+
+    try:
+        updated = recount_problem_counters(db, problem_ids)
+        db.commit()
+        print(f"Recounted engagement counters for {updated} problems")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python recount_problem_counters.py [problem_id ...]
+    ids = [int(arg) for arg in sys.argv[1:]] or None
+    recount(ids)
@@ -0,0 +1,94 @@
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session, make_transient_to_detached
+import jwt
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from database import get_db
+from models import User
+from auth.utils import SECRET_KEY
+from cache_service import cache_service
+from settings_service import get_settings_service
+
+security = HTTPBearer()
+
+# Authenticated requests are checked against a short-lived principal cache instead of
+# the users table. Writes that change these fields call invalidate_principal; other
+# worker processes see bans and deactivations once their entry expires.
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_FIELDS = ("id", "username", "role", "is_active", "is_banned", "ban_reason", "is_verified", "last_login")
+
+def _principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+def load_principal(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+    """Read the fields needed to authenticate a user and cache them"""
+    row = db.query(*[getattr(User, field) for field in PRINCIPAL_FIELDS]).filter(User.id == user_id).first()
+    if not row:
+        cache_service.delete(_principal_key(user_id))
+        return None
+    principal = dict(zip(PRINCIPAL_FIELDS, row))
+    cache_service.set(_principal_key(user_id), principal, ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS)
+    return principal
+
+def invalidate_principal(user_id: int):
+    """Drop a cached principal after its ban, active, role, verification or login state changes"""
+    cache_service.delete(_principal_key(user_id))
+
+def _principal_error(principal: Optional[Dict[str, Any]]) -> Optional[HTTPException]:
+    if not principal:
+        return HTTPException(status_code=401, detail="User not found")
+    if not principal["is_active"]:
+        return HTTPException(status_code=403, detail="Account has been deactivated")
+    if principal["is_banned"]:
+        return HTTPException(status_code=403, detail=f"Account has been banned. Reason: {principal['ban_reason'] or 'No reason provided'}")
+
+    # Check if session has expired
+    session_timeout_hours = get_settings_service().get_int('session_timeout_hours', 24)
+    if principal["last_login"] is not None:
+        session_expiry = principal["last_login"] + timedelta(hours=session_timeout_hours)
+        if datetime.utcnow() > session_expiry:
+            return HTTPException(status_code=401, detail="Session expired. Please login again.")
+    return None
+
+def authenticate_token(token: str, db: Session) -> User:
+    """Resolve a bearer token to the current user (shared by HTTP and WebSocket endpoints)"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        user_id = payload.get("user_id")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid token payload")
+
+        # Never reject on cached state alone, another process may have unbanned or logged the user in
+        principal = cache_service.get(_principal_key(user_id))
+        if principal is None or _principal_error(principal):
+            principal = load_principal(db, user_id)
+        error = _principal_error(principal)
+        if error:
+            raise error
+
+        # Attach a User holding only the principal fields without querying; any other
+        # column is loaded from the database the first time a handler reads it
+        user = User(**principal)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security),
+                     db: Session = Depends(get_db)):
+    return authenticate_token(credentials.credentials, db)
+
+def get_verified_user(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """Get current user and ensure they are verified"""
+    if not current_user.is_verified:
+        raise HTTPException(
+            status_code=403,
+            detail="Email not verified. Please verify your email to access your account."
+        )
+    return current_user
@@ -0,0 +1,4404 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+from sqlalchemy import func, or_, and_
+from database import get_db
+from models import User, Problem, Comment, Vote, Bookmark, Follow, ProblemImage, Notification, NotificationPreferences, Forum, ForumMembership, ForumMessage, ForumMessageChange, ForumInvitation, ForumJoinRequest, ForumDeletionJob, Draft, ForumReply, SiteReport
+from auth.utils import hash_password, verify_password, create_jwt, password_hasher
+from auth.dependencies import get_current_user, get_verified_user, invalidate_principal
+from auth.schemas import RegisterRequest, LoginRequest, TokenResponse, UserOut, UserUpdate, PasswordVerifyRequest, PasswordChangeRequest, ForgotPasswordRequest, ResetPasswordRequest
+from auth.schemas import ProblemCreate, ProblemResponse, CommentCreate, CommentResponse, ThreadedCommentResponse, VoteCreate, VoteResponse, VoteStatusResponse, BookmarkResponse
+from auth.schemas import NotificationPreferencesCreate, NotificationPreferencesResponse, NotificationResponse, NotificationCreate
+from auth.schemas import ForumCreate, ForumUpdate, Forum as ForumSchema, ForumMembershipCreate, ForumMembership as ForumMembershipSchema, ForumMessageCreate, ForumMessage as ForumMessageSchema, ForumInvitationCreate, ForumInvitation as ForumInvitationSchema, ForumJoinRequestCreate, ForumJoinRequest as ForumJoinRequestSchema, DraftCreate, DraftUpdate, DraftResponse, UserOnlineStatusResponse, ForumReplyCreate, ForumReply as ForumReplySchema
+from problem_service import load_problem_cards, author_summary, serialize_problem_cards, adjust_problem_counters, adjust_vote_counter
+from trending_service import trending_service
+from view_counter import view_counter
+import feed_service
+from pagination import encode_cursor, decode_cursor, keyset_page
+from search_service import search_problems_query, search_users_query, search_forums_query, serialize_user_results
+from comment_service import load_comment_tree
+from forum_deletion import forum_deleter, active_deletion_job, forums_being_deleted, serialize_deletion_job
+from forum_directory import forum_directory_query, forum_directory_page, member_count_column
+from profile_service import PROFILE_PAGE_SIZE, page_limit, profile_counts, serialize_profile_comment, serialize_profile_bookmark
+from forum_hub import forum_hub
+from presence_service import presence_service
+from forum_access import resolve_forum_access, invalidate_forum_access
+from settings_service import get_settings_service
+# Import notification service with error handling
+try:
+    from notification_service import NotificationService
+except ImportError:
+    NotificationService = None
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+
+def check_forum_permission(db: Session, forum_id: int, user: User, required_permission: str):
+    """Check if user has required permission in forum"""
+    return resolve_forum_access(db, forum_id, user).can(required_permission)
+from fastapi import UploadFile, File, Form
+import os
+import uuid
+from PIL import Image
+
+router = APIRouter()
+
+
+@router.get("/problems/trending")
+async def get_trending_problems(
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get trending problems from the precomputed trending table
+    
+    Pass the previous response's next_cursor to page with a keyset instead of an offset.
+    """
+    from models import ProblemTrending
+    
+    # Forum problems never get a trending row
+    trending_query = db.query(ProblemTrending, Problem).join(
+        Problem, Problem.id == ProblemTrending.problem_id
+    ).order_by(ProblemTrending.score.desc(), ProblemTrending.problem_id.desc())
+    
+    position = decode_cursor(cursor, "score", "id")
+    if position:
+        trending_query = trending_query.filter(or_(
+            ProblemTrending.score < position["score"],
+            and_(ProblemTrending.score == position["score"], ProblemTrending.problem_id < position["id"])
+        ))
+    else:
+        trending_query = trending_query.offset((page - 1) * limit)
+    
+    rows = trending_query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # Format results (card data for the whole page is loaded in grouped queries)
+    cards = load_problem_cards(db, [problem for _, problem in rows])
+    results = []
+    for trending, problem in rows:
+        card = cards[problem.id]
+        
+        results.append({
+            "id": problem.id,
+            "title": problem.title,
+            "description": problem.description,
+            "subject": problem.subject,
+            "level": problem.level,
+            "year": problem.year,
+            "tags": problem.tags,
+            "view_count": (problem.view_count or 0) + view_counter.pending(problem.id),
+            "engagement_score": float(trending.engagement_score),
+            "created_at": problem.created_at.isoformat(),
+            "author": author_summary(card["author"]),
+            "comment_count": card["comment_count"],
+            "like_count": card["like_count"],
+            "dislike_count": card["dislike_count"],
+            "images": card["images"]
+        })
+    
+    next_cursor = None
+    if has_more and rows:
+        last_trending = rows[-1][0]
+        next_cursor = encode_cursor({"score": last_trending.score, "id": last_trending.problem_id})
+    
+    response = {
+        "problems": results,
+        "page": page,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
+    
+    # Total count is only needed for page-number navigation
+    if not position:
+        total_problems = db.query(func.count(ProblemTrending.problem_id)).scalar()
+        response["total_problems"] = total_problems
+        response["total_pages"] = max(1, (total_problems + limit - 1) // limit)
+    
+    return response
+
+@router.post("/register")
+async def register(req: RegisterRequest, db: Session = Depends(get_db)):
+    # Validate password requirements from settings
+    settings = get_settings_service().snapshot
+    password_min_length = settings.get_int('password_min_length', 8)
+    password_require_special = settings.get_setting('password_require_special') == 'true'
+    
+    # Validate password length
+    if len(req.password) < password_min_length:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Password must be at least {password_min_length} characters long"
+        )
+    
+    # Validate special characters requirement
+    if password_require_special:
+        import re
+        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', req.password):
+            raise HTTPException(
+                status_code=400,
+                detail="Password must contain at least one special character"
+            )
+    
+    # Check if email is already registered (verified or not)
+    existing_user = db.query(User).filter(User.email == req.email).first()
+    if existing_user:
+        if existing_user.is_verified and existing_user.is_active:
+            raise HTTPException(status_code=400, detail="Email already registered")
+        else:
+            # User exists but not verified or is deleted - delete the old record and create new one
+            db.delete(existing_user)
+            db.commit()
+    
+    # Check if username is already taken (only for active users)
+    if db.query(User).filter(User.username == req.username, User.is_active == True).first():
+        raise HTTPException(status_code=400, detail="Username already taken")
+    
+    # Generate verification code first
+    from email_service import email_service
+    verification_code = email_service.generate_verification_code()
+    verification_expires = email_service.get_verification_expiry()
+    
+    
+    # Try to send email BEFORE creating user
+    success = await email_service.send_verification_email(
+        req.email, req.username, verification_code
+    )
+    
+    if not success:
+        # For testing: create user even if email fails, but log the code
+        pass  # Continue to create user for testing purposes
+    
+    # Create user (for testing, even if email failed)
+    print(f"DEBUG: Password type: {type(req.password)}")
+    print(f"DEBUG: Password length: {len(req.password)}")
+    print(f"DEBUG: Password value: {repr(req.password)}")
+    hashed = await password_hasher.hash_async(req.password)
+    user = User(
+        username=req.username, 
+        email=req.email, 
+        password_hash=hashed, 
+        is_verified=False,
+        verification_code=verification_code,
+        verification_expires=verification_expires,
+        marketing_emails=req.marketing_emails
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    
+    # Create notification preferences
+    notification_preferences = NotificationPreferences(
+        user_id=user.id,
+        email_likes=req.email_notifications,
+        email_comments=req.email_notifications,
+        email_follows=req.email_notifications,
+        email_marketing=req.marketing_emails,
+        in_app_likes=True,  # In-app notifications default to True
+        in_app_comments=True,
+        in_app_follows=True
+    )
+    db.add(notification_preferences)
+    db.commit()
+    
+    # Generate JWT token for automatic login
+    from auth.utils import create_jwt
+    access_token = create_jwt(user.id)
+    
+    if not success:
+        return {
+            "message": "Registration successful! Email sending failed, but user created for testing.",
+            "debug_code": verification_code,
+            "email": req.email,
+            "username": req.username,
+            "access_token": access_token,
+            "token_type": "bearer"
+        }
+    
+    return {
+        "message": "Registration successful! Please check your email for verification code.",
+        "email": req.email,
+        "username": req.username,
+        "access_token": access_token,
+        "token_type": "bearer"
+    }
+
+@router.post("/login", response_model=TokenResponse)
+def login(req: LoginRequest, db: Session = Depends(get_db)):
+    # Check maintenance mode first
+    settings = get_settings_service().snapshot
+    
+    if settings.get_boolean('maintenance_mode', False):
+        # During maintenance, only allow admin/moderator login
+        user = db.query(User).filter(User.email == req.email).first()
+        verified, new_hash = password_hasher.verify_and_update(req.password, user.password_hash) if user else (False, None)
+        
+        if not verified:
+            # Don't reveal if user exists during maintenance
+            raise HTTPException(
+                status_code=503, 
+                detail="Site is currently under maintenance. Please try again later."
+            )
+        
+        # Check if user is admin or moderator
+        if user.role not in ['admin', 'moderator']:
+            raise HTTPException(
+                status_code=503, 
+                detail="Site is currently under maintenance. Please try again later."
+            )
+        
+        # Admin/moderator can login during maintenance
+        if new_hash:
+            user.password_hash = new_hash
+        # Reset login attempts on successful login
+        user.login_attempts = 0
+        user.locked_until = None
+        user.last_login = datetime.utcnow()
+        db.commit()
+        invalidate_principal(user.id)
+        
+        # Create JWT token
+        token = create_jwt(user.id)
+        return {"token": token}
+    
+    # Normal login flow when not in maintenance mode
+    user = db.query(User).filter(User.email == req.email).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    # Check if account is locked
+    if user.locked_until and user.locked_until > datetime.utcnow():
+        remaining_time = user.locked_until - datetime.utcnow()
+        minutes = int(remaining_time.total_seconds() / 60)
+        raise HTTPException(
+            status_code=423, 
+            detail=f"Account locked due to too many failed login attempts. Try again in {minutes} minutes."
+        )
+    
+    # Get security settings
+    max_attempts = settings.get_int('max_login_attempts', 5)
+    lockout_duration = settings.get_int('lockout_duration_minutes', 30)
+    
+    # Check password (the stored hash is upgraded if BCRYPT_ROUNDS changed)
+    verified, new_hash = password_hasher.verify_and_update(req.password, user.password_hash)
+    if not verified:
+        # Increment failed login attempts (handle None values)
+        if user.login_attempts is None:
+            user.login_attempts = 1
+        else:
+            user.login_attempts += 1
+        
+        # Check if max attempts reached
+        if user.login_attempts >= max_attempts:
+            user.locked_until = datetime.utcnow() + timedelta(minutes=lockout_duration)
+            user.login_attempts = 0  # Reset attempts after lockout
+        
+        db.commit()
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    # Reset login attempts on successful login
+    if new_hash:
+        user.password_hash = new_hash
+    user.login_attempts = 0
+    user.locked_until = None
+    user.last_login = datetime.utcnow()
+    db.commit()
+    invalidate_principal(user.id)
+    
+    # Check if email is verified
+    if not user.is_verified:
+        raise HTTPException(
+            status_code=403, 
+            detail="Email not verified. Please check your email for verification code."
+        )
+    
+    # Check if user is active
+    if not user.is_active:
+        raise HTTPException(
+            status_code=403,
+            detail="Account has been deactivated"
+        )
+    
+    # Check if user is banned
+    if user.is_banned:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Account has been banned. Reason: {user.ban_reason or 'No reason provided'}"
+        )
+    
+    token = create_jwt(user.id)
+    return {"token": token}
+
+
+@router.get("/me", response_model=UserOut)
+def me(current_user: User = Depends(get_verified_user)):
+    return current_user
+
+@router.post("/problems/", response_model=ProblemResponse)
+def create_problem(
+    problem: ProblemCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    
+    db_problem = Problem(
+        title=problem.title,
+        description=problem.description,
+        tags=problem.tags,
+        subject=problem.subject,
+        level=problem.level,
+        year=problem.year,
+        author_id=current_user.id
+    )
+    db.add(db_problem)
+    db.flush()
+    # Write it into followers' timelines in the same transaction
+    feed_service.fan_out(db, db_problem)
+    db.commit()
+    db.refresh(db_problem)
+    trending_service.mark_dirty(db_problem.id)
+    
+    # Return the created problem with all fields
+    return {
+        "id": db_problem.id,
+        "title": db_problem.title,
+        "description": db_problem.description,
+        "tags": db_problem.tags,
+        "subject": db_problem.subject,
+        "level": db_problem.level,
+        "year": db_problem.year,
+        "author_id": db_problem.author_id,
+        "comment_count": 0,
+        "created_at": db_problem.created_at.isoformat() if db_problem.created_at else None,
+        "updated_at": db_problem.updated_at.isoformat() if db_problem.updated_at else None,
+        "author": None
+    }
+
+
+@router.get("/problems/")
+def get_problems(
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Get problems with pagination
+    
+    Pass the previous response's next_cursor to page with a keyset instead of an offset.
+    """
+    # Get problems with pagination (EXCLUDE forum problems)
+    problems, next_cursor = keyset_page(
+        db.query(Problem).filter(Problem.forum_id.is_(None)),
+        Problem.created_at, Problem.id, limit,
+        cursor=cursor, offset=(page - 1) * limit
+    )
+    
+    # Load authors, counts and images for the whole page at once
+    result = serialize_problem_cards(db, problems)
+    for problem_data in result:
+        if problem_data["author"] is None:
+            problem_data["author"] = {
+                "id": 1,
+                "username": "Unknown User",
+                "profile_picture": None
+            }
+    
+    response = {
+        "problems": result,
+        "page": page,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
+    
+    # Get total count for pagination (skipped in cursor mode or when not requested)
+    if include_total and not cursor:
+        total_problems = db.query(func.count(Problem.id)).filter(Problem.forum_id.is_(None)).scalar()
+        response["total"] = total_problems
+        response["total_pages"] = (total_problems + limit - 1) // limit
+    
+    return response
+
+
+@router.get("/problems/{problem_id}/images")
+async def get_problem_images(
+    problem_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all images for a problem"""
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # SECURITY CHECK: If problem is from a forum, check if user is a member
+    if problem.forum_id:
+        # Check if user is the problem author (they should always have access to their own problems)
+        is_author = problem.author_id == current_user.id
+        
+        # Check if user is a member (active or creator)
+        access = resolve_forum_access(db, problem.forum_id, current_user)
+        
+        if not is_author and not access.is_member and not access.is_creator:
+            raise HTTPException(status_code=403, detail="Access denied: Not a member of this forum")
+    
+    # Get images from database
+    problem_images = db.query(ProblemImage).filter(ProblemImage.problem_id == problem_id).all()
+    image_filenames = [img.filename for img in problem_images]
+    
+    return {"images": image_filenames}
+
+# Registered before /problems/{subject}, which would otherwise match it
+@router.get("/problems/search")
+def search_problems(
+    q: str,
+    page: int = 1,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search problems by title, description, or tags with pagination, ranked by relevance"""
+    if len(q.strip()) < 2:
+        return {"problems": [], "total": 0, "page": page, "limit": limit, "total_pages": 0}
+    
+    offset = (page - 1) * limit
+    problems_query = search_problems_query(db, q)
+    
+    # Get total count for pagination
+    total_problems = problems_query.order_by(None).count()
+    
+    problems = problems_query.offset(offset).limit(limit).all()
+    
+    results = serialize_problem_cards(db, problems)
+    for problem_data in results:
+        # Kept for older clients; votes are stored as like/dislike
+        problem_data["upvotes"] = problem_data["like_count"]
+        problem_data["downvotes"] = problem_data["dislike_count"]
+    
+    return {
+        "problems": results,
+        "total": total_problems,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total_problems + limit - 1) // limit
+    }
+
+@router.get("/problems/{subject}", response_model=List[ProblemResponse])
+def get_problems_by_subject(subject: str, db: Session = Depends(get_db)):
+    # Case-insensitive subject match; card data is loaded in grouped queries
+    problems = db.query(Problem).filter(func.lower(Problem.subject) == func.lower(subject)).order_by(Problem.created_at.desc()).all()
+    return serialize_problem_cards(db, problems)
+
+
+@router.get("/problems/id/{problem_id}", response_model=ProblemResponse)
+def get_problem(problem_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    comment_count = problem.comment_count or 0
+    
+    # SECURITY CHECK: If problem is from a forum, check if user is a member (or admin/moderator)
+    if problem.forum_id:
+        # Check if user is admin/moderator (they have access to all forum problems)
+        if current_user.role in ['admin', 'moderator']:
+            pass  # Admin/moderator has access
+        else:
+            # Check if user is the problem author (they should always have access to their own problems)
+            is_author = problem.author_id == current_user.id
+            
+            # Check if user is a member (active or creator)
+            access = resolve_forum_access(db, problem.forum_id, current_user)
+            
+            if not is_author and not access.has_membership and not access.is_creator:
+                raise HTTPException(status_code=403, detail="Access denied: Not a member of this forum")
+    
+    
+    # Fetch the author
+    author = db.query(User).filter(User.id == problem.author_id).first()
+    
+    if author:
+        return {
+            "id": problem.id, 
+            "title": problem.title, 
+            "description": problem.description, 
+            "tags": problem.tags, 
+            "subject": problem.subject, 
+            "level": problem.level, 
+            "year": problem.year,
+            "author_id": problem.author_id, 
+            "comment_count": comment_count, 
+            "created_at": problem.created_at.isoformat() if problem.created_at else None,
+            "updated_at": problem.updated_at.isoformat() if problem.updated_at else None, 
+            "author": {
+                "id": author.id, 
+                "username": author.username, 
+                "profile_picture": author.profile_picture
+            }
+        }
+    else:
+        return {
+            "id": problem.id, 
+            "title": problem.title, 
+            "description": problem.description, 
+            "tags": problem.tags, 
+            "subject": problem.subject, 
+            "level": problem.level, 
+            "year": problem.year,
+            "author_id": problem.author_id, 
+            "comment_count": comment_count, 
+            "created_at": problem.created_at.isoformat() if problem.created_at else None,
+            "updated_at": problem.updated_at.isoformat() if problem.updated_at else None, 
+            "author": None
+        }
+
+@router.put("/problems/{problem_id}", response_model=ProblemResponse)
+def update_problem(
+    problem_id: int,
+    problem: ProblemCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if problem exists and belongs to current user
+    db_problem = db.query(Problem).filter(
+        Problem.id == problem_id,
+        Problem.author_id == current_user.id
+    ).first()
+    
+    if not db_problem:
+        raise HTTPException(status_code=404, detail="Problem not found or you don't have permission to edit it")
+    
+    # Update problem
+    db_problem.title = problem.title
+    db_problem.description = problem.description
+    db_problem.tags = problem.tags
+    db_problem.subject = problem.subject
+    db_problem.level = problem.level
+    db_problem.year = problem.year
+    db_problem.updated_at = datetime.utcnow()
+    
+    db.commit()
+    db.refresh(db_problem)
+    
+    # Return with comment count
+    problem = db_problem
+    comment_count = problem.comment_count or 0
+    # Fetch the author
+    author = db.query(User).filter(User.id == problem.author_id).first()
+    
+    if author:
+        return {
+            "id": problem.id, 
+            "title": problem.title, 
+            "description": problem.description, 
+            "tags": problem.tags, 
+            "subject": problem.subject, 
+            "level": problem.level, 
+            "year": problem.year,
+            "author_id": problem.author_id, 
+            "comment_count": comment_count, 
+            "created_at": problem.created_at.isoformat() if problem.created_at else None,
+            "updated_at": problem.updated_at.isoformat() if problem.updated_at else None, 
+            "author": {
+                "id": author.id, 
+                "username": author.username, 
+                "profile_picture": author.profile_picture
+            }
+        }
+    else:
+        return {
+            "id": problem.id, 
+            "title": problem.title, 
+            "description": problem.description, 
+            "tags": problem.tags, 
+            "subject": problem.subject, 
+            "level": problem.level, 
+            "year": problem.year,
+            "author_id": problem.author_id, 
+            "comment_count": comment_count, 
+            "created_at": problem.created_at.isoformat() if problem.created_at else None,
+            "updated_at": problem.updated_at.isoformat() if problem.updated_at else None, 
+            "author": None
+        }
+
+@router.delete("/problems/{problem_id}")
+def delete_problem(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if problem exists and belongs to current user
+    db_problem = db.query(Problem).filter(
+        Problem.id == problem_id,
+        Problem.author_id == current_user.id
+    ).first()
+    
+    if not db_problem:
+        raise HTTPException(status_code=404, detail="Problem not found or you don't have permission to delete it")
+    
+    # Delete problem (this will cascade delete comments and votes)
+    db.delete(db_problem)
+    db.commit()
+    
+    return {"message": "Problem deleted successfully"}
+
+# Comment endpoints
+@router.post("/problems/{problem_id}/comments", response_model=CommentResponse)
+async def create_comment(
+    problem_id: int,
+    comment: CommentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if comments are enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('comments_enabled', True):
+        raise HTTPException(status_code=403, detail="Comments are temporarily disabled")
+    
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Create comment
+    db_comment = Comment(
+        text=comment.text,
+        author_id=current_user.id,
+        problem_id=problem_id,
+        parent_comment_id=comment.parent_comment_id
+    )
+    db.add(db_comment)
+    adjust_problem_counters(db, problem_id, comment_count=1)
+    
+    # Send notification if not the author commenting on their own problem (same transaction as the comment)
+    if problem.author_id != current_user.id:
+        notification_service = NotificationService(db) if NotificationService else None if NotificationService else None
+        if notification_service:
+            await notification_service.send_comment_notification(
+            user_id=problem.author_id,
+            commenter_username=current_user.username,
+            problem_title=problem.title,
+            commit=False
+        )
+    
+    db.commit()
+    db.refresh(db_comment)
+    
+    # Fetch the comment with author relationship
+    db_comment = db.query(Comment).options(joinedload(Comment.author)).filter(Comment.id == db_comment.id).first()
+    return db_comment
+
+@router.get("/problems/{problem_id}/comments")
+def get_comments(
+    problem_id: int,
+    depth: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get threaded comments (optionally page top-level threads and trim reply depth)"""
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # SECURITY CHECK: If problem is from a forum, check if user is a member (or admin/moderator)
+    if problem.forum_id:
+        # Check if user is admin/moderator (they have access to all forum problems)
+        if current_user.role in ['admin', 'moderator']:
+            pass  # Admin/moderator has access
+        else:
+            # Check if user is the problem author (they should always have access to their own problems)
+            is_author = problem.author_id == current_user.id
+            
+            # Check if user is a member (active or creator)
+            access = resolve_forum_access(db, problem.forum_id, current_user)
+            
+            if not is_author and not access.has_membership and not access.is_creator:
+                raise HTTPException(status_code=403, detail="Access denied: Not a member of this forum")
+    
+    # Load the whole thread in one query and assemble it in memory
+    return load_comment_tree(db, problem_id, depth=depth, limit=limit, offset=offset)
+
+
+@router.delete("/problems/{problem_id}")
+def delete_problem(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if problem exists and belongs to current user
+    db_problem = db.query(Problem).filter(
+        Problem.id == problem_id,
+        Problem.author_id == current_user.id
+    ).first()
+    
+    if not db_problem:
+        raise HTTPException(status_code=404, detail="Problem not found or you don't have permission to delete it")
+    
+    # Delete problem (this will cascade delete comments and votes)
+    db.delete(db_problem)
+    db.commit()
+    
+    return {"message": "Problem deleted successfully"}
+
+@router.put("/problems/{problem_id}/comments/{comment_id}", response_model=CommentResponse)
+def update_comment(
+    problem_id: int,
+    comment_id: int,
+    comment: CommentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Check if comment exists and belongs to current user
+    db_comment = db.query(Comment).filter(
+        Comment.id == comment_id,
+        Comment.problem_id == problem_id,
+        Comment.author_id == current_user.id
+    ).first()
+    
+    if not db_comment:
+        raise HTTPException(status_code=404, detail="Comment not found or you don't have permission to edit it")
+    
+    # Update comment
+    db_comment.text = comment.text
+    db_comment.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(db_comment)
+    
+    # Fetch the comment with author relationship
+    db_comment = db.query(Comment).options(joinedload(Comment.author)).filter(Comment.id == comment_id).first()
+    return db_comment
+
+@router.delete("/problems/{problem_id}/comments/{comment_id}")
+def delete_comment(
+    problem_id: int,
+    comment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Check if comment exists and belongs to current user
+    db_comment = db.query(Comment).filter(
+        Comment.id == comment_id,
+        Comment.problem_id == problem_id,
+        Comment.author_id == current_user.id
+    ).first()
+    
+    if not db_comment:
+        raise HTTPException(status_code=404, detail="Comment not found or you don't have permission to delete it")
+    
+    # Delete comment
+    db.delete(db_comment)
+    adjust_problem_counters(db, problem_id, comment_count=-1)
+    db.commit()
+    
+    return {"message": "Comment deleted successfully"}
+
+@router.put("/problems/{problem_id}/comments/{comment_id}/solution")
+def mark_comment_as_solution(
+    problem_id: int,
+    comment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark a comment as the solution (only problem author can do this)"""
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Check if current user is the problem author
+    if problem.author_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the problem author can mark comments as solutions")
+    
+    # Check if comment exists and belongs to this problem
+    db_comment = db.query(Comment).filter(
+        Comment.id == comment_id,
+        Comment.problem_id == problem_id
+    ).first()
+    
+    if not db_comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    
+    # Toggle the solution status
+    db_comment.is_solution = not db_comment.is_solution
+    db.commit()
+    db.refresh(db_comment)
+    
+    action = "marked as solution" if db_comment.is_solution else "unmarked as solution"
+    return {"message": f"Comment {action} successfully", "is_solution": db_comment.is_solution}
+
+# Vote endpoints
+
+@router.get("/problems/{problem_id}/votes", response_model=List[VoteResponse])
+def get_votes(problem_id: int, db: Session = Depends(get_db)):
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    votes = db.query(Vote).filter(Vote.problem_id == problem_id).all()
+    return votes
+
+@router.get("/problems/{problem_id}/vote-status", response_model=VoteStatusResponse)
+def get_vote_status(
+    problem_id: int, 
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # SECURITY CHECK: If problem is from a forum, check if user is a member
+    if problem.forum_id:
+        # Check if user is the problem author (they should always have access to their own problems)
+        is_author = problem.author_id == current_user.id
+        
+        # Check if user is a member (active or creator)
+        access = resolve_forum_access(db, problem.forum_id, current_user)
+        
+        if not is_author and not access.has_membership and not access.is_creator:
+            raise HTTPException(status_code=403, detail="Access denied: Not a member of this forum")
+    
+    # Get user's current vote
+    user_vote = db.query(Vote).filter(
+        Vote.user_id == current_user.id,
+        Vote.problem_id == problem_id
+    ).first()
+    
+    return {
+        "user_vote": user_vote.vote_type if user_vote else None,
+        "like_count": problem.like_count or 0,
+        "dislike_count": problem.dislike_count or 0
+    }
+
+@router.post("/problems/{problem_id}/vote", response_model=VoteStatusResponse)
+async def vote_problem(
+    problem_id: int,
+    vote_data: dict,  # Will receive {"vote_type": "like"} or {"vote_type": "dislike"}
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if voting is enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('voting_enabled', True):
+        raise HTTPException(status_code=403, detail="Voting is temporarily disabled")
+    
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Get user's existing vote
+    existing_vote = db.query(Vote).filter(
+        Vote.user_id == current_user.id,
+        Vote.problem_id == problem_id
+    ).first()
+    
+    vote_type = vote_data.get("vote_type")
+    
+    # STEP 1: Always delete any existing vote first
+    if existing_vote:
+        db.delete(existing_vote)
+        adjust_vote_counter(db, problem_id, existing_vote.vote_type, -1)
+        db.commit()
+    
+    # STEP 2: Check if user wants to vote or remove vote
+    should_create_vote = not existing_vote or existing_vote.vote_type != vote_type
+    
+    if should_create_vote:
+        new_vote = Vote(
+            user_id=current_user.id,
+            problem_id=problem_id,
+            vote_type=vote_type
+        )
+        db.add(new_vote)
+        adjust_vote_counter(db, problem_id, vote_type, 1)
+        
+        # Send notification if it's a like and not the author liking their own problem (same transaction as the vote)
+        if vote_type == "like" and problem.author_id != current_user.id:
+            notification_service = NotificationService(db) if NotificationService else None if NotificationService else None
+            if notification_service:
+                await notification_service.send_like_notification(
+                user_id=problem.author_id,
+                liker_username=current_user.username,
+                problem_title=problem.title,
+                commit=False
+            )
+        db.commit()
+    
+    # STEP 3: Read the current state from the problem's counters
+    db.refresh(problem)
+    
+    return {
+        "user_vote": vote_type if should_create_vote else None,
+        "like_count": problem.like_count or 0,
+        "dislike_count": problem.dislike_count or 0
+    }
+
+# Bookmark endpoints
+
+@router.post("/problems/{problem_id}/bookmark")
+def bookmark_problem(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if bookmarks are enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('bookmarks_enabled', True):
+        raise HTTPException(status_code=403, detail="Bookmarks are temporarily disabled")
+    
+    # Check if problem exists
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Check if already bookmarked
+    existing_bookmark = db.query(Bookmark).filter(
+        Bookmark.user_id == current_user.id,
+        Bookmark.problem_id == problem_id
+    ).first()
+    
+    if existing_bookmark:
+        raise HTTPException(status_code=400, detail="Problem already bookmarked")
+    
+    # Create bookmark
+    bookmark = Bookmark(
+        user_id=current_user.id,
+        problem_id=problem_id
+    )
+    db.add(bookmark)
+    adjust_problem_counters(db, problem_id, bookmark_count=1)
+    db.commit()
+    
+    return {"message": "Problem bookmarked successfully"}
+
+@router.delete("/problems/{problem_id}/bookmark")
+def unbookmark_problem(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if bookmark exists
+    bookmark = db.query(Bookmark).filter(
+        Bookmark.user_id == current_user.id,
+        Bookmark.problem_id == problem_id
+    ).first()
+    
+    if not bookmark:
+        raise HTTPException(status_code=404, detail="Bookmark not found")
+    
+    # Delete bookmark
+    db.delete(bookmark)
+    adjust_problem_counters(db, problem_id, bookmark_count=-1)
+    db.commit()
+    
+    return {"message": "Bookmark removed successfully"}
+
+@router.post("/problems/bookmark-status")
+def get_bookmark_status(
+    problem_ids: list[int],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get bookmark status for multiple problems"""
+    # Get all bookmarks for the current user and the specified problems
+    bookmarks = db.query(Bookmark).filter(
+        Bookmark.user_id == current_user.id,
+        Bookmark.problem_id.in_(problem_ids)
+    ).all()
+    
+    # Create a set of bookmarked problem IDs for quick lookup
+    bookmarked_problem_ids = {bookmark.problem_id for bookmark in bookmarks}
+    
+    # Return bookmark status for each problem
+    bookmark_status = {}
+    for problem_id in problem_ids:
+        bookmark_status[problem_id] = {
+            "isBookmarked": problem_id in bookmarked_problem_ids
+        }
+    
+    return bookmark_status
+
+def profile_picture_url(user: User) -> Optional[str]:
+    """Profile picture path, handling both old and new stored formats"""
+    if not user.profile_picture:
+        return None
+    if user.profile_picture.startswith('uploads/'):
+        # Old format: remove 'uploads/' prefix
+        return user.profile_picture.replace('uploads/', '')
+    # New format: use as is
+    return user.profile_picture
+
+@router.get("/user/profile", response_model=dict)
+def get_user_profile(
+    legacy: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Current user's profile header with counts
+    
+    Problems, comments and bookmarks are paged from /user/profile/problems,
+    /user/profile/comments and /user/profile/bookmarks. legacy=true also
+    returns all of them inline, as this endpoint used to.
+    """
+    counts = profile_counts(db, current_user.id)
+    response = {
+        "user": {
+            "id": current_user.id,
+            "username": current_user.username,
+            "email": current_user.email,
+            "bio": current_user.bio,
+            "profile_picture": profile_picture_url(current_user),
+            "follower_count": counts["followers"],
+            "following_count": counts["following"]
+        },
+        "counts": {
+            "problems": counts["problems"],
+            "comments": counts["comments"],
+            "solutions": counts["solutions"],
+            "bookmarks": counts["bookmarks"]
+        }
+    }
+    
+    if legacy:
+        problems = db.query(Problem).filter(Problem.author_id == current_user.id).order_by(Problem.created_at.desc()).all()
+        comments = db.query(Comment).join(Comment.problem).options(contains_eager(Comment.problem)).filter(
+            Comment.author_id == current_user.id
+        ).order_by(Comment.created_at.desc()).all()
+        bookmarks = db.query(Bookmark).join(Bookmark.problem).options(contains_eager(Bookmark.problem)).filter(
+            Bookmark.user_id == current_user.id
+        ).order_by(Bookmark.created_at.desc()).all()
+        response["problems"] = serialize_problem_cards(db, problems)
+        response["comments"] = [serialize_profile_comment(comment) for comment in comments]
+        response["bookmarks"] = [serialize_profile_bookmark(bookmark) for bookmark in bookmarks]
+    
+    return response
+
+@router.get("/user/profile/problems")
+def get_user_profile_problems(
+    limit: int = PROFILE_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Current user's problems, newest first; pass next_cursor for the next page"""
+    problems, next_cursor = keyset_page(
+        db.query(Problem).filter(Problem.author_id == current_user.id),
+        Problem.created_at, Problem.id, page_limit(limit), cursor=cursor
+    )
+    return {"problems": serialize_problem_cards(db, problems), "next_cursor": next_cursor}
+
+@router.get("/user/profile/comments")
+def get_user_profile_comments(
+    limit: int = PROFILE_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    solutions_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Current user's comments with their problems, newest first; pass next_cursor for the next page"""
+    query = db.query(Comment).join(Comment.problem).options(contains_eager(Comment.problem)).filter(
+        Comment.author_id == current_user.id
+    )
+    if solutions_only:
+        query = query.filter(Comment.is_solution == True)
+    comments, next_cursor = keyset_page(query, Comment.created_at, Comment.id, page_limit(limit), cursor=cursor)
+    return {"comments": [serialize_profile_comment(comment) for comment in comments], "next_cursor": next_cursor}
+
+@router.get("/user/profile/bookmarks")
+def get_user_profile_bookmarks(
+    limit: int = PROFILE_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Current user's bookmarks, most recent first; pass next_cursor for the next page"""
+    bookmarks, next_cursor = keyset_page(
+        db.query(Bookmark).join(Bookmark.problem).options(contains_eager(Bookmark.problem)).filter(
+            Bookmark.user_id == current_user.id
+        ),
+        Bookmark.created_at, Bookmark.id, page_limit(limit), cursor=cursor
+    )
+    return {"bookmarks": [serialize_profile_bookmark(bookmark) for bookmark in bookmarks], "next_cursor": next_cursor}
+
+@router.put("/user/profile", response_model=UserOut)
+def update_user_profile(
+    user_update: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Update user profile (bio and profile picture)"""
+    # Update bio if provided
+    if user_update.bio is not None:
+        current_user.bio = user_update.bio
+    
+    # Update profile picture if provided
+    if user_update.profile_picture is not None:
+        current_user.profile_picture = user_update.profile_picture
+    
+    db.commit()
+    db.refresh(current_user)
+    
+    return current_user
+
+@router.post("/user/profile-picture")
+async def upload_profile_picture(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    from cloudinary_service import cloudinary_service
+    
+    # Check if Cloudinary is configured
+    if not cloudinary_service.is_configured():
+        raise HTTPException(status_code=500, detail="Image service not configured")
+    
+    # Check file type
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File is not an image")
+
+    # Check file size
+    content = await file.read()
+    if len(content) > 5 * 1024 * 1024:
+        raise HTTPException(status_code=400, detail="File is too large. Maximum size is 5MB")
+
+    # Reset file pointer for Cloudinary upload
+    await file.seek(0)
+    
+    # Upload to Cloudinary
+    cloudinary_url = cloudinary_service.upload_profile_picture(file, current_user.id)
+    
+    if not cloudinary_url:
+        raise HTTPException(status_code=500, detail="Failed to upload image")
+    
+    # Delete old profile picture if exists
+    if current_user.profile_picture and current_user.profile_picture.startswith("http"):
+        cloudinary_service.delete_image(current_user.profile_picture)
+    
+    # Update database with Cloudinary URL
+    current_user.profile_picture = cloudinary_url
+    db.commit()
+    db.refresh(current_user)
+    
+    return {"message": "Profile picture uploaded successfully", "file_path": cloudinary_url}
+
+
+@router.delete("/user/profile-picture")
+def remove_profile_picture(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove user's profile picture"""
+    if not current_user.profile_picture:
+        raise HTTPException(status_code=400, detail="No profile picture to remove")
+    
+    # Delete from Cloudinary if it's a Cloudinary URL
+    if current_user.profile_picture.startswith("http"):
+        from cloudinary_service import cloudinary_service
+        cloudinary_service.delete_image(current_user.profile_picture)
+    
+    # Update database to remove profile picture
+    current_user.profile_picture = None
+    db.commit()
+    db.refresh(current_user)
+    
+    return {"message": "Profile picture removed successfully"}
+
+
+@router.post("/forums/upload-image")
+async def upload_forum_image(
+    file: UploadFile = File(...),
+    forum_id: int = Form(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Upload image for forum messages"""
+    from cloudinary_service import cloudinary_service
+    
+    # Check if Cloudinary is configured
+    if not cloudinary_service.is_configured():
+        raise HTTPException(status_code=500, detail="Image service not configured")
+    
+    # Check if user is member of the forum
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    if not access.has_membership and not access.is_creator:
+        raise HTTPException(status_code=403, detail="Access denied: Not a member of this forum")
+    
+    # Check file type
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File is not an image")
+
+    # Check file size (5MB limit)
+    content = await file.read()
+    if len(content) > 5 * 1024 * 1024:
+        raise HTTPException(status_code=400, detail="File is too large. Maximum size is 5MB")
+
+    # Reset file pointer for Cloudinary upload
+    await file.seek(0)
+    
+    # Upload to Cloudinary
+    cloudinary_url = cloudinary_service.upload_forum_image(file, forum_id)
+    
+    if not cloudinary_url:
+        raise HTTPException(status_code=500, detail="Failed to upload image")
+        
+    return {"message": "Image uploaded successfully", "file_path": cloudinary_url}
+
+
+@router.get("/serve-image/{filename}")
+def serve_image(filename: str):
+    """Direct image serving endpoint for testing"""
+    from fastapi.responses import FileResponse
+    import os
+    
+    # Try profile pictures first
+    profile_path = f"../../uploads/profile_pictures/{filename}"
+    if os.path.exists(profile_path):
+        return FileResponse(profile_path)
+    
+    # Try forum images
+    forum_path = f"../../uploads/forum_images/{filename}"
+    if os.path.exists(forum_path):
+        return FileResponse(forum_path)
+    
+    # Try problem images
+    problem_path = f"../../uploads/problem_images/{filename}"
+    if os.path.exists(problem_path):
+        return FileResponse(problem_path)
+    
+    return {"error": "File not found", "path": f"Tried: {profile_path}, {forum_path}, {problem_path}"}
+
+@router.post("/follow/{user_id}")
+async def follow_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Follow a user"""
+    # Check if following is enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('following_enabled', True):
+        raise HTTPException(status_code=403, detail="Following is temporarily disabled")
+    
+    # Can't follow yourself
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot follow yourself")
+    
+    # Check if user exists
+    target_user = db.query(User).filter(User.id == user_id).first()
+    if not target_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Check if already following
+    existing_follow = db.query(Follow).filter(
+        Follow.follower_id == current_user.id,
+        Follow.following_id == user_id
+    ).first()
+    
+    if existing_follow:
+        raise HTTPException(status_code=400, detail="Already following this user")
+    
+    # Create follow relationship
+    follow = Follow(follower_id=current_user.id, following_id=user_id)
+    db.add(follow)
+    feed_service.add_author(db, current_user.id, user_id)
+    
+    # Send notification to the user being followed (same transaction as the follow)
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        await notification_service.send_follow_notification(
+        user_id=user_id,
+        follower_username=current_user.username,
+        commit=False
+    )
+    db.commit()
+    
+    return {"message": f"Now following {target_user.username}"}
+
+@router.delete("/follow/{user_id}")
+def unfollow_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Unfollow a user"""
+    # Find the follow relationship
+    follow = db.query(Follow).filter(
+        Follow.follower_id == current_user.id,
+        Follow.following_id == user_id
+    ).first()
+    
+    if not follow:
+        raise HTTPException(status_code=404, detail="Not following this user")
+    
+    # Delete the follow relationship and the user's problems from the follower's timeline
+    db.delete(follow)
+    feed_service.remove_author(db, current_user.id, user_id)
+    db.commit()
+    
+    return {"message": f"Unfollowed user {user_id}"}
+
+@router.get("/feed/following")
+def get_following_feed(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get problems from users you follow, newest first
+    
+    Read from the user's materialized timeline; pass next_cursor to get the next page.
+    """
+    limit = min(max(limit, 1), 100)
+    response = {}
+    if not cursor:
+        following_count = db.query(func.count(Follow.id)).filter(Follow.follower_id == current_user.id).scalar()
+        if not following_count:
+            return {
+                "problems": [],
+                "message": "You don't follow anyone yet",
+                "following_count": 0,
+                "next_cursor": None
+            }
+        response["following_count"] = following_count
+    
+    problems, next_cursor = feed_service.feed_page(db, current_user.id, limit, cursor)
+    
+    # Serialize problems with authors and counts loaded in grouped queries
+    response["problems"] = serialize_problem_cards(db, problems)
+    response["next_cursor"] = next_cursor
+    return response
+
+@router.get("/follow/status/{user_id}")
+def get_follow_status(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Check if current user is following a specific user"""
+    follow = db.query(Follow).filter(
+        Follow.follower_id == current_user.id,
+        Follow.following_id == user_id
+    ).first()
+    
+    return {
+        "is_following": follow is not None,
+        "user_id": user_id
+    }
+
+@router.get("/user/{username}")
+def get_public_user_profile(
+    username: str,
+    legacy: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get public profile of any user by username
+    
+    Problems are paged from /user/{username}/problems; legacy=true also
+    returns all of them inline, as this endpoint used to.
+    """
+    # Get the user
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    counts = profile_counts(db, user.id)
+    
+    # Whether the current user follows this user and whether they follow back (mutual following)
+    is_following = False
+    is_followed_by_profile_owner = False
+    if current_user.id != user.id:  # Don't follow yourself
+        follower_ids = {follower_id for follower_id, in db.query(Follow.follower_id).filter(or_(
+            and_(Follow.follower_id == current_user.id, Follow.following_id == user.id),
+            and_(Follow.follower_id == user.id, Follow.following_id == current_user.id)
+        )).all()}
+        is_following = current_user.id in follower_ids
+        is_followed_by_profile_owner = user.id in follower_ids
+    
+    response = {
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "bio": user.bio,
+            "profile_picture": user.profile_picture,
+            "created_at": user.created_at.isoformat() if user.created_at else None
+        },
+        "follower_count": counts["followers"],
+        "following_count": counts["following"],
+        "problem_count": counts["problems"],
+        "is_following": is_following,
+        "is_followed_by_profile_owner": is_followed_by_profile_owner
+    }
+    
+    if legacy:
+        problems = db.query(Problem).filter(Problem.author_id == user.id).order_by(Problem.created_at.desc()).all()
+        response["problems"] = serialize_problem_cards(db, problems)
+    
+    return response
+
+@router.get("/user/{username}/problems")
+def get_public_user_problems(
+    username: str,
+    limit: int = PROFILE_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """A user's problems, newest first; pass next_cursor for the next page"""
+    user = db.query(User.id).filter(User.username == username).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    problems, next_cursor = keyset_page(
+        db.query(Problem).filter(Problem.author_id == user.id),
+        Problem.created_at, Problem.id, page_limit(limit), cursor=cursor
+    )
+    return {"problems": serialize_problem_cards(db, problems), "next_cursor": next_cursor}
+
+@router.get("/users/search")
+def search_users(
+    q: str,
+    page: int = 1,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search for users by username with pagination (exact and prefix matches first)"""
+    if len(q.strip()) < 2:
+        return {"users": [], "total": 0, "page": page, "limit": limit, "total_pages": 0}
+    
+    offset = (page - 1) * limit
+    users_query = search_users_query(db, q)
+    
+    # Get total count for pagination
+    total_users = users_query.order_by(None).count()
+    
+    users = users_query.offset(offset).limit(limit).all()
+    users_data = serialize_user_results(db, users, current_user)
+    
+    return {
+        "users": users_data,
+        "total": total_users,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total_users + limit - 1) // limit
+    }
+
+@router.get("/search/combined")
+def combined_search(
+    q: str,
+    page: int = 1,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Combined search for users, problems and forums"""
+    if len(q.strip()) < 2:
+        return {"users": [], "problems": [], "forums": [], "query": q}
+    
+    # Search users (limit to 5 per page)
+    users = search_users_query(db, q).limit(5).all()
+    user_results = serialize_user_results(db, users, current_user)
+    
+    # Search problems (limit to 5 per page)
+    problems = search_problems_query(db, q).limit(5).all()
+    problem_results = serialize_problem_cards(db, problems)
+    
+    # Search forums (limit to 5 per page)
+    forums = search_forums_query(db, q).limit(5).all()
+    forum_results = [{
+        "id": forum.id,
+        "title": forum.title,
+        "description": forum.description,
+        "is_private": forum.is_private
+    } for forum in forums]
+    
+    return {
+        "users": user_results,
+        "problems": problem_results,
+        "forums": forum_results,
+        "query": q
+    }
+
+@router.get("/search/advanced")
+async def advanced_search(
+    q: str = "",
+    category: str = "problems",
+    subjects: str = "",
+    level: str = "",
+    year: int = None,
+    tags: str = "",
+    page: int = 1,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Advanced search with multiple filters - focuses on problems"""
+    offset = (page - 1) * limit
+    results = {"users": [], "problems": []}
+    
+    # Build problems query with filters
+    problems_query = db.query(Problem)
+    
+    # Apply text search if provided (results are then ranked by relevance)
+    if q.strip():
+        problems_query = search_problems_query(db, q, problems_query)
+    
+    # Apply problem-specific filters
+    if subjects:
+        subject_list = [s.strip() for s in subjects.split(",") if s.strip()]
+        if subject_list:
+            problems_query = problems_query.filter(Problem.subject.in_(subject_list))
+    if level:
+        problems_query = problems_query.filter(Problem.level.ilike(f"%{level}%"))
+    if year:
+        problems_query = problems_query.filter(Problem.year == year)
+    if tags:
+        tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
+        for tag in tag_list:
+            problems_query = problems_query.filter(Problem.tags.ilike(f"%{tag}%"))
+    
+    # Execute problems query
+    problems = problems_query.offset(offset).limit(limit).all()
+    problem_results = serialize_problem_cards(db, problems)
+    
+    # Get total count
+    total_problems = problems_query.order_by(None).count()
+    
+    
+    return {
+        "users": [],  # Advanced search focuses only on problems
+        "problems": problem_results,
+        "total_users": 0,
+        "total_problems": total_problems,
+        "page": page,
+        "limit": limit,
+        "total_pages": max(1, (total_problems + limit - 1) // limit)
+    }
+
+@router.post("/send-verification")
+async def send_verification_email(
+    request: dict,
+    db: Session = Depends(get_db)
+):
+    email = request.get("email")
+    if not email:
+        raise HTTPException(status_code=400, detail="Email is required")
+    
+    """Send verification email to user"""
+    from email_service import email_service
+    
+    # Check if user exists and is not verified
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if user.is_verified:
+        raise HTTPException(status_code=400, detail="Email already verified")
+    
+    # Generate new verification code
+    verification_code = email_service.generate_verification_code()
+    verification_expires = email_service.get_verification_expiry()
+    
+    # Update user with verification code
+    user.verification_code = verification_code
+    user.verification_expires = verification_expires
+    db.commit()
+    
+    # For now, just return the code for testing (remove this in production)
+    
+    # Send email
+    success = await email_service.send_verification_email(
+        email, user.username, verification_code
+    )
+    
+    if not success:
+        # For testing, return the code in the response
+        return {
+            "message": "Verification code generated (email sending failed)",
+            "verification_code": verification_code,
+            "note": "Check your backend console for the code"
+        }
+    
+    return {"message": "Verification email sent successfully"}
+
+@router.post("/verify-email")
+def verify_email(
+    request: dict,
+    db: Session = Depends(get_db)
+):
+    email = request.get("email")
+    verification_code = request.get("verification_code")
+    
+    
+    if not email or not verification_code:
+        raise HTTPException(status_code=400, detail="Email and verification code are required")
+    
+    """Verify user's email with verification code"""
+    # Find user
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Check if already verified
+    if user.is_verified:
+        raise HTTPException(status_code=400, detail="Email already verified")
+    
+    # Check verification code
+    if not user.verification_code or user.verification_code != verification_code:
+        raise HTTPException(status_code=400, detail="Invalid verification code")
+    
+    # Check if code has expired
+    if user.verification_expires and user.verification_expires < datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Verification code has expired")
+    
+    # Verify user
+    user.is_verified = True
+    user.verification_code = None  # Clear the code
+    user.verification_expires = None
+    db.commit()
+    invalidate_principal(user.id)
+    
+    return {"message": "Email verified successfully"}
+
+@router.get("/verification-status/{email}")
+def get_verification_status(email: str, db: Session = Depends(get_db)):
+    """Check if user's email is verified"""
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {
+        "email": user.email,
+        "is_verified": user.is_verified,
+        "verification_expires": user.verification_expires.isoformat() if user.verification_expires else None
+    }
+
+@router.post("/delete-account-request")
+async def delete_account_request(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Send verification code for account deletion"""
+    from email_service import email_service
+    
+    # Generate verification code for account deletion
+    verification_code = email_service.generate_verification_code()
+    verification_expires = email_service.get_verification_expiry()
+    
+    # Store the verification code in user record
+    current_user.verification_code = verification_code
+    current_user.verification_expires = verification_expires
+    db.commit()
+    
+    # Send account deletion verification email
+    success = await email_service.send_account_deletion_email(
+        current_user.email, 
+        current_user.username, 
+        verification_code
+    )
+    
+    if not success:
+        return {
+            "message": "Failed to send verification email. Please try again.",
+            "debug_code": verification_code  # For testing
+        }
+    
+    return {"message": "Verification code sent to your email address"}
+
+@router.post("/delete-account")
+def delete_account(
+    request: dict,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete user account after verification"""
+    verification_code = request.get("verification_code")
+    
+    
+    if not verification_code:
+        raise HTTPException(status_code=400, detail="Verification code is required")
+    
+    # Check verification code
+    if not current_user.verification_code or current_user.verification_code != verification_code:
+        raise HTTPException(status_code=400, detail="Invalid verification code")
+    
+    # Check if code has expired
+    if current_user.verification_expires and current_user.verification_expires < datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Verification code has expired")
+    
+    # Instead of deleting the user, mark them as deleted
+    # Store unique username in database but display as "[deleted user]" to users
+    current_user.username = f"__deleted_user_{current_user.id}__"
+    current_user.email = f"deleted_{current_user.id}@example.com"
+    current_user.is_active = False
+    current_user.verification_code = None
+    current_user.verification_expires = None
+    
+    # Clear sensitive data but keep content
+    current_user.bio = None
+    current_user.profile_picture = None
+    
+    db.commit()
+    invalidate_principal(current_user.id)
+    
+    return {"message": "Account successfully deleted"}
+
+@router.post("/cleanup-expired-users")
+def cleanup_expired_users(db: Session = Depends(get_db)):
+    """Clean up unverified users older than 1 hour"""
+    from datetime import datetime, timedelta
+    
+    cutoff_time = datetime.utcnow() - timedelta(hours=1)
+    expired_users = db.query(User).filter(
+        User.is_verified == False,
+        User.created_at < cutoff_time
+    ).all()
+    
+    count = len(expired_users)
+    expired_ids = [user.id for user in expired_users]
+    for user in expired_users:
+        db.delete(user)
+    
+    db.commit()
+    for user_id in expired_ids:
+        invalidate_principal(user_id)
+    
+    return {
+        "message": f"Cleaned up {count} expired unverified users",
+        "deleted_count": count
+    }
+
+@router.post("/problems/{problem_id}/images")
+async def upload_problem_image(
+    problem_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_verified_user)
+):
+    """Upload an image for a problem"""
+    from cloudinary_service import cloudinary_service
+    
+    # Check if Cloudinary is configured
+    if not cloudinary_service.is_configured():
+        raise HTTPException(status_code=500, detail="Image service not configured")
+    
+    # Check if problem exists and user owns it
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    if problem.author_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify this problem")
+    
+    # Check file type
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    
+    # Upload to Cloudinary
+    cloudinary_url = cloudinary_service.upload_problem_image(file, problem_id)
+    
+    if not cloudinary_url:
+        raise HTTPException(status_code=500, detail="Failed to upload image")
+    
+    # Store the image association in the database with Cloudinary URL
+    problem_image = ProblemImage(
+        problem_id=problem_id,
+        filename=cloudinary_url  # Store Cloudinary URL instead of filename
+    )
+    db.add(problem_image)
+    db.commit()
+    
+    return {
+        "message": "Image uploaded successfully",
+        "filename": cloudinary_url,
+        "file_path": cloudinary_url
+    }
+
+# Removed: /serve-problem-image/{filename} - Images now served directly from Cloudinary
+
+# Removed: /create-first-admin endpoint for security
+
+@router.delete("/problems/{problem_id}/images/{filename}")
+async def delete_problem_image(
+    problem_id: int,
+    filename: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_verified_user)
+):
+    """Delete a problem image"""
+    from cloudinary_service import cloudinary_service
+    
+    # Check if problem exists and user owns it
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    if problem.author_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify this problem")
+    
+    # Delete from database
+    problem_image = db.query(ProblemImage).filter(
+        ProblemImage.problem_id == problem_id,
+        ProblemImage.filename == filename
+    ).first()
+    
+    if not problem_image:
+        raise HTTPException(status_code=404, detail="Image not found in database")
+    
+    # Delete from Cloudinary if it's a Cloudinary URL
+    if filename.startswith("http"):
+        cloudinary_service.delete_image(filename)
+    
+    db.delete(problem_image)
+    db.commit()
+    
+    return {"message": "Image deleted successfully"}
+
+
+@router.post("/problems/{problem_id}/view")
+async def increment_view_count(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Count a view of a problem; buffered and written to the database in batches"""
+    view_count = view_counter.approximate_count(db, problem_id)
+    if view_count is None:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    
+    # Repeat views by the same user within the dedup window are not counted
+    counted = view_counter.record(problem_id, current_user.id)
+    
+    return {"message": "View count incremented", "view_count": view_count + (1 if counted else 0), "counted": counted}
+
+# Notification endpoints
+@router.get("/notifications", response_model=List[NotificationResponse])
+def get_notifications(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get all notifications for the current user"""
+    notifications = db.query(Notification).filter(
+        Notification.user_id == current_user.id
+    ).order_by(Notification.created_at.desc()).all()
+    
+    return notifications
+
+@router.get("/notifications/unread-count")
+def get_unread_notifications_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get count of unread notifications"""
+    count = db.query(Notification).filter(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    ).count()
+    
+    return {"unread_count": count}
+
+@router.put("/notifications/{notification_id}/read")
+def mark_notification_as_read(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark a notification as read"""
+    notification = db.query(Notification).filter(
+        Notification.id == notification_id,
+        Notification.user_id == current_user.id
+    ).first()
+    
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    
+    notification.is_read = True
+    db.commit()
+    
+    return {"message": "Notification marked as read"}
+
+@router.put("/notifications/mark-all-read")
+def mark_all_notifications_as_read(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark all notifications as read"""
+    db.query(Notification).filter(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    ).update({"is_read": True})
+    
+    db.commit()
+    return {"message": "All notifications marked as read"}
+
+@router.get("/notification-preferences", response_model=NotificationPreferencesResponse)
+def get_notification_preferences(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get user's notification preferences"""
+    preferences = db.query(NotificationPreferences).filter(
+        NotificationPreferences.user_id == current_user.id
+    ).first()
+    
+    if not preferences:
+        # Create default preferences if they don't exist
+        preferences = NotificationPreferences(
+            user_id=current_user.id,
+            email_likes=True,
+            email_comments=True,
+            email_follows=True,
+            email_marketing=current_user.marketing_emails,
+            email_forum_invitations=True,
+            email_forum_join_requests=True,
+            email_forum_deleted=True,
+            in_app_likes=True,
+            in_app_comments=True,
+            in_app_follows=True,
+            in_app_forum_deleted=True
+        )
+        db.add(preferences)
+        db.commit()
+        db.refresh(preferences)
+    else:
+        # Ensure email forum fields exist and are not NULL
+        if preferences.email_forum_invitations is None:
+            preferences.email_forum_invitations = True
+        if preferences.email_forum_join_requests is None:
+            preferences.email_forum_join_requests = True
+        if preferences.email_forum_deleted is None:
+            preferences.email_forum_deleted = True
+        if preferences.in_app_forum_deleted is None:
+            preferences.in_app_forum_deleted = True
+            
+        db.commit()
+    
+    return preferences
+
+@router.put("/notification-preferences", response_model=NotificationPreferencesResponse)
+def update_notification_preferences(
+    preferences: NotificationPreferencesCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Update user's notification preferences"""
+    db_preferences = db.query(NotificationPreferences).filter(
+        NotificationPreferences.user_id == current_user.id
+    ).first()
+    
+    if not db_preferences:
+        # Create new preferences
+        db_preferences = NotificationPreferences(
+            user_id=current_user.id,
+            **preferences.dict()
+        )
+        db.add(db_preferences)
+    else:
+        # Update existing preferences
+        for field, value in preferences.dict().items():
+            setattr(db_preferences, field, value)
+        db_preferences.updated_at = datetime.utcnow()
+    
+    # Also update marketing_emails in user table
+    current_user.marketing_emails = preferences.email_marketing
+    
+    db.commit()
+    db.refresh(db_preferences)
+    
+    return db_preferences
+
+# Follow/Following endpoints
+@router.get("/followers/{user_id}")
+def get_followers(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get list of users who follow the specified user"""
+    # Get all users who follow this user
+    followers = db.query(User).join(Follow, Follow.follower_id == User.id).filter(
+        Follow.following_id == user_id,
+        User.is_active == True
+    ).all()
+    
+    return followers
+
+@router.get("/following/{user_id}")
+def get_following(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get list of users that the specified user follows"""
+    # Get all users that this user follows
+    following = db.query(User).join(Follow, Follow.following_id == User.id).filter(
+        Follow.follower_id == user_id,
+        User.is_active == True
+    ).all()
+    
+    return following
+
+@router.get("/followers/count/{user_id}")
+def get_followers_count(
+    user_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get count of followers for a user"""
+    count = db.query(Follow).filter(Follow.following_id == user_id).count()
+    return {"followers_count": count}
+
+@router.get("/following/count/{user_id}")
+def get_following_count(
+    user_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get count of users that a user follows"""
+    count = db.query(Follow).filter(Follow.follower_id == user_id).count()
+    return {"following_count": count}
+
+
+# Forum Endpoints
+@router.post("/forums", response_model=ForumSchema)
+def create_forum(
+    forum: ForumCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a new forum"""
+    # Get forum settings
+    settings = get_settings_service().snapshot
+    
+    # Apply default forum visibility if not specified
+    default_visibility = settings.get_setting('default_forum_visibility', 'public')
+    if default_visibility == 'private':
+        forum.is_private = True
+    elif default_visibility == 'invite_only':
+        forum.is_private = True  # Invite-only forums are also private
+    
+    
+    # Apply max members limit from settings
+    max_members_limit = settings.get_int('max_members_per_forum', 100)
+    if forum.max_members and forum.max_members > max_members_limit:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Maximum members per forum is {max_members_limit}"
+        )
+    
+    # Validate tags (max 5 tags)
+    tags_list = []
+    if forum.tags:
+        tags_list = [tag.strip() for tag in forum.tags.split(',') if tag.strip()]
+        if len(tags_list) > 5:
+            raise HTTPException(status_code=400, detail="Maximum 5 tags allowed")
+    
+    # Create forum with approval status
+    db_forum = Forum(
+        title=forum.title,
+        description=forum.description,
+        creator_id=current_user.id,
+        is_private=forum.is_private,
+        max_members=forum.max_members or max_members_limit,
+        subject=forum.subject,
+        level=forum.level,
+        tags=forum.tags,
+        is_approved=True  # All forums are auto-approved
+    )
+    db.add(db_forum)
+    db.commit()
+    db.refresh(db_forum)
+    
+    # Add creator as a member with 'creator' role
+    membership = ForumMembership(
+        forum_id=db_forum.id,
+        user_id=current_user.id,
+        role="creator"
+    )
+    db.add(membership)
+    db.commit()
+    
+    # Check if forums require approval based on admin settings
+    requires_approval = settings.get_boolean('forum_requires_approval', False)
+    
+    # Return appropriate message based on approval status
+    if requires_approval:
+        return {
+            **db_forum.__dict__,
+            "message": "Forum created and is pending approval"
+        }
+    else:
+        return db_forum
+
+@router.put("/forums/{forum_id}", response_model=ForumSchema)
+def update_forum(
+    forum_id: int,
+    forum_update: ForumUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update a forum (creator only)"""
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Check if user is the creator or admin/moderator
+    if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+        raise HTTPException(status_code=403, detail="Only the forum creator can update the forum")
+    
+    # Validate tags if provided
+    if forum_update.tags:
+        tags_list = [tag.strip() for tag in forum_update.tags.split(',') if tag.strip()]
+        if len(tags_list) > 5:
+            raise HTTPException(status_code=400, detail="Maximum 5 tags allowed")
+    
+    # Update only provided fields
+    update_data = forum_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(forum, field, value)
+    
+    db.commit()
+    db.refresh(forum)
+    
+    return forum
+
+@router.get("/forums", response_model=List[ForumSchema])
+def get_forums(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    subject: Optional[List[str]] = Query(None),
+    level: Optional[str] = None,
+    tags: Optional[str] = None,
+    is_private: Optional[bool] = None,
+    sort: str = "created",
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get list of forums (all public forums and all private forums for discovery)
+
+    Member counts and the current user's membership and pending join request
+    come back in the same query. Filter by subject (repeatable), level, tags
+    (comma-separated, all must match) and privacy; sort by created (oldest
+    first), activity or members (both highest first).
+    """
+    query, columns = forum_directory_query(
+        db, current_user.id,
+        subjects=[value for value in subject or [] if value],
+        level=level,
+        tags=[tag.strip() for tag in (tags or "").split(",") if tag.strip()],
+        is_private=is_private
+    )
+    rows, next_cursor = forum_directory_page(query, columns, sort, limit, cursor=cursor, offset=skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    forums = []
+    for forum, member_count, user_role, has_pending_request in rows:
+        forum.member_count = member_count
+        forum.is_member = user_role is not None
+        forum.user_role = user_role
+        forum.has_pending_request = bool(has_pending_request)
+        forums.append(forum)
+    
+    return forums
+
+@router.get("/forums/my-forums", response_model=List[ForumSchema])
+def get_my_forums(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get forums where user is a member or creator"""
+    # Get forums where user is creator
+    created_forums = db.query(Forum).filter(Forum.creator_id == current_user.id).all()
+    
+    # Get forums where user is a member
+    membership_forums = db.query(Forum).join(ForumMembership).filter(
+        ForumMembership.user_id == current_user.id
+    ).all()
+    
+    # Combine and remove duplicates
+    all_forums = list(created_forums) + [f for f in membership_forums if f not in created_forums]
+    
+    return all_forums
+
+@router.get("/forums/{forum_id}", response_model=ForumSchema)
+def get_forum(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a specific forum"""
+    row = db.query(Forum, member_count_column()).filter(
+        Forum.id == forum_id,
+        ~Forum.id.in_(forums_being_deleted())
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    forum, member_count = row
+    
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if user is banned from this forum
+    if access.is_banned:
+        raise HTTPException(status_code=403, detail="You are banned from this forum")
+    
+    # Check if user can access this forum
+    if forum.is_private:
+        # Site admins/moderators have access to all forums
+        if current_user.role in ['admin', 'moderator']:
+            pass  # Allow access
+        elif not access.is_member:
+            raise HTTPException(status_code=403, detail="Access denied to private forum")
+    
+    forum.member_count = member_count
+    
+    return forum
+
+@router.post("/forums/{forum_id}/join")
+def join_forum(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Join a forum (public forums only)"""
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    if forum.is_private:
+        raise HTTPException(status_code=403, detail="Cannot join private forum directly")
+    
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if user is banned from this forum
+    if access.is_banned:
+        raise HTTPException(status_code=403, detail="You are banned from this forum")
+    
+    # Check if user is already a member
+    existing_membership = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.user_id == current_user.id
+    ).first()
+    
+    if existing_membership:
+        if existing_membership.is_active:
+            raise HTTPException(status_code=400, detail="Already a member of this forum")
+        else:
+            # Reactivate membership
+            existing_membership.is_active = True
+            db.commit()
+            invalidate_forum_access(forum_id, current_user.id, db)
+            return {"message": "Successfully joined forum"}
+    
+    # Check if forum is full
+    member_count = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.is_active == True
+    ).count()
+    
+    if member_count >= forum.max_members:
+        raise HTTPException(status_code=400, detail="Forum is full")
+    
+    # Add user as member
+    membership = ForumMembership(
+        forum_id=forum_id,
+        user_id=current_user.id,
+        role="member"
+    )
+    db.add(membership)
+    db.commit()
+    invalidate_forum_access(forum_id, current_user.id, db)
+    
+    return {"message": "Successfully joined forum"}
+
+
+@router.delete("/forums/{forum_id}/leave")
+def leave_forum(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Leave a forum"""
+    membership = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.user_id == current_user.id,
+        ForumMembership.is_active == True
+    ).first()
+    
+    if not membership:
+        raise HTTPException(status_code=404, detail="Not a member of this forum")
+    
+    if membership.role == "creator":
+        raise HTTPException(status_code=400, detail="Creator cannot leave forum")
+    
+    membership.is_active = False
+    db.commit()
+    invalidate_forum_access(forum_id, current_user.id, db)
+    forum_hub.emit(forum_id, forum_hub.MEMBER_REMOVED, {"user_id": current_user.id})
+    
+    return {"message": "Successfully left forum"}
+
+@router.get("/forums/{forum_id}/members", response_model=List[ForumMembershipSchema])
+def get_forum_members(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get members of a forum"""
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if user is banned from this forum
+    if access.is_banned:
+        raise HTTPException(status_code=403, detail="You are banned from this forum")
+    
+    # Check if user is a member (or admin/moderator)
+    if not access.is_member and not access.is_site_staff:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    members = db.query(ForumMembership).options(
+        selectinload(ForumMembership.user)
+    ).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.is_active == True
+    ).all()
+    
+    
+    return members
+
+@router.post("/forums/{forum_id}/problems", response_model=ProblemResponse)
+def create_forum_problem(
+    forum_id: int,
+    problem: ProblemCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a problem in a forum"""
+    # Check if user is a member (or admin/moderator)
+    if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+        raise HTTPException(status_code=403, detail="Must be a member to post problems")
+    
+    # Create problem with forum_id
+    problem_data = problem.dict()
+    problem_data['forum_id'] = forum_id
+    problem_data['author_id'] = current_user.id
+    
+    
+    db_problem = Problem(**problem_data)
+    db.add(db_problem)
+    db.commit()
+    db.refresh(db_problem)
+    
+    
+    # Update forum last activity
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    forum.last_activity = datetime.utcnow()
+    db.commit()
+    
+    # Get comment count and author for proper serialization
+    comment_count = db_problem.comment_count or 0
+    author = db.query(User).filter(User.id == db_problem.author_id).first()
+    
+    # Create proper response
+    return {
+        "id": db_problem.id,
+        "title": db_problem.title,
+        "description": db_problem.description,
+        "subject": db_problem.subject,
+        "level": db_problem.level,
+        "year": db_problem.year,
+        "tags": db_problem.tags,
+        "created_at": db_problem.created_at,
+        "author_id": db_problem.author_id,
+        "forum_id": db_problem.forum_id,
+        "comment_count": comment_count,
+        "author": {
+            "id": author.id,
+            "username": author.username,
+            "email": author.email,
+            "profile_picture": author.profile_picture,
+            "created_at": author.created_at
+        } if author else None
+    }
+
+@router.get("/forums/{forum_id}/problems", response_model=List[ProblemResponse])
+def get_forum_problems(
+    forum_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get problems from a forum"""
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if user is banned from this forum
+    if access.is_banned:
+        raise HTTPException(status_code=403, detail="You are banned from this forum")
+    
+    # Check if user is a member (or admin/moderator)
+    if not access.is_member and not access.is_site_staff:
+        raise HTTPException(status_code=403, detail="Must be a member to view problems")
+    
+    problems, next_cursor = keyset_page(
+        db.query(Problem).filter(Problem.forum_id == forum_id),
+        Problem.created_at, Problem.id, limit,
+        cursor=cursor, offset=skip
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    
+    # Serialize problems with comment counts and authors (grouped queries per page)
+    cards = load_problem_cards(db, problems)
+    result = []
+    for problem in problems:
+        card = cards[problem.id]
+        author = card["author"]
+        
+        result.append({
+            "id": problem.id,
+            "title": problem.title,
+            "description": problem.description,
+            "subject": problem.subject,
+            "level": problem.level,
+            "year": problem.year,
+            "tags": problem.tags,
+            "created_at": problem.created_at,
+            "author_id": problem.author_id,
+            "forum_id": problem.forum_id,
+            "comment_count": card["comment_count"],
+            "author": {
+                "id": author.id,
+                "username": author.username,
+                "email": author.email,
+                "profile_picture": author.profile_picture,
+                "created_at": author.created_at
+            } if author else None
+        })
+    
+    return result
+
+# Forum Message Endpoints
+def record_message_change(db: Session, forum_id: int, message_id: int, change_type: str):
+    """Add an entry to the forum's message change log; committed with the change itself"""
+    db.add(ForumMessageChange(forum_id=forum_id, message_id=message_id, change_type=change_type))
+
+REPLY_PREVIEW_LENGTH = 140
+
+def load_reply_summaries(db: Session, message_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Reply count and latest reply preview per message, from one grouped query over ForumReply"""
+    if not message_ids:
+        return {}
+    grouped = db.query(
+        ForumReply.parent_message_id.label("message_id"),
+        func.count(ForumReply.id).label("reply_count"),
+        func.max(ForumReply.id).label("latest_id")
+    ).filter(
+        ForumReply.parent_message_id.in_(message_ids),
+        ForumReply.is_deleted == False
+    ).group_by(ForumReply.parent_message_id).subquery()
+    
+    rows = db.query(grouped.c.message_id, grouped.c.reply_count, ForumReply, User.username).join(
+        ForumReply, ForumReply.id == grouped.c.latest_id
+    ).outerjoin(User, User.id == ForumReply.author_id).all()
+    
+    return {
+        message_id: {
+            "reply_count": reply_count,
+            "latest_reply": {
+                "id": reply.id,
+                "content": reply.content[:REPLY_PREVIEW_LENGTH],
+                "author_id": reply.author_id,
+                "author_username": username,
+                "created_at": reply.created_at
+            }
+        } for message_id, reply_count, reply, username in rows
+    }
+
+def serialize_messages(db: Session, messages: List[ForumMessage]) -> List[Dict[str, Any]]:
+    """Serialize a page of messages with their reply counts and latest replies"""
+    summaries = load_reply_summaries(db, [message.id for message in messages])
+    result = []
+    for message in messages:
+        data = ForumMessageSchema.model_validate(message).model_dump()
+        data.update(summaries.get(message.id, {"reply_count": 0, "latest_reply": None}))
+        result.append(data)
+    return result
+
+@router.post("/forums/{forum_id}/messages", response_model=ForumMessageSchema)
+def send_message(
+    forum_id: int,
+    message: ForumMessageCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Send a message to a forum"""
+    
+    # Check if user is a member (or admin/moderator)
+    if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+        raise HTTPException(status_code=403, detail="Must be a member to send messages")
+    
+    db_message = ForumMessage(
+        forum_id=forum_id,
+        author_id=current_user.id,
+        content=message.content,
+        message_type=message.message_type,
+        problem_id=message.problem_id
+    )
+    db.add(db_message)
+    db.commit()
+    db.refresh(db_message)
+    
+    # Update forum last activity
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    forum.last_activity = datetime.utcnow()
+    db.commit()
+    
+    forum_hub.emit(forum_id, "message.created", ForumMessageSchema.model_validate(db_message))
+    
+    return db_message
+
+@router.get("/forums/{forum_id}/messages", response_model=List[ForumMessageSchema])
+def get_messages(
+    forum_id: int,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get messages from a forum, newest first
+
+    after_id returns only messages newer than that id (oldest `limit` of them, so
+    clients can catch up page by page) and before_id scrolls back from it. The ETag
+    changes whenever a message is posted, edited, deleted or pinned; a matching
+    If-None-Match gets a 304 without loading any messages.
+    """
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if user is banned from this forum
+    if access.is_banned:
+        raise HTTPException(status_code=403, detail="You are banned from this forum")
+    
+    # Check if user is a member (or admin/moderator)
+    if not access.is_member and not access.is_site_staff:
+        raise HTTPException(status_code=403, detail="Must be a member to view messages")
+    
+    # Room version: newest message id and newest change id, read in one query
+    latest_message_id, latest_change_id = db.query(
+        db.query(func.max(ForumMessage.id)).filter(ForumMessage.forum_id == forum_id).scalar_subquery(),
+        db.query(func.max(ForumMessageChange.id)).filter(ForumMessageChange.forum_id == forum_id).scalar_subquery()
+    ).one()
+    etag = f'W/"{forum_id}-{latest_message_id or 0}-{latest_change_id or 0}"'
+    version_headers = {"ETag": etag, "X-Last-Change-Id": str(latest_change_id or 0)}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=version_headers)
+    response.headers.update(version_headers)
+    
+    query = db.query(ForumMessage).options(
+        selectinload(ForumMessage.author)
+    ).filter(ForumMessage.forum_id == forum_id)
+    
+    if after_id is not None:
+        if latest_message_id is None or latest_message_id <= after_id:
+            return []
+        messages = query.filter(ForumMessage.id > after_id).order_by(ForumMessage.id.asc()).limit(limit).all()
+        messages.reverse()
+        return serialize_messages(db, messages)
+    
+    if before_id is not None:
+        messages = query.filter(ForumMessage.id < before_id).order_by(ForumMessage.id.desc()).limit(limit).all()
+        return serialize_messages(db, messages)
+    
+    messages, next_cursor = keyset_page(
+        query, ForumMessage.created_at, ForumMessage.id, limit,
+        cursor=cursor, offset=skip
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    
+    return serialize_messages(db, messages)
+
+@router.get("/forums/{forum_id}/messages/reply-counts")
+def get_reply_counts(
+    forum_id: int,
+    message_ids: List[int] = Query(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Reply counts for several messages at once (?message_ids=1&message_ids=2...)"""
+    if len(message_ids) > 200:
+        raise HTTPException(status_code=400, detail="At most 200 message ids per request")
+    
+    # Check if user has access to forum (or is admin/moderator)
+    if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    rows = db.query(ForumMessage.id, ForumMessage.reply_count).filter(
+        ForumMessage.forum_id == forum_id,
+        ForumMessage.id.in_(message_ids)
+    ).all()
+    
+    return {"reply_counts": {message_id: reply_count for message_id, reply_count in rows}}
+
+@router.get("/forums/{forum_id}/messages/changes")
+def get_message_changes(
+    forum_id: int,
+    after: int = 0,
+    limit: int = 200,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Edits, deletions, pins and reply count changes after change id `after`, oldest first
+
+    Edited entries carry the message's current content, replied entries its reply count. Pass the returned
+    last_change_id (or get_messages' X-Last-Change-Id header) as `after` next time.
+    """
+    access = resolve_forum_access(db, forum_id, current_user)
+    if not access.is_site_staff and (not access.is_member or access.is_banned):
+        raise HTTPException(status_code=403, detail="Must be a member to view messages")
+    
+    rows = db.query(ForumMessageChange, ForumMessage).outerjoin(
+        ForumMessage, ForumMessage.id == ForumMessageChange.message_id
+    ).filter(
+        ForumMessageChange.forum_id == forum_id,
+        ForumMessageChange.id > after
+    ).order_by(ForumMessageChange.id.asc()).limit(limit).all()
+    
+    changes = []
+    for change, message in rows:
+        entry = {
+            "id": change.id,
+            "message_id": change.message_id,
+            "change_type": change.change_type,
+            "created_at": change.created_at
+        }
+        if change.change_type == "edited" and message:
+            entry.update({"content": message.content, "edited_at": message.edited_at})
+        elif change.change_type == "replied" and message:
+            entry["reply_count"] = message.reply_count
+        changes.append(entry)
+    
+    return {
+        "changes": changes,
+        "last_change_id": changes[-1]["id"] if changes else after,
+        "has_more": len(changes) == limit
+    }
+
+@router.put("/forums/{forum_id}/messages/{message_id}")
+def edit_message(
+    forum_id: int,
+    message_id: int,
+    new_content: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Edit a message"""
+    # Check if user is a member (or admin/moderator)
+    if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+        raise HTTPException(status_code=403, detail="Must be a member to edit messages")
+    
+    message = db.query(ForumMessage).filter(
+        ForumMessage.id == message_id,
+        ForumMessage.forum_id == forum_id,
+        ForumMessage.author_id == current_user.id
+    ).first()
+    
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    
+    message.content = new_content
+    message.is_edited = True
+    message.edited_at = datetime.utcnow()
+    record_message_change(db, forum_id, message_id, "edited")
+    db.commit()
+    
+    forum_hub.emit(forum_id, "message.edited", {
+        "id": message_id,
+        "content": new_content,
+        "is_edited": True,
+        "edited_at": message.edited_at
+    })
+    
+    return {"message": "Message updated successfully"}
+
+@router.delete("/forums/{forum_id}/messages/{message_id}")
+def delete_message(
+    forum_id: int,
+    message_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a message"""
+    # Check if user is a member (or admin/moderator)
+    if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+        raise HTTPException(status_code=403, detail="Must be a member to delete messages")
+    
+    # Find the message - admins can delete any message, others can only delete their own
+    if current_user.role in ['admin', 'moderator']:
+        message = db.query(ForumMessage).filter(
+            ForumMessage.id == message_id,
+            ForumMessage.forum_id == forum_id
+        ).first()
+    else:
+        message = db.query(ForumMessage).filter(
+            ForumMessage.id == message_id,
+            ForumMessage.forum_id == forum_id,
+            ForumMessage.author_id == current_user.id
+        ).first()
+    
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    
+    db.delete(message)
+    record_message_change(db, forum_id, message_id, "deleted")
+    db.commit()
+    
+    forum_hub.emit(forum_id, "message.deleted", {"id": message_id})
+    
+    return {"message": "Message deleted successfully"}
+
+# Forum Invitation Endpoints
+@router.post("/forums/{forum_id}/invite", response_model=ForumInvitationSchema)
+async def invite_user_to_forum(
+    forum_id: int,
+    invitation: ForumInvitationCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Invite a user to a forum (creator only)"""
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Check if current user is the creator or admin/moderator
+    if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+        raise HTTPException(status_code=403, detail="Only the forum creator can send invitations")
+    
+    # Check if invitee exists
+    invitee = db.query(User).filter(User.id == invitation.invitee_id).first()
+    if not invitee:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Check if user is already a member
+    existing_membership = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.user_id == invitation.invitee_id,
+        ForumMembership.is_active == True
+    ).first()
+    
+    if existing_membership:
+        raise HTTPException(status_code=400, detail="User is already a member of this forum")
+    
+    # Check if invitation already exists and is pending
+    existing_invitation = db.query(ForumInvitation).filter(
+        ForumInvitation.forum_id == forum_id,
+        ForumInvitation.invitee_id == invitation.invitee_id,
+        ForumInvitation.status == "pending"
+    ).first()
+    
+    if existing_invitation:
+        raise HTTPException(status_code=400, detail="Invitation already sent to this user")
+    
+    # Create invitation
+    db_invitation = ForumInvitation(
+        forum_id=forum_id,
+        inviter_id=current_user.id,
+        invitee_id=invitation.invitee_id,
+        status="pending"
+    )
+    db.add(db_invitation)
+    db.commit()
+    db.refresh(db_invitation)
+    
+    # Send notification to invitee
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        await notification_service.send_forum_invitation_notification(
+        user_id=invitation.invitee_id,
+        inviter_username=current_user.username,
+        forum_title=forum.title,
+        forum_id=forum.id,
+        invitation_id=db_invitation.id
+    )
+    
+    return db_invitation
+
+@router.get("/forums/{forum_id}/invitations", response_model=List[ForumInvitationSchema])
+def get_forum_invitations(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all invitations for a forum (creator only)"""
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Check if current user is the creator
+    if forum.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the forum creator can view invitations")
+    
+    invitations = db.query(ForumInvitation).options(
+        selectinload(ForumInvitation.invitee)
+    ).filter(ForumInvitation.forum_id == forum_id).all()
+    
+    return invitations
+
+@router.post("/forums/{forum_id}/invitations/{invitation_id}/accept")
+async def accept_forum_invitation(
+    forum_id: int,
+    invitation_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Accept a forum invitation"""
+    # Check if invitation exists and belongs to current user
+    invitation = db.query(ForumInvitation).filter(
+        ForumInvitation.id == invitation_id,
+        ForumInvitation.forum_id == forum_id,
+        ForumInvitation.invitee_id == current_user.id,
+        ForumInvitation.status == "pending"
+    ).first()
+    
+    if not invitation:
+        raise HTTPException(status_code=404, detail="Invitation not found or already processed")
+    
+    # Check if forum is full
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    member_count = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.is_active == True
+    ).count()
+    
+    if member_count >= forum.max_members:
+        raise HTTPException(status_code=400, detail="Forum is full")
+    
+    # Add user as member
+    membership = ForumMembership(
+        forum_id=forum_id,
+        user_id=current_user.id,
+        role="member"
+    )
+    db.add(membership)
+    
+    # Update invitation status
+    invitation.status = "accepted"
+    invitation.responded_at = datetime.utcnow()
+    
+    db.commit()
+    invalidate_forum_access(forum_id, current_user.id, db)
+    
+    # Send notification to inviter
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        await notification_service.send_forum_invitation_accepted_notification(
+        user_id=invitation.inviter_id,
+        invitee_username=current_user.username,
+        forum_title=forum.title
+    )
+    
+    return {"message": "Successfully joined the forum"}
+
+@router.post("/forums/{forum_id}/invitations/{invitation_id}/decline")
+def decline_forum_invitation(
+    forum_id: int,
+    invitation_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Decline a forum invitation"""
+    # Check if invitation exists and belongs to current user
+    invitation = db.query(ForumInvitation).filter(
+        ForumInvitation.id == invitation_id,
+        ForumInvitation.forum_id == forum_id,
+        ForumInvitation.invitee_id == current_user.id,
+        ForumInvitation.status == "pending"
+    ).first()
+    
+    if not invitation:
+        raise HTTPException(status_code=404, detail="Invitation not found or already processed")
+    
+    # Update invitation status
+    invitation.status = "declined"
+    invitation.responded_at = datetime.utcnow()
+    
+    db.commit()
+    
+    return {"message": "Invitation declined"}
+
+# Forum Join Request Endpoints
+@router.post("/forums/{forum_id}/request-join", response_model=ForumJoinRequestSchema)
+async def request_to_join_forum(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Request to join a private forum"""
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    if not forum.is_private:
+        raise HTTPException(status_code=400, detail="Forum is public, use join endpoint")
+    
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if user is banned from this forum
+    if access.is_banned:
+        raise HTTPException(status_code=403, detail="You are banned from this forum")
+    
+    # Check if user is already a member
+    existing_membership = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.user_id == current_user.id,
+        ForumMembership.is_active == True
+    ).first()
+    
+    if existing_membership:
+        raise HTTPException(status_code=400, detail="Already a member of this forum")
+    
+    # Check if request already exists and is pending
+    existing_request = db.query(ForumJoinRequest).filter(
+        ForumJoinRequest.forum_id == forum_id,
+        ForumJoinRequest.user_id == current_user.id,
+        ForumJoinRequest.status == "pending"
+    ).first()
+    
+    if existing_request:
+        raise HTTPException(status_code=400, detail="Join request already sent")
+    
+    # Create join request
+    db_request = ForumJoinRequest(
+        forum_id=forum_id,
+        user_id=current_user.id,
+        status="pending"
+    )
+    db.add(db_request)
+    db.commit()
+    db.refresh(db_request)
+    
+    # Send notification to forum creator
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        await notification_service.send_forum_join_request_notification(
+        user_id=forum.creator_id,
+        requester_username=current_user.username,
+        forum_title=forum.title,
+        forum_id=forum.id,
+        request_id=db_request.id
+    )
+    
+    return db_request
+
+@router.delete("/forums/{forum_id}/retract-request")
+def retract_join_request(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Retract a pending join request for a private forum"""
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Find the pending request
+    existing_request = db.query(ForumJoinRequest).filter(
+        ForumJoinRequest.forum_id == forum_id,
+        ForumJoinRequest.user_id == current_user.id,
+        ForumJoinRequest.status == "pending"
+    ).first()
+    
+    if not existing_request:
+        raise HTTPException(status_code=404, detail="No pending request found")
+    
+    # Delete the request
+    db.delete(existing_request)
+    
+    # Delete the notification for the forum creator
+    # Since we're deleting the request, we can safely delete all join request notifications
+    # for this forum creator (they should only have one per forum anyway)
+    db.query(Notification).filter(
+        Notification.user_id == forum.creator_id,
+        Notification.type == "forum_join_request"
+    ).delete()
+    
+    db.commit()
+    
+    return {"message": "Join request retracted successfully"}
+
+@router.get("/forums/{forum_id}/join-requests", response_model=List[ForumJoinRequestSchema])
+def get_forum_join_requests(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all join requests for a forum (creator only)"""
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Check if current user is the creator or admin/moderator
+    if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+        raise HTTPException(status_code=403, detail="Only the forum creator can view join requests")
+    
+    requests = db.query(ForumJoinRequest).options(
+        selectinload(ForumJoinRequest.user)
+    ).filter(ForumJoinRequest.forum_id == forum_id).all()
+    
+    return requests
+
+@router.post("/forums/{forum_id}/join-requests/{request_id}/accept")
+async def accept_join_request(
+    forum_id: int,
+    request_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Accept a join request (creator only)"""
+    # Check if forum exists and user is creator
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+        raise HTTPException(status_code=403, detail="Only the forum creator can accept requests")
+    
+    # Check if request exists
+    request = db.query(ForumJoinRequest).filter(
+        ForumJoinRequest.id == request_id,
+        ForumJoinRequest.forum_id == forum_id,
+        ForumJoinRequest.status == "pending"
+    ).first()
+    
+    if not request:
+        raise HTTPException(status_code=404, detail="Join request not found or already processed")
+    
+    # Check if forum is full
+    member_count = db.query(ForumMembership).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.is_active == True
+    ).count()
+    
+    if member_count >= forum.max_members:
+        raise HTTPException(status_code=400, detail="Forum is full")
+    
+    # Add user as member
+    membership = ForumMembership(
+        forum_id=forum_id,
+        user_id=request.user_id,
+        role="member"
+    )
+    db.add(membership)
+    
+    # Update request status
+    request.status = "accepted"
+    request.responded_at = datetime.utcnow()
+    
+    db.commit()
+    invalidate_forum_access(forum_id, request.user_id, db)
+    
+    # Send notification to requester
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        await notification_service.send_forum_join_request_accepted_notification(
+        user_id=request.user_id,
+        forum_title=forum.title
+    )
+    
+    return {"message": "Join request accepted"}
+
+@router.post("/forums/{forum_id}/join-requests/{request_id}/decline")
+async def decline_join_request(
+    forum_id: int,
+    request_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Decline a join request (creator only)"""
+    # Check if forum exists and user is creator
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+        raise HTTPException(status_code=403, detail="Only the forum creator can decline requests")
+    
+    # Check if request exists
+    request = db.query(ForumJoinRequest).filter(
+        ForumJoinRequest.id == request_id,
+        ForumJoinRequest.forum_id == forum_id,
+        ForumJoinRequest.status == "pending"
+    ).first()
+    
+    if not request:
+        raise HTTPException(status_code=404, detail="Join request not found or already processed")
+    
+    # Update request status
+    request.status = "declined"
+    request.responded_at = datetime.utcnow()
+    
+    db.commit()
+    
+    # Send notification to requester
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        await notification_service.send_forum_join_request_declined_notification(
+        user_id=request.user_id,
+        forum_title=forum.title
+    )
+    
+    return {"message": "Join request declined"}
+
+@router.get("/forums/{forum_id}/invite-users")
+def get_users_for_invitation(
+    forum_id: int,
+    search: str = "",
+    tab: str = "all",  # "all", "following", "followers"
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get users that can be invited to a forum"""
+    # Check if forum exists and user is creator
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+        raise HTTPException(status_code=403, detail="Only the forum creator can invite users")
+    
+    # Get existing members to exclude them
+    existing_members = db.query(ForumMembership.user_id).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.is_active == True
+    ).all()
+    existing_member_ids = [member[0] for member in existing_members]
+    
+    # Get existing invitations to exclude them
+    existing_invitations = db.query(ForumInvitation.invitee_id).filter(
+        ForumInvitation.forum_id == forum_id,
+        ForumInvitation.status == "pending"
+    ).all()
+    existing_invitation_ids = [invitation[0] for invitation in existing_invitations]
+    
+    # Build query based on tab
+    query = db.query(User).filter(
+        User.id != current_user.id,  # Don't include self
+        User.is_active == True,
+        User.is_verified == True,
+        ~User.id.in_(existing_member_ids)  # Only exclude existing members, not pending invitations
+    )
+    
+    if tab == "following":
+        # Only users that current user follows
+        following_ids = db.query(Follow.following_id).filter(Follow.follower_id == current_user.id).all()
+        following_ids = [f[0] for f in following_ids]
+        query = query.filter(User.id.in_(following_ids))
+    elif tab == "followers":
+        # Only users that follow current user
+        follower_ids = db.query(Follow.follower_id).filter(Follow.following_id == current_user.id).all()
+        follower_ids = [f[0] for f in follower_ids]
+        query = query.filter(User.id.in_(follower_ids))
+    # "all" tab includes all users
+    
+    # Apply search filter
+    if search:
+        query = query.filter(User.username.ilike(f"%{search}%"))
+    
+    # Limit to 5 results
+    users = query.limit(5).all()
+    
+    # Format response
+    results = []
+    for user in users:
+        # Check if user is already a member
+        is_member = user.id in existing_member_ids
+        
+        # Check if user has pending invitation
+        has_pending_invitation = user.id in existing_invitation_ids
+        
+        results.append({
+            "id": user.id,
+            "username": user.username,
+            "profile_picture": user.profile_picture,
+            "bio": user.bio,
+            "is_member": is_member,
+            "has_pending_invitation": has_pending_invitation
+        })
+    
+    return {"users": results}
+
+@router.delete("/forums/{forum_id}", status_code=202)
+async def delete_forum(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a forum (creator only)
+
+    Starts a background job that moves the forum's problems to their authors'
+    drafts and deletes everything else in small chunks; follow it at
+    GET /forums/{forum_id}/deletion.
+    """
+    # Check if forum exists
+    forum = db.query(Forum).filter(Forum.id == forum_id).first()
+    if not forum:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Check if user is the creator
+    if forum.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the forum creator can delete the forum")
+    
+    job = active_deletion_job(db, forum_id)
+    if job:
+        return {"message": "Forum deletion already in progress", "job": serialize_deletion_job(job)}
+    
+    # Get all forum members for notifications
+    member_user_ids = [user_id for user_id, in db.query(ForumMembership.user_id).filter(
+        ForumMembership.forum_id == forum_id,
+        ForumMembership.is_active == True,
+        ForumMembership.user_id != current_user.id  # Don't notify the creator
+    ).all()]
+    
+    now = datetime.utcnow()
+    job = ForumDeletionJob(
+        forum_id=forum_id,
+        forum_title=forum.title,
+        requested_by=current_user.id,
+        status="running",
+        started_at=now,
+        heartbeat_at=now
+    )
+    db.add(job)
+    
+    # Notify former members in the same transaction as the job; emails go out through the outbox
+    notification_service = NotificationService(db) if NotificationService else None
+    if notification_service:
+        notification_service.send_forum_deleted_notifications(
+            member_user_ids,
+            forum_title=forum.title,
+            creator_username=current_user.username,
+            commit=False
+        )
+    
+    db.commit()
+    db.refresh(job)
+    forum_deleter.start(job.id)
+    
+    return {"message": "Forum deletion started", "job": serialize_deletion_job(job)}
+
+@router.get("/forums/{forum_id}/deletion")
+def get_forum_deletion_status(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Progress of the latest deletion job of a forum (the requester or site admins)"""
+    job = db.query(ForumDeletionJob).filter(
+        ForumDeletionJob.forum_id == forum_id
+    ).order_by(ForumDeletionJob.id.desc()).first()
+    if not job or (job.requested_by != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="No deletion job for this forum")
+    
+    return serialize_deletion_job(job)
+
+
+# ==================== DRAFT ENDPOINTS ====================
+
+@router.post("/drafts", response_model=DraftResponse)
+def create_draft(
+    draft: DraftCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a new draft"""
+    db_draft = Draft(
+        title=draft.title,
+        description=draft.description,
+        subject=draft.subject,
+        level=draft.level,
+        year=draft.year,
+        tags=draft.tags,
+        author_id=current_user.id
+    )
+    db.add(db_draft)
+    db.commit()
+    db.refresh(db_draft)
+    
+    return db_draft
+
+@router.get("/drafts", response_model=List[DraftResponse])
+def get_user_drafts(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all drafts for the current user"""
+    drafts = db.query(Draft).filter(Draft.author_id == current_user.id).order_by(Draft.updated_at.desc()).all()
+    return drafts
+
+@router.get("/drafts/{draft_id}", response_model=DraftResponse)
+def get_draft(
+    draft_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a specific draft by ID"""
+    draft = db.query(Draft).filter(
+        Draft.id == draft_id,
+        Draft.author_id == current_user.id
+    ).first()
+    
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    
+    return draft
+
+@router.put("/drafts/{draft_id}", response_model=DraftResponse)
+def update_draft(
+    draft_id: int,
+    draft_update: DraftUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update an existing draft"""
+    draft = db.query(Draft).filter(
+        Draft.id == draft_id,
+        Draft.author_id == current_user.id
+    ).first()
+    
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    
+    # Update only provided fields
+    update_data = draft_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(draft, field, value)
+    
+    draft.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(draft)
+    
+    return draft
+
+@router.delete("/drafts/{draft_id}")
+def delete_draft(
+    draft_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a draft"""
+    draft = db.query(Draft).filter(
+        Draft.id == draft_id,
+        Draft.author_id == current_user.id
+    ).first()
+    
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    
+    db.delete(draft)
+    db.commit()
+    
+    return {"message": "Draft deleted successfully"}
+
+@router.post("/drafts/{draft_id}/publish", response_model=ProblemResponse)
+def publish_draft(
+    draft_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Publish a draft as a new problem"""
+    draft = db.query(Draft).filter(
+        Draft.id == draft_id,
+        Draft.author_id == current_user.id
+    ).first()
+    
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    
+    # Create new problem from draft
+    problem_data = {
+        "title": draft.title,
+        "description": draft.description,
+        "subject": draft.subject,
+        "level": draft.level,
+        "year": draft.year,
+        "tags": draft.tags,
+        "author_id": current_user.id
+    }
+    
+    db_problem = Problem(**problem_data)
+    db.add(db_problem)
+    db.flush()
+    feed_service.fan_out(db, db_problem)
+    db.commit()
+    db.refresh(db_problem)
+    trending_service.mark_dirty(db_problem.id)
+    
+    # Delete the draft after publishing
+    db.delete(draft)
+    db.commit()
+    
+    # Get comment count and author for response
+    comment_count = db_problem.comment_count or 0
+    author = db.query(User).filter(User.id == db_problem.author_id).first()
+    
+    return {
+        "id": db_problem.id,
+        "title": db_problem.title,
+        "description": db_problem.description,
+        "subject": db_problem.subject,
+        "level": db_problem.level,
+        "year": db_problem.year,
+        "tags": db_problem.tags,
+        "created_at": db_problem.created_at,
+        "author_id": db_problem.author_id,
+        "forum_id": db_problem.forum_id,
+        "comment_count": comment_count,
+        "author": {
+            "id": author.id,
+            "username": author.username,
+            "email": author.email,
+            "profile_picture": author.profile_picture,
+            "created_at": author.created_at
+        } if author else None
+    }
+
+
+
+# Password Change Endpoints
+@router.post("/verify-password")
+def verify_user_password(
+    request: PasswordVerifyRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Verify user's current password"""
+    try:
+        # Verify old password
+        if not verify_password(request.old_password, current_user.password_hash):
+            raise HTTPException(status_code=400, detail="Incorrect password")
+        
+        return {"message": "Password verified successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to verify password")
+
+@router.post("/change-password")
+def change_password(
+    request: PasswordChangeRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Change user password after verifying old password"""
+    try:
+        # Verify old password
+        if not verify_password(request.old_password, current_user.password_hash):
+            raise HTTPException(status_code=400, detail="Incorrect old password")
+        
+        # Hash new password
+        new_hashed_password = hash_password(request.new_password)
+        
+        # Update password in database
+        current_user.password_hash = new_hashed_password
+        db.commit()
+        
+        return {"message": "Password changed successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to change password")
+
+@router.post("/forgot-password")
+def forgot_password(
+    request: ForgotPasswordRequest,
+    db: Session = Depends(get_db)
+):
+    """Send password reset email"""
+    try:
+        # Check if user exists
+        user = db.query(User).filter(User.email == request.email).first()
+        if not user:
+            # Don't reveal if email exists or not for security
+            return {"message": "If the email exists, a password reset link has been sent"}
+        
+        # Generate reset token (simple UUID for now)
+        import uuid
+        reset_token = str(uuid.uuid4())
+        
+        # Store token in database
+        user.reset_token = reset_token
+        db.commit()
+        
+        # TODO: Send email with reset link
+        # For now, just return the token (in production, send via email)
+        reset_link = f"http://localhost:3000/reset-password?token={reset_token}"
+        
+        return {
+            "message": "Password reset link sent to your email",
+            "reset_link": reset_link  # Remove this in production
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to send reset email")
+
+@router.post("/reset-password")
+def reset_password(
+    request: ResetPasswordRequest,
+    db: Session = Depends(get_db)
+):
+    """Reset password using token from email"""
+    try:
+        # Find user with reset token
+        user = db.query(User).filter(User.reset_token == request.token).first()
+        if not user:
+            raise HTTPException(status_code=400, detail="Invalid or expired reset token")
+        
+        # Hash new password
+        new_hashed_password = hash_password(request.new_password)
+        
+        # Update password and clear reset token
+        user.password_hash = new_hashed_password
+        user.reset_token = None
+        db.commit()
+        
+        return {"message": "Password reset successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to reset password")
+
+# Online Status Endpoints
+@router.post("/forums/{forum_id}/online")
+def mark_user_online(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark user as online in a forum"""
+    access = resolve_forum_access(db, forum_id, current_user)
+    
+    # Check if forum exists
+    if not access.forum_exists:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    
+    # Check if user is a member
+    if not access.is_member:
+        raise HTTPException(status_code=403, detail="Not a member of this forum")
+    
+    presence_service.heartbeat(forum_id, current_user.id)
+    
+    return {"message": "Marked as online"}
+
+@router.delete("/forums/{forum_id}/online")
+def mark_user_offline(
+    forum_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Mark user as offline in a forum"""
+    presence_service.leave(forum_id, current_user.id)
+    
+    return {"message": "Marked as offline"}
+
+@router.get("/forums/{forum_id}/online-count")
+def get_online_count(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get count of online users in a forum"""
+    # Check if user is a member
+    if not resolve_forum_access(db, forum_id, current_user).is_member:
+        raise HTTPException(status_code=403, detail="Not a member of this forum")
+    
+    # Users with a heartbeat in the last minute; expired entries are swept in the background
+    return {"online_count": presence_service.online_count(forum_id)}
+
+@router.post("/forums/{forum_id}/typing")
+def set_typing_status(
+    forum_id: int,
+    is_typing: bool = Form(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Set user's typing status in a forum"""
+    # Check if user is a member of the forum
+    if not resolve_forum_access(db, forum_id, current_user).has_membership:
+        raise HTTPException(status_code=403, detail="Not a member of this forum")
+    
+    presence_service.set_typing(forum_id, current_user.id, current_user.username, is_typing)
+    
+    return {"message": "Typing status updated"}
+
+@router.get("/forums/{forum_id}/typing")
+def get_typing_users(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get users currently typing in a forum"""
+    # Check if user is a member of the forum
+    if not resolve_forum_access(db, forum_id, current_user).has_membership:
+        raise HTTPException(status_code=403, detail="Not a member of this forum")
+    
+    # Users typing within the last 5 seconds, excluding the current user
+    return {"typing_users": presence_service.typing_users(forum_id, exclude_user_id=current_user.id)}
+
+
+@router.post("/forums/{forum_id}/messages/{message_id}/pin")
+async def pin_message(
+    forum_id: int,
+    message_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Pin a message in the forum (only forum creator can pin)"""
+    try:
+        # Check if user is the forum creator
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user has permission to pin messages
+        if not check_forum_permission(db, forum_id, current_user, 'pin'):
+            raise HTTPException(status_code=403, detail="You don't have permission to pin messages")
+        
+        # Get the message
+        message = db.query(ForumMessage).filter(
+            ForumMessage.id == message_id,
+            ForumMessage.forum_id == forum_id
+        ).first()
+        
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        
+        # Unpin any currently pinned message
+        pinned_ids = [row[0] for row in db.query(ForumMessage.id).filter(
+            ForumMessage.forum_id == forum_id,
+            ForumMessage.is_pinned == True,
+            ForumMessage.id != message_id
+        ).all()]
+        db.query(ForumMessage).filter(
+            ForumMessage.forum_id == forum_id,
+            ForumMessage.is_pinned == True
+        ).update({"is_pinned": False})
+        for pinned_id in pinned_ids:
+            record_message_change(db, forum_id, pinned_id, "unpinned")
+        
+        # Pin the new message
+        message.is_pinned = True
+        record_message_change(db, forum_id, message_id, "pinned")
+        db.commit()
+        
+        await forum_hub.publish(forum_id, "message.pinned", {"id": message_id})
+        
+        return {"message": "Message pinned successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/forums/{forum_id}/messages/unpin")
+async def unpin_message(
+    forum_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Unpin the currently pinned message (only forum creator can unpin)"""
+    try:
+        # Check if user is the forum creator
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user has permission to unpin messages
+        if not check_forum_permission(db, forum_id, current_user, 'pin'):
+            raise HTTPException(status_code=403, detail="You don't have permission to unpin messages")
+        
+        # Unpin the currently pinned message
+        pinned_ids = [row[0] for row in db.query(ForumMessage.id).filter(
+            ForumMessage.forum_id == forum_id,
+            ForumMessage.is_pinned == True
+        ).all()]
+        result = db.query(ForumMessage).filter(
+            ForumMessage.forum_id == forum_id,
+            ForumMessage.is_pinned == True
+        ).update({"is_pinned": False})
+        
+        if result == 0:
+            raise HTTPException(status_code=404, detail="No pinned message found")
+        
+        for pinned_id in pinned_ids:
+            record_message_change(db, forum_id, pinned_id, "unpinned")
+        db.commit()
+        
+        await forum_hub.publish(forum_id, "message.unpinned")
+        
+        return {"message": "Message unpinned successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/forums/{forum_id}/messages/{message_id}")
+async def delete_message(
+    forum_id: int,
+    message_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a message (only forum creator can delete)"""
+    try:
+        # Check if user is the forum creator
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user has permission to delete messages
+        if not check_forum_permission(db, forum_id, current_user, 'moderate'):
+            raise HTTPException(status_code=403, detail="You don't have permission to delete messages")
+        
+        # Get the message
+        message = db.query(ForumMessage).filter(
+            ForumMessage.id == message_id,
+            ForumMessage.forum_id == forum_id
+        ).first()
+        
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        
+        # Delete the message
+        db.delete(message)
+        record_message_change(db, forum_id, message_id, "deleted")
+        db.commit()
+        
+        await forum_hub.publish(forum_id, "message.deleted", {"id": message_id})
+        
+        return {"message": "Message deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/forums/{forum_id}/members/{member_id}")
+async def kick_member(
+    forum_id: int,
+    member_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Kick a member from the forum (only forum creator can kick)"""
+    try:
+        # Check if user is the forum creator
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user has permission to kick members
+        if not check_forum_permission(db, forum_id, current_user, 'kick'):
+            raise HTTPException(status_code=403, detail="You don't have permission to kick members")
+        
+        # Get the membership
+        membership = db.query(ForumMembership).filter(
+            ForumMembership.id == member_id,
+            ForumMembership.forum_id == forum_id
+        ).first()
+        
+        if not membership:
+            raise HTTPException(status_code=404, detail="Member not found")
+        
+        # Can't kick the creator
+        if membership.user_id == forum.creator_id:
+            raise HTTPException(status_code=403, detail="Cannot kick the forum creator")
+        
+        # Remove the membership
+        member_user_id = membership.user_id
+        db.delete(membership)
+        db.commit()
+        invalidate_forum_access(forum_id, member_user_id, db)
+        await forum_hub.remove_member(forum_id, member_user_id)
+        
+        return {"message": "Member kicked successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/forums/{forum_id}/members/{member_id}/ban")
+async def ban_member(
+    forum_id: int,
+    member_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ban a member from the forum (only forum creator can ban)"""
+    try:
+        # Check if user is the forum creator
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+            raise HTTPException(status_code=403, detail="Only forum creator can ban members")
+        
+        # Get the membership
+        membership = db.query(ForumMembership).filter(
+            ForumMembership.id == member_id,
+            ForumMembership.forum_id == forum_id
+        ).first()
+        
+        if not membership:
+            raise HTTPException(status_code=404, detail="Member not found")
+        
+        # Can't ban the creator
+        if membership.user_id == forum.creator_id:
+            raise HTTPException(status_code=403, detail="Cannot ban the forum creator")
+        
+        # Mark as banned
+        membership.is_banned = True
+        membership.is_active = False
+        db.commit()
+        invalidate_forum_access(forum_id, membership.user_id, db)
+        await forum_hub.remove_member(forum_id, membership.user_id)
+        
+        return {"message": "Member banned successfully"}
+    except HTTPException:
+        raise
+
+@router.get("/forums/{forum_id}/banned-members")
+async def get_banned_members(
+    forum_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all banned members of a forum (creator only)"""
+    try:
+        # Get forum
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user is the creator
+        if forum.creator_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Only the forum creator can view banned members")
+        
+        # Get banned members with user details
+        banned_memberships = db.query(ForumMembership).options(
+            selectinload(ForumMembership.user)
+        ).filter(
+            ForumMembership.forum_id == forum_id,
+            ForumMembership.is_banned == True
+        ).all()
+        
+        return banned_memberships
+    except HTTPException:
+        raise
+
+@router.post("/forums/{forum_id}/members/{member_id}/unban")
+async def unban_member(
+    forum_id: int,
+    member_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Unban a member from a forum (creator only)"""
+    try:
+        # Get forum
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user is the creator or admin/moderator
+        if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+            raise HTTPException(status_code=403, detail="Only the forum creator can unban members")
+        
+        # Get membership
+        membership = db.query(ForumMembership).filter(
+            ForumMembership.id == member_id,
+            ForumMembership.forum_id == forum_id
+        ).first()
+        
+        if not membership:
+            raise HTTPException(status_code=404, detail="Membership not found")
+        
+        if not membership.is_banned:
+            raise HTTPException(status_code=400, detail="Member is not banned")
+        
+        # Unban the member
+        membership.is_banned = False
+        membership.is_active = True
+        db.commit()
+        invalidate_forum_access(forum_id, membership.user_id, db)
+        
+        return {"message": "Member unbanned successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/forums/{forum_id}/members/{member_id}/assign-role")
+async def assign_member_role(
+    forum_id: int,
+    member_id: int,
+    role_data: dict,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Assign a role to a forum member (creator only)"""
+    try:
+        # Get forum
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        # Check if user is the creator or admin/moderator
+        if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+            raise HTTPException(status_code=403, detail="Only the forum creator can assign roles")
+        
+        # Get membership
+        membership = db.query(ForumMembership).filter(
+            ForumMembership.id == member_id,
+            ForumMembership.forum_id == forum_id
+        ).first()
+        
+        if not membership:
+            raise HTTPException(status_code=404, detail="Membership not found")
+        
+        # Can't change creator's role
+        if membership.user_id == forum.creator_id:
+            raise HTTPException(status_code=403, detail="Cannot change creator's role")
+        
+        # Validate role
+        valid_roles = ['member', 'moderator', 'helper']
+        new_role = role_data.get('role')
+        if new_role not in valid_roles:
+            raise HTTPException(status_code=400, detail="Invalid role")
+        
+        # Update role
+        membership.role = new_role
+        db.commit()
+        invalidate_forum_access(forum_id, membership.user_id, db)
+        
+        return {"message": f"Role updated to {new_role}"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Thread/Reply Endpoints
+@router.get("/forums/{forum_id}/messages/{message_id}/replies", response_model=List[ForumReplySchema])
+async def get_message_replies(
+    forum_id: int,
+    message_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all replies to a specific message"""
+    try:
+        # Check if user has access to forum (or is admin/moderator)
+        if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        # Get replies
+        replies = db.query(ForumReply).options(
+            selectinload(ForumReply.author)
+        ).filter(
+            ForumReply.forum_id == forum_id,
+            ForumReply.parent_message_id == message_id,
+            ForumReply.is_deleted == False
+        ).order_by(ForumReply.created_at.asc()).all()
+        
+        return replies
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/forums/{forum_id}/messages/{message_id}/replies", response_model=ForumReplySchema)
+async def create_message_reply(
+    forum_id: int,
+    message_id: int,
+    reply_data: ForumReplyCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a reply to a message"""
+    try:
+        # Check if user has access to forum (or is admin/moderator)
+        if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        # Verify parent message exists
+        parent_message = db.query(ForumMessage).filter(
+            ForumMessage.id == message_id,
+            ForumMessage.forum_id == forum_id
+        ).first()
+        
+        if not parent_message:
+            raise HTTPException(status_code=404, detail="Parent message not found")
+        
+        # Create reply
+        reply = ForumReply(
+            content=reply_data.content,
+            author_id=current_user.id,
+            forum_id=forum_id,
+            parent_message_id=message_id
+        )
+        
+        db.add(reply)
+        db.query(ForumMessage).filter(ForumMessage.id == message_id).update(
+            {ForumMessage.reply_count: ForumMessage.reply_count + 1}, synchronize_session=False
+        )
+        # Moves get_messages' ETag, whose pages embed reply counts
+        record_message_change(db, forum_id, message_id, "replied")
+        db.commit()
+        db.refresh(reply)
+        
+        # Load author data
+        db.refresh(reply)
+        reply.author = current_user
+        
+        await forum_hub.publish(forum_id, "reply.created", ForumReplySchema.model_validate(reply))
+        
+        return reply
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/forums/{forum_id}/replies/{reply_id}")
+async def delete_reply(
+    forum_id: int,
+    reply_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a reply (author or moderator/creator only)"""
+    try:
+        # Check if user has access to forum (or is admin/moderator)
+        access = resolve_forum_access(db, forum_id, current_user)
+        if not access.is_member and not access.is_site_staff:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        # Get reply
+        reply = db.query(ForumReply).filter(
+            ForumReply.id == reply_id,
+            ForumReply.forum_id == forum_id
+        ).first()
+        
+        if not reply:
+            raise HTTPException(status_code=404, detail="Reply not found")
+        
+        # Check permissions (author or moderator/creator)
+        user_role = access.role
+        can_delete = (
+            reply.author_id == current_user.id or  # Author can delete their own reply
+            user_role == 'creator' or  # Creator can delete any reply
+            (user_role == 'moderator' and access.can('moderate'))  # Moderator can delete
+        )
+        
+        if not can_delete:
+            raise HTTPException(status_code=403, detail="You don't have permission to delete this reply")
+        
+        # Soft delete
+        if not reply.is_deleted:
+            db.query(ForumMessage).filter(ForumMessage.id == reply.parent_message_id).update(
+                {ForumMessage.reply_count: ForumMessage.reply_count - 1}, synchronize_session=False
+            )
+            record_message_change(db, forum_id, reply.parent_message_id, "replied")
+        reply.is_deleted = True
+        db.commit()
+        
+        await forum_hub.publish(forum_id, "reply.deleted", {"id": reply_id, "parent_message_id": reply.parent_message_id})
+        
+        return {"message": "Reply deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/forums/{forum_id}/messages/{message_id}/reply-count")
+async def get_reply_count(
+    forum_id: int,
+    message_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get reply count for a message"""
+    try:
+        # Check if user has access to forum (or is admin/moderator)
+        if current_user.role not in ['admin', 'moderator'] and not resolve_forum_access(db, forum_id, current_user).is_member:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        # Get reply count
+        count = db.query(ForumMessage.reply_count).filter(
+            ForumMessage.id == message_id,
+            ForumMessage.forum_id == forum_id
+        ).scalar()
+        
+        return {"reply_count": count or 0}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/forums/{forum_id}")
+async def update_forum(
+    forum_id: int,
+    forum_data: ForumUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Update forum settings (only forum creator can update)"""
+    try:
+        # Check if user is the forum creator
+        forum = db.query(Forum).filter(Forum.id == forum_id).first()
+        if not forum:
+            raise HTTPException(status_code=404, detail="Forum not found")
+        
+        if forum.creator_id != current_user.id and current_user.role not in ['admin', 'moderator']:
+            raise HTTPException(status_code=403, detail="Only forum creator can update forum")
+        
+        # Update forum fields
+        if forum_data.name is not None:
+            forum.name = forum_data.name
+        if forum_data.description is not None:
+            forum.description = forum_data.description
+        if forum_data.is_private is not None:
+            forum.is_private = forum_data.is_private
+        
+        db.commit()
+        
+        return {"message": "Forum updated successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Report Endpoints
+@router.post("/reports/comment")
+async def report_comment(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Report a comment"""
+    # Check if reports are enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('reports_enabled', True):
+        raise HTTPException(status_code=403, detail="Reports are temporarily disabled")
+    
+    try:
+        body = await request.json()
+        comment_id = body.get("comment_id")
+        category = body.get("category")
+        description = body.get("description")
+        
+        if not comment_id:
+            raise HTTPException(status_code=400, detail="Comment ID is required")
+        
+        # Check if comment exists
+        comment = db.query(Comment).filter(Comment.id == comment_id).first()
+        if not comment:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        
+        # Create report
+        report = SiteReport(
+            reporter_id=current_user.id,
+            report_type="comment",
+            target_id=comment_id,
+            reason=category,
+            description=description,
+            status="pending"
+        )
+        
+        db.add(report)
+        db.commit()
+        db.refresh(report)
+        
+        return {"message": "Report submitted successfully", "report_id": report.id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reports/message")
+async def report_message(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Report a forum message"""
+    # Check if reports are enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('reports_enabled', True):
+        raise HTTPException(status_code=403, detail="Reports are temporarily disabled")
+    
+    try:
+        body = await request.json()
+        message_id = body.get("message_id")
+        category = body.get("category")
+        description = body.get("description")
+        
+        if not message_id:
+            raise HTTPException(status_code=400, detail="Message ID is required")
+        
+        # Check if message exists
+        message = db.query(ForumMessage).filter(ForumMessage.id == message_id).first()
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        
+        # Create report
+        report = SiteReport(
+            reporter_id=current_user.id,
+            report_type="message",
+            target_id=message_id,
+            reason=category,
+            description=description,
+            status="pending"
+        )
+        
+        db.add(report)
+        db.commit()
+        db.refresh(report)
+        
+        return {"message": "Report submitted successfully", "report_id": report.id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reports/user")
+async def report_user(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Report a user"""
+    # Check if reports are enabled
+    settings_service = get_settings_service()
+    feature_settings = settings_service.get_feature_settings()
+    
+    if not feature_settings.get('reports_enabled', True):
+        raise HTTPException(status_code=403, detail="Reports are temporarily disabled")
+    
+    try:
+        body = await request.json()
+        user_id = body.get("user_id")
+        category = body.get("category")
+        description = body.get("description")
+        
+        if not user_id:
+            raise HTTPException(status_code=400, detail="User ID is required")
+        
+        # Check if user exists
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        # Prevent self-reporting
+        if user_id == current_user.id:
+            raise HTTPException(status_code=400, detail="Cannot report yourself")
+        
+        # Create report
+        report = SiteReport(
+            reporter_id=current_user.id,
+            report_type="user",
+            target_id=user_id,
+            reason=category,
+            description=description,
+            status="pending"
+        )
+        
+        db.add(report)
+        db.commit()
+        db.refresh(report)
+        
+        return {"message": "Report submitted successfully", "report_id": report.id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/reports/my-reports")
+async def get_my_reports(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get current user's submitted reports"""
+    try:
+        reports = db.query(SiteReport).filter(
+            SiteReport.reporter_id == current_user.id
+        ).order_by(SiteReport.created_at.desc()).all()
+        
+        return {"reports": reports}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+import jwt
+from dotenv import load_dotenv
+
+load_dotenv()  # loads .env
+
+SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
+JWT_EXP_HOURS = int(os.getenv("JWT_EXP_HOURS", 24))
+
+SECRET_KEY = "your-secret-key"  # store in .env later
+
+# bcrypt cost factor; existing hashes with another cost are rehashed on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads hashing at once (bcrypt releases the GIL) and how many more may wait before requests get a 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool
+
+    A hash or verify costs 100-300 ms of CPU. Doing it here keeps it off the
+    event loop and off the request threadpool, and caps how many run at once;
+    when too many are waiting, callers get a 503 instead of an ever-growing queue.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.max_pending_seen = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _run(self, queued_at: float, func, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            self.wait_seconds += started - queued_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_seconds += time.perf_counter() - started
+
+    def submit(self, func, *args):
+        """Queue one bcrypt call; raises a 503 when the queue is full"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Server is busy, please try again shortly")
+            self.pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        try:
+            future = self._executor.submit(self._run, time.perf_counter(), func, *args)
+        except Exception:
+            self._release()
+            raise
+        # Also runs when a waiting caller is cancelled and the job never starts
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def _verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        try:
+            verified, new_hash = pwd_context.verify_and_update(password, hashed)
+        except (ValueError, TypeError):
+            return False, None  # Not a bcrypt hash
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return verified, new_hash
+
+    def hash(self, password: str) -> str:
+        return self.submit(pwd_context.hash, password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(pwd_context.hash, password))
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Whether the password matches, plus a new hash when the stored one uses another cost"""
+        return self.submit(self._verify_and_update, password, hashed).result()
+
+    async def verify_and_update_async(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self.submit(self._verify_and_update, password, hashed))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": BCRYPT_ROUNDS,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "max_pending": self.max_pending,
+                "max_pending_seen": self.max_pending_seen,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+                "avg_run_ms": round(self.run_seconds / self.completed * 1000, 1) if self.completed else 0.0
+            }
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+def verify_password(password: str, hashed: str) -> bool:
+    return password_hasher.verify_and_update(password, hashed)[0]
+
+def create_jwt(user_id: int) -> str:
+    payload = {
+        "user_id": user_id,
+        "exp": datetime.utcnow() + timedelta(hours=24)  # token expires in 24h
+    }
+    token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    # PyJWT returns a str in modern versions
+    return token
+
+
+
+
@@ -0,0 +1,369 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import httpx
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query, Session
+from database import session_scope
+from models import EmailCampaign, User
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+# Recipients per SendGrid request, one personalization each (SendGrid allows up to 1000)
+BATCH_SIZE = int(os.getenv("CAMPAIGN_BATCH_SIZE", "500"))
+# Batches in flight at once
+CONCURRENCY = int(os.getenv("CAMPAIGN_CONCURRENCY", "4"))
+# Recipients per second across all batches of a campaign
+RATE_PER_SECOND = float(os.getenv("CAMPAIGN_RATE_PER_SECOND", "100"))
+MAX_RETRIES = 3
+# A 'sending' campaign without a checkpoint for this long was abandoned by its process and may be resumed
+STALE_SECONDS = 300
+# How often a sending process refreshes heartbeat_at, whether or not its checkpoint moves
+HEARTBEAT_SECONDS = 30
+RESUME_CHECK_SECONDS = 60
+
+
+def audience_query(db: Session, target_audience: str, target_user_ids: Optional[List[int]] = None) -> Query:
+    """Active users a campaign with this audience goes to"""
+    query = db.query(User).filter(User.is_active == True)
+    if target_audience == "all":
+        return query
+    if target_audience == "marketing_opt_in":
+        return query.filter(User.marketing_emails == True)
+    if target_audience == "admins":
+        return query.filter(User.role == "admin")
+    if target_audience == "moderators":
+        return query.filter(User.role == "moderator")
+    if target_audience == "users":
+        return query.filter(User.role == "user")
+    if target_audience == "specific" and target_user_ids:
+        return query.filter(User.id.in_(target_user_ids))
+    return query.filter(User.id.in_([]))
+
+
+class RateLimiter:
+    """Token bucket: acquire(n) waits until n more sends fit within the rate"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: int):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                await asyncio.sleep((n - self._tokens) / self.rate)
+
+
+class RecipientStream:
+    """(id, email) of a campaign's remaining recipients in id order, one keyset page per batch
+
+    Each page is its own short query, so no transaction (or cursor) stays open
+    while a long campaign sends; memory stays at one batch whatever the audience size.
+    """
+
+    def __init__(self, target_audience: str, target_user_ids: Optional[List[int]], after_id: Optional[int]):
+        self.target_audience = target_audience
+        self.target_user_ids = target_user_ids
+        self.after_id = after_id
+
+    def next_batch(self) -> List[Tuple[int, str]]:
+        with session_scope() as db:
+            query = audience_query(db, self.target_audience, self.target_user_ids).with_entities(User.id, User.email)
+            if self.after_id is not None:
+                query = query.filter(User.id > self.after_id)
+            rows = query.order_by(User.id).limit(BATCH_SIZE).all()
+        if rows:
+            self.after_id = rows[-1][0]
+        return [(user_id, email) for user_id, email in rows]
+
+
+class CampaignProgress:
+    """Sent/failed counts and the resume checkpoint of one campaign
+
+    Batches finish out of order; the checkpoint only advances past batches
+    that finished along with every batch before them, so a resumed campaign
+    re-sends at most the batches that were in flight.
+    """
+
+    def __init__(self, last_user_id: Optional[int], sent: int, failed: int):
+        self.last_user_id = last_user_id
+        self.sent = sent
+        self.failed = failed
+        self._batches = deque()
+
+    def add(self, last_user_id: int) -> list:
+        batch = [last_user_id, 0, 0, False]
+        self._batches.append(batch)
+        return batch
+
+    def complete(self, batch: list, sent: int, failed: int) -> bool:
+        """Record a finished batch; True when the checkpoint moved"""
+        batch[1:] = [sent, failed, True]
+        moved = False
+        while self._batches and self._batches[0][3]:
+            last_user_id, sent, failed, _ = self._batches.popleft()
+            self.last_user_id = last_user_id
+            self.sent += sent
+            self.failed += failed
+            moved = True
+        return moved
+
+
+class CampaignStartError(Exception):
+    """A campaign could not be prepared for sending; retrying would fail the same way"""
+
+
+class CampaignSender:
+    """Sends email campaigns as background jobs, one asyncio task per campaign"""
+
+    def __init__(self, email_service=None):
+        self._email_service = email_service
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    @property
+    def email_service(self):
+        if self._email_service is None:
+            from email_service import email_service
+            self._email_service = email_service
+        return self._email_service
+
+    def claim(self, db: Session, campaign_id: int) -> bool:
+        """Mark a draft or abandoned campaign as being sent by this process; commits"""
+        now = datetime.utcnow()
+        claimed = db.query(EmailCampaign).filter(
+            EmailCampaign.id == campaign_id,
+            or_(
+                EmailCampaign.status == "draft",
+                and_(
+                    EmailCampaign.status == "sending",
+                    or_(EmailCampaign.heartbeat_at == None, EmailCampaign.heartbeat_at < now - timedelta(seconds=STALE_SECONDS))
+                )
+            )
+        ).update({
+            "status": "sending",
+            "heartbeat_at": now,
+            "started_at": func.coalesce(EmailCampaign.started_at, now)
+        }, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    def start(self, campaign_id: int):
+        """Run a claimed campaign in the background"""
+        if campaign_id in self._tasks:
+            return
+        task = asyncio.create_task(self.run(campaign_id))
+        self._tasks[campaign_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(campaign_id, None))
+
+    def is_running(self, campaign_id: int) -> bool:
+        return campaign_id in self._tasks
+
+    async def run(self, campaign_id: int):
+        try:
+            await self._send_campaign(campaign_id)
+        except asyncio.CancelledError:
+            raise  # Shutdown: the campaign stays 'sending' and is resumed once its heartbeat goes stale
+        except CampaignStartError as e:
+            # Not left 'sending', or resume_abandoned would re-claim it and fail again every STALE_SECONDS
+            print(f"Email campaign {campaign_id} failed to start: {e}")
+            await asyncio.get_running_loop().run_in_executor(None, self._fail, campaign_id)
+        except Exception as e:
+            print(f"Email campaign {campaign_id} stopped: {e}")
+
+    async def _send_campaign(self, campaign_id: int):
+        loop = asyncio.get_running_loop()
+        try:
+            with session_scope() as db:
+                campaign = db.query(EmailCampaign).filter(EmailCampaign.id == campaign_id).first()
+                if campaign is None or campaign.status != "sending":
+                    return
+                subject = campaign.subject
+                html_content = self.email_service.create_campaign_email(campaign.content)
+                stream = RecipientStream(campaign.target_audience, campaign.target_user_ids, campaign.last_user_id)
+                progress = CampaignProgress(campaign.last_user_id, campaign.sent_count or 0, campaign.failed_count or 0)
+        except OperationalError:
+            raise  # Database unavailable: resumed once it is back
+        except Exception as e:
+            raise CampaignStartError(str(e)) from e
+
+        limiter = RateLimiter(RATE_PER_SECOND, BATCH_SIZE)
+        slots = asyncio.Semaphore(CONCURRENCY)
+        in_flight = set()
+        limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+        # A slow head batch (e.g. SendGrid backoff) holds the checkpoint back; the heartbeat
+        # must not wait for it, or another process would resume a campaign that is still sending
+        heartbeat = asyncio.create_task(self._keep_alive(campaign_id))
+        try:
+            async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+                while True:
+                    recipients = await loop.run_in_executor(None, stream.next_batch)
+                    if not recipients:
+                        break
+                    await slots.acquire()
+                    await limiter.acquire(len(recipients))
+                    batch = progress.add(recipients[-1][0])
+                    task = asyncio.create_task(self._deliver(client, campaign_id, subject, html_content, recipients, batch, progress, slots))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                if in_flight:
+                    await asyncio.gather(*in_flight)
+        finally:
+            heartbeat.cancel()
+
+        await loop.run_in_executor(None, self._finish, campaign_id, progress)
+
+    async def _deliver(self, client, campaign_id: int, subject: str, html_content: str,
+                       recipients: List[Tuple[int, str]], batch: list, progress: CampaignProgress, slots: asyncio.Semaphore):
+        try:
+            emails = [email for _, email in recipients]
+            sent = await self._send_batch(client, subject, html_content, emails)
+        finally:
+            slots.release()
+        if progress.complete(batch, sent, len(recipients) - sent):
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._checkpoint, campaign_id, progress.last_user_id, progress.sent, progress.failed
+            )
+
+    async def _send_batch(self, client, subject: str, html_content: str, emails: List[str]) -> int:
+        """Send one batch; returns how many recipients were accepted"""
+        api_key = self.email_service.sendgrid_api_key()
+        if api_key and await self._send_batch_sendgrid(client, api_key, subject, html_content, emails):
+            return len(emails)
+        # Like deliver_email: SMTP-only deployments still have a key (the SMTP password), so a
+        # rejected or exhausted SendGrid batch goes out over SMTP instead of counting as failed
+        return await self._send_batch_smtp(subject, html_content, emails)
+
+    async def _send_batch_sendgrid(self, client, api_key: str, subject: str, html_content: str, emails: List[str]) -> bool:
+        """One SendGrid request for the whole batch, retrying rate limits and server errors"""
+        payload = {
+            # One personalization per recipient so nobody sees the other addresses
+            "personalizations": [{"to": [{"email": email}]} for email in emails],
+            "from": {
+                "email": self.email_service.email_from_address or "albyte.dev@gmail.com",
+                "name": self.email_service.email_from_name or "Science Pioneers"
+            },
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}]
+        }
+        headers = {"Authorization": f"Bearer {api_key}"}
+        for attempt in range(MAX_RETRIES):
+            delay = 2 ** attempt
+            try:
+                response = await client.post(SENDGRID_URL, headers=headers, json=payload)
+                if response.status_code == 202:
+                    return True
+                print(f"ERROR: SendGrid campaign batch failed with status {response.status_code}: {response.text[:200]}")
+                # Only rate limiting and server errors are worth retrying
+                if response.status_code != 429 and response.status_code < 500:
+                    return False
+                delay = float(response.headers.get("Retry-After") or delay)
+            except Exception as e:
+                print(f"ERROR: SendGrid campaign batch request failed: {e}")
+            await asyncio.sleep(delay)
+        return False
+
+    async def _send_batch_smtp(self, subject: str, html_content: str, emails: List[str]) -> int:
+        """Fallback when SendGrid is not configured or failed: one SMTP message per recipient in worker threads"""
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(None, self.email_service.send_smtp_email, email, subject, html_content)
+            for email in emails
+        ])
+        return sum(1 for ok in results if ok)
+
+    async def _keep_alive(self, campaign_id: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                await loop.run_in_executor(None, self._heartbeat, campaign_id)
+            except Exception as e:
+                print(f"Email campaign {campaign_id} heartbeat error: {e}")
+
+    def _heartbeat(self, campaign_id: int):
+        with session_scope() as db:
+            db.query(EmailCampaign).filter(
+                EmailCampaign.id == campaign_id,
+                EmailCampaign.status == "sending"
+            ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+
+    def _checkpoint(self, campaign_id: int, last_user_id: int, sent: int, failed: int):
+        with session_scope() as db:
+            # Checkpoints may be written out of order, never move one backwards
+            db.query(EmailCampaign).filter(
+                EmailCampaign.id == campaign_id,
+                or_(EmailCampaign.last_user_id == None, EmailCampaign.last_user_id < last_user_id)
+            ).update({
+                "last_user_id": last_user_id,
+                "sent_count": sent,
+                "failed_count": failed,
+                "heartbeat_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+    def _finish(self, campaign_id: int, progress: CampaignProgress):
+        with session_scope() as db:
+            campaign = db.query(EmailCampaign).filter(EmailCampaign.id == campaign_id).first()
+            if campaign is None:
+                return
+            campaign.sent_count = progress.sent
+            campaign.failed_count = progress.failed
+            campaign.last_user_id = progress.last_user_id
+            campaign.heartbeat_at = datetime.utcnow()
+            if progress.sent > 0:
+                campaign.status = "sent"
+                campaign.sent_at = datetime.utcnow()
+            else:
+                campaign.status = "failed"
+            db.commit()
+
+    def _fail(self, campaign_id: int):
+        with session_scope() as db:
+            db.query(EmailCampaign).filter(
+                EmailCampaign.id == campaign_id,
+                EmailCampaign.status == "sending"
+            ).update({"status": "failed", "heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+
+    def _claim_abandoned(self) -> List[int]:
+        with session_scope() as db:
+            stale_ids = [campaign_id for campaign_id, in db.query(EmailCampaign.id).filter(
+                EmailCampaign.status == "sending",
+                or_(EmailCampaign.heartbeat_at == None, EmailCampaign.heartbeat_at < datetime.utcnow() - timedelta(seconds=STALE_SECONDS))
+            ).all()]
+            return [campaign_id for campaign_id in stale_ids if self.claim(db, campaign_id)]
+
+    async def resume_abandoned(self):
+        """Periodically pick up campaigns whose sending process died, from their last checkpoint"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                for campaign_id in await loop.run_in_executor(None, self._claim_abandoned):
+                    print(f"Resuming email campaign {campaign_id}")
+                    self.start(campaign_id)
+            except Exception as e:
+                print(f"Email campaign resume error: {e}")
+            await asyncio.sleep(RESUME_CHECK_SECONDS)
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global campaign sender instance
+campaign_sender = CampaignSender()
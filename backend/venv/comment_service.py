@@ -0,0 +1,83 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session, joinedload
+from models import Comment, User
+
+
+def comment_author(author: Optional[User]) -> Optional[Dict[str, Any]]:
+    """Public author fields embedded in comment threads"""
+    if not author:
+        return None
+    return {
+        "id": author.id,
+        "username": author.username,
+        "profile_picture": author.profile_picture,
+        "bio": author.bio,
+        "role": author.role,
+        "is_active": author.is_active,
+        "is_verified": author.is_verified,
+        "is_banned": author.is_banned,
+        "created_at": author.created_at
+    }
+
+
+def serialize_comment(comment: Comment) -> Dict[str, Any]:
+    """Serialize a comment without its replies"""
+    return {
+        "id": comment.id,
+        "text": comment.text,
+        "author_id": comment.author_id,
+        "problem_id": comment.problem_id,
+        "parent_comment_id": comment.parent_comment_id,
+        "is_solution": comment.is_solution,
+        "created_at": comment.created_at,
+        "updated_at": comment.updated_at,
+        "author": comment_author(comment.author)
+    }
+
+
+def load_comment_tree(
+    db: Session,
+    problem_id: int,
+    depth: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> List[Dict[str, Any]]:
+    """Load a problem's threaded comments with one query and assemble the tree in memory.
+
+    Top-level comments are newest first and replies oldest first. `limit`/`offset`
+    page the top-level threads; `depth` keeps that many levels of replies below
+    them (0 = top-level only) and marks trimmed comments with has_more_replies.
+    """
+    # Every reply carries its problem_id, so one indexed query returns the whole thread
+    comments = db.query(Comment).options(joinedload(Comment.author)).filter(
+        Comment.problem_id == problem_id
+    ).order_by(Comment.created_at.asc(), Comment.id.asc()).all()
+
+    children = defaultdict(list)
+    roots = []
+    for comment in comments:
+        if comment.parent_comment_id is None:
+            roots.append(comment)
+        else:
+            children[comment.parent_comment_id].append(comment)
+
+    roots.reverse()
+    if offset:
+        roots = roots[offset:]
+    if limit is not None:
+        roots = roots[:limit]
+
+    def build(comment: Comment, level: int) -> Dict[str, Any]:
+        node = serialize_comment(comment)
+        replies = children.get(comment.id, [])
+        if depth is not None and level >= depth:
+            node["replies"] = []
+            if replies:
+                node["has_more_replies"] = True
+        else:
+            node["replies"] = [build(reply, level + 1) for reply in replies]
+        return node
+
+    # Replies whose parent was deleted are unreachable from a root and are not returned
+    return [build(root, 0) for root in roots]
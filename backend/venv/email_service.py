@@ -0,0 +1,226 @@
+import asyncio
+import smtplib
+import os
+import base64
+import requests
+import threading
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from datetime import datetime, timedelta
+import random
+import string
+from typing import Optional
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from smtp_pool import SMTPConnectionPool
+# Removed database imports to fix circular import issue
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+# Pooled SMTP sessions shared by every sending thread
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_MAX_IDLE_SECONDS = int(os.getenv("SMTP_MAX_IDLE_SECONDS", "120"))
+
+# Email templates are compiled once, when the module is imported
+template_env = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.abspath(__file__)), "email_templates")),
+    autoescape=select_autoescape(["html"])
+)
+TEMPLATES = {
+    name: template_env.get_template(f"{name}.html")
+    for name in ("verification", "account_deletion", "notification")
+}
+
+class EmailService:
+    def __init__(self):
+        # Email configuration loaded from environment variables
+        self.smtp_server = os.getenv('SMTP_SERVER') or os.getenv('SMTP_HOST')
+        self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
+        self.sender_email = os.getenv('SMTP_USERNAME')
+        self.sender_password = os.getenv('SMTP_PASSWORD')
+        self.smtp_use_tls = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+        self.email_from_name = os.getenv('EMAIL_FROM_NAME', 'Science Pioneers')
+        self.email_from_address = os.getenv('EMAIL_FROM_ADDRESS', 'albyte.dev@gmail.com')
+        self._smtp_pool: Optional[SMTPConnectionPool] = None
+        self._smtp_pool_lock = threading.Lock()
+    
+    def is_configured(self):
+        """Check if email service is properly configured"""
+        return bool(self.smtp_server and self.sender_email and self.sender_password)
+        
+        
+    def generate_verification_code(self) -> str:
+        """Generate a 6-digit verification code"""
+        return ''.join(random.choices(string.digits, k=6))
+    
+    def get_verification_expiry(self) -> datetime:
+        """Get verification code expiry time (15 minutes from now)"""
+        return datetime.utcnow() + timedelta(minutes=15)
+    
+    def create_verification_email(self, username: str, verification_code: str) -> str:
+        """Create HTML email template for verification"""
+        return TEMPLATES["verification"].render(username=username, verification_code=verification_code)
+    
+    def create_account_deletion_email(self, username: str, verification_code: str) -> str:
+        """Create HTML email template for account deletion verification"""
+        return TEMPLATES["account_deletion"].render(username=username, verification_code=verification_code)
+    
+    def create_notification_email(self, body: str) -> str:
+        """Create HTML email template for notifications"""
+        return TEMPLATES["notification"].render(body=body)
+    
+    def create_campaign_email(self, content: str) -> str:
+        """Create HTML email template for campaigns (admin-written content is kept as HTML)"""
+        return TEMPLATES["notification"].render(body=Markup(content))
+    
+    @property
+    def smtp_pool(self) -> SMTPConnectionPool:
+        """SMTP connection pool, created on first use"""
+        with self._smtp_pool_lock:
+            if self._smtp_pool is None:
+                self._smtp_pool = SMTPConnectionPool(
+                    self.smtp_server, self.smtp_port, self.sender_email, self.sender_password,
+                    use_tls=self.smtp_use_tls, size=SMTP_POOL_SIZE, max_idle_seconds=SMTP_MAX_IDLE_SECONDS
+                )
+            return self._smtp_pool
+    
+    def close(self):
+        """Close pooled SMTP sessions (on shutdown)"""
+        if self._smtp_pool is not None:
+            self._smtp_pool.close()
+    
+    def sendgrid_api_key(self) -> Optional[str]:
+        """SendGrid API key (the SMTP password doubles as one when SENDGRID_API_KEY is unset)"""
+        return os.getenv('SENDGRID_API_KEY', self.sender_password)
+    
+    def send_smtp_email(self, to_email: str, subject: str, html_content: str) -> bool:
+        """Send an HTML email over a pooled SMTP session (blocking, safe to call from worker threads)"""
+        try:
+            # Validate SMTP settings before attempting connection
+            if not self.sender_email or not self.sender_password or not self.smtp_server:
+                print(f"SMTP not configured: email={bool(self.sender_email)}, password={bool(self.sender_password)}, server={self.smtp_server}")
+                return False
+            
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = subject
+            msg['From'] = f"{self.email_from_name} <{self.sender_email}>" if self.email_from_name else self.sender_email
+            msg['To'] = to_email
+            msg.attach(MIMEText(html_content, 'html'))
+            
+            self.smtp_pool.send_message(msg)
+            return True
+            
+        except smtplib.SMTPAuthenticationError as e:
+            print(f"SMTP Authentication failed: {e}")
+            return False
+        except smtplib.SMTPConnectError as e:
+            print(f"SMTP Connection failed: {e}")
+            return False
+        except smtplib.SMTPException as e:
+            print(f"SMTP Error: {e}")
+            return False
+        except Exception as e:
+            print(f"SMTP Email sending failed: {e}")
+            print(f"DEBUG: SMTP settings - server: {self.smtp_server}, port: {self.smtp_port}, user: {self.sender_email}")
+            return False
+    
+    def send_sendgrid_email(self, to_email: str, subject: str, html_content: str) -> bool:
+        """Send email using SendGrid REST API (blocking, safe to call from worker threads)"""
+        try:
+            api_key = self.sendgrid_api_key()
+            if not api_key:
+                print("ERROR: SendGrid API key not found")
+                return False
+            
+            headers = {
+                'Authorization': f'Bearer {api_key}',
+                'Content-Type': 'application/json'
+            }
+            data = {
+                "personalizations": [
+                    {
+                        "to": [{"email": to_email}],
+                        "subject": subject
+                    }
+                ],
+                "from": {
+                    "email": self.email_from_address or "albyte.dev@gmail.com",
+                    "name": self.email_from_name or "Science Pioneers"
+                },
+                "content": [
+                    {
+                        "type": "text/html",
+                        "value": html_content
+                    }
+                ]
+            }
+            
+            response = requests.post(SENDGRID_URL, headers=headers, json=data, timeout=30)
+            
+            if response.status_code == 202:
+                return True
+            print(f"ERROR: SendGrid API failed with status {response.status_code}")
+            print(f"ERROR: Response: {response.text}")
+            return False
+                
+        except requests.exceptions.Timeout:
+            print("ERROR: SendGrid API request timed out")
+            return False
+        except requests.exceptions.RequestException as e:
+            print(f"ERROR: SendGrid API request failed: {e}")
+            return False
+        except Exception as e:
+            print(f"ERROR: SendGrid API error: {e}")
+            return False
+    
+    def deliver_email(self, to_email: str, subject: str, html_content: str) -> bool:
+        """Send via SendGrid, falling back to SMTP (blocking, safe to call from worker threads)"""
+        if self.send_sendgrid_email(to_email, subject, html_content):
+            print(f"SUCCESS: Email sent via SendGrid API to {to_email}")
+            return True
+        print("DEBUG: SendGrid API failed, trying SMTP fallback...")
+        if self.send_smtp_email(to_email, subject, html_content):
+            print(f"SUCCESS: Email sent via SMTP to {to_email}")
+            return True
+        return False
+    
+    def deliver_notification_email(self, to_email: str, subject: str, body: str) -> bool:
+        """Render and send a notification email (blocking, safe to call from worker threads)"""
+        return self.deliver_email(to_email, subject, self.create_notification_email(body))
+    
+    async def _in_thread(self, func, *args) -> bool:
+        # Sending blocks on the network, keep it off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def send_verification_email(self, to_email: str, username: str, verification_code: str) -> bool:
+        """Send verification email to user"""
+        try:
+            print(f"DEBUG: Attempting to send verification email to {to_email}")
+            html_content = self.create_verification_email(username, verification_code)
+            return await self._in_thread(self.deliver_email, to_email, "🔬 Science Pioneers - Email Verification", html_content)
+        except Exception as e:
+            print(f"ERROR: Email sending failed: {e}")
+            return False
+    
+    async def send_account_deletion_email(self, to_email: str, username: str, verification_code: str) -> bool:
+        """Send account deletion verification email to user"""
+        html_content = self.create_account_deletion_email(username, verification_code)
+        success = await self._in_thread(self.send_smtp_email, to_email, "🔬 Science Pioneers - Account Deletion Verification", html_content)
+        if success:
+            print(f"Account deletion email sent successfully to {to_email}")
+        return success
+    
+    async def send_email_via_sendgrid_api(self, to_email: str, subject: str, html_content: str) -> bool:
+        """Send email using SendGrid REST API (more reliable than SMTP)"""
+        return await self._in_thread(self.send_sendgrid_email, to_email, subject, html_content)
+    
+    async def send_notification_email(self, to_email: str, subject: str, body: str) -> bool:
+        """Send notification email to user"""
+        try:
+            print(f"DEBUG: Attempting to send notification email to {to_email}")
+            return await self._in_thread(self.deliver_notification_email, to_email, subject, body)
+        except Exception as e:
+            print(f"ERROR: Notification email failed: {e}")
+            return False
+
+# Create global email service instance
+email_service = EmailService()
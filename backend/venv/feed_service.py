@@ -0,0 +1,123 @@
+import os
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import func, insert, literal, or_, and_, select
+from sqlalchemy.orm import Session
+from cache_service import cache_service
+from models import FeedEntry, Follow, Problem
+from pagination import encode_cursor, keyset_page
+
+# Entries kept per timeline; older ones are trimmed periodically
+FEED_MAX_ENTRIES = int(os.getenv("FEED_MAX_ENTRIES", "500"))
+# Authors with more followers than this are not fanned out on write (it would
+# insert one row per follower); their problems are read at request time instead
+FANOUT_MAX_FOLLOWERS = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", "2000"))
+PULL_AUTHORS_TTL_SECONDS = 300
+TRIM_BATCH_SIZE = 100
+
+
+def pull_author_ids(db: Session) -> Set[int]:
+    """Authors whose problems are pulled at read time instead of fanned out"""
+    cached = cache_service.get("feed:pull_authors")
+    if cached is not None:
+        return cached
+    author_ids = {author_id for author_id, in db.query(Follow.following_id).group_by(
+        Follow.following_id
+    ).having(func.count(Follow.id) > FANOUT_MAX_FOLLOWERS).all()}
+    cache_service.set("feed:pull_authors", author_ids, PULL_AUTHORS_TTL_SECONDS)
+    return author_ids
+
+
+def fan_out(db: Session, problem: Problem) -> None:
+    """Add a new problem to the timelines of its author's followers. Does not commit"""
+    if problem.forum_id is not None or problem.author_id in pull_author_ids(db):
+        return
+    followers = select(
+        Follow.follower_id,
+        literal(problem.id),
+        literal(problem.author_id),
+        literal(problem.created_at or datetime.utcnow())
+    ).where(Follow.following_id == problem.author_id, Follow.follower_id.isnot(None))
+    db.execute(insert(FeedEntry).from_select(["user_id", "problem_id", "author_id", "created_at"], followers))
+
+
+def add_author(db: Session, user_id: int, author_id: int) -> None:
+    """Backfill a new follow: the author's latest problems go into the follower's timeline. Does not commit"""
+    if author_id in pull_author_ids(db):
+        return
+    latest = select(
+        literal(user_id), Problem.id, Problem.author_id, func.coalesce(Problem.created_at, datetime.utcnow())
+    ).where(
+        Problem.author_id == author_id,
+        Problem.forum_id.is_(None),
+        ~Problem.id.in_(select(FeedEntry.problem_id).where(FeedEntry.user_id == user_id))
+    ).order_by(Problem.created_at.desc()).limit(FEED_MAX_ENTRIES)
+    db.execute(insert(FeedEntry).from_select(["user_id", "problem_id", "author_id", "created_at"], latest))
+
+
+def remove_author(db: Session, user_id: int, author_id: int) -> None:
+    """Drop an unfollowed author's problems from a timeline. Does not commit"""
+    db.query(FeedEntry).filter(
+        FeedEntry.user_id == user_id,
+        FeedEntry.author_id == author_id
+    ).delete(synchronize_session=False)
+
+
+def feed_page(db: Session, user_id: int, limit: int, cursor: Optional[str] = None) -> Tuple[List[Problem], Optional[str]]:
+    """One page of a user's following feed, newest first
+
+    Normally a single range read of the user's timeline. Followed authors on
+    the pull path are read from problems with the same keyset and merged in.
+    """
+    timeline = db.query(Problem).join(FeedEntry, FeedEntry.problem_id == Problem.id).filter(FeedEntry.user_id == user_id)
+    problems, next_cursor = keyset_page(timeline, FeedEntry.created_at, FeedEntry.problem_id, limit, cursor=cursor)
+
+    pull_authors = pull_author_ids(db)
+    if not pull_authors:
+        return problems, next_cursor
+    followed = [author_id for author_id, in db.query(Follow.following_id).filter(
+        Follow.follower_id == user_id,
+        Follow.following_id.in_(pull_authors)
+    ).all()]
+    if not followed:
+        return problems, next_cursor
+
+    pulled, pulled_cursor = keyset_page(
+        db.query(Problem).filter(Problem.author_id.in_(followed), Problem.forum_id.is_(None)),
+        Problem.created_at, Problem.id, limit, cursor=cursor
+    )
+    # Entries written before an author moved to the pull path may appear in both
+    merged = {problem.id: problem for problem in problems + pulled}
+    ordered = sorted(merged.values(), key=lambda problem: (problem.created_at or datetime.min, problem.id), reverse=True)
+    page = ordered[:limit]
+    if page and (next_cursor or pulled_cursor or len(ordered) > limit):
+        last = page[-1]
+        next_cursor = encode_cursor({"created_at": last.created_at.isoformat() if last.created_at else None, "id": last.id})
+    else:
+        next_cursor = None
+    return page, next_cursor
+
+
+def trim(db: Session) -> int:
+    """Delete timeline entries beyond FEED_MAX_ENTRIES per user. Returns rows deleted"""
+    deleted = 0
+    user_ids = [user_id for user_id, in db.query(FeedEntry.user_id).group_by(
+        FeedEntry.user_id
+    ).having(func.count(FeedEntry.id) > FEED_MAX_ENTRIES).all()]
+    for start in range(0, len(user_ids), TRIM_BATCH_SIZE):
+        for user_id in user_ids[start:start + TRIM_BATCH_SIZE]:
+            # The oldest entry that is kept
+            boundary = db.query(FeedEntry.created_at, FeedEntry.problem_id).filter(
+                FeedEntry.user_id == user_id
+            ).order_by(FeedEntry.created_at.desc(), FeedEntry.problem_id.desc()).offset(FEED_MAX_ENTRIES - 1).first()
+            if boundary is None:
+                continue
+            deleted += db.query(FeedEntry).filter(
+                FeedEntry.user_id == user_id,
+                or_(
+                    FeedEntry.created_at < boundary.created_at,
+                    and_(FeedEntry.created_at == boundary.created_at, FeedEntry.problem_id < boundary.problem_id)
+                )
+            ).delete(synchronize_session=False)
+        db.commit()
+    return deleted
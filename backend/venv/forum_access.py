@@ -0,0 +1,100 @@
+import os
+from typing import Dict, Optional, Tuple
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from cache_service import cache_service
+from models import Forum, ForumMembership, User
+
+# How long a resolved (user, forum) membership is reused before it is read again
+FORUM_ACCESS_TTL_SECONDS = int(os.getenv("FORUM_ACCESS_TTL_SECONDS", "30"))
+
+# Permission hierarchy: creator > moderator > helper > member
+ROLE_PERMISSIONS = {
+    "moderator": {"moderate", "pin", "kick"},
+    "helper": {"pin"},
+    "member": set()
+}
+
+
+class ForumAccess:
+    """A user's standing in one forum, resolved from a single query"""
+
+    __slots__ = ("forum_id", "user_id", "forum_exists", "role", "is_active", "is_banned", "is_creator", "is_site_staff")
+
+    def __init__(self, forum_id: int, user_id: int, forum_exists: bool, role: Optional[str],
+                 is_active: bool, is_banned: bool, is_creator: bool, is_site_staff: bool):
+        self.forum_id = forum_id
+        self.user_id = user_id
+        self.forum_exists = forum_exists
+        self.role = role
+        self.is_active = is_active
+        self.is_banned = is_banned
+        self.is_creator = is_creator
+        self.is_site_staff = is_site_staff
+
+    @property
+    def has_membership(self) -> bool:
+        """Any membership row, including inactive (left or kicked) ones"""
+        return self.role is not None
+
+    @property
+    def is_member(self) -> bool:
+        """Active membership"""
+        return self.is_active
+
+    def can(self, permission: str) -> bool:
+        """Whether the user may moderate, pin or kick in this forum"""
+        if self.is_site_staff:
+            return True  # Site admins/moderators have full access to all forums
+        if not self.is_active:
+            return False
+        if self.role == "creator":
+            return True
+        return permission in ROLE_PERMISSIONS.get(self.role, ())
+
+
+def _cache_key(forum_id: int, user_id: int) -> str:
+    return f"forum_access:{forum_id}:{user_id}"
+
+def _load(db: Session, forum_id: int, user_id: int) -> Optional[Tuple]:
+    """(role, is_active, is_banned, is_creator) or None when the forum does not exist"""
+    row = db.query(Forum.creator_id, ForumMembership.role, ForumMembership.is_active, ForumMembership.is_banned).outerjoin(
+        ForumMembership, and_(ForumMembership.forum_id == Forum.id, ForumMembership.user_id == user_id)
+    ).filter(Forum.id == forum_id).first()
+    if row is None:
+        return None
+    creator_id, role, is_active, is_banned = row
+    return (role, bool(is_active), bool(is_banned), creator_id == user_id)
+
+def resolve_forum_access(db: Session, forum_id: int, user: User) -> ForumAccess:
+    """Membership record for (user, forum), memoized on the request's session and cached between requests"""
+    memo: Dict[Tuple[int, int], ForumAccess] = db.info.setdefault("forum_access", {})
+    access = memo.get((forum_id, user.id))
+    if access is not None:
+        return access
+
+    key = _cache_key(forum_id, user.id)
+    state = cache_service.get(key)
+    if state is None:
+        state = _load(db, forum_id, user.id)
+        if state is not None:
+            cache_service.set(key, state, FORUM_ACCESS_TTL_SECONDS)
+
+    is_site_staff = user.role in ['admin', 'moderator']
+    if state is None:
+        access = ForumAccess(forum_id, user.id, False, None, False, False, False, is_site_staff)
+    else:
+        access = ForumAccess(forum_id, user.id, True, *state, is_site_staff)
+    memo[(forum_id, user.id)] = access
+    return access
+
+def invalidate_forum_access(forum_id: int, user_id: Optional[int] = None, db: Optional[Session] = None):
+    """Forget resolved access after a membership change; without user_id, for everyone in the forum"""
+    if user_id is None:
+        cache_service.delete_prefix(f"forum_access:{forum_id}:")
+    else:
+        cache_service.delete(_cache_key(forum_id, user_id))
+    if db is not None:
+        memo = db.info.get("forum_access", {})
+        for forum_user in [forum_user for forum_user in memo if forum_user[0] == forum_id and user_id in (None, forum_user[1])]:
+            del memo[forum_user]
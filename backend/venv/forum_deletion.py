@@ -0,0 +1,255 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+from database import session_scope
+from models import (Bookmark, Comment, Draft, Forum, ForumDeletionJob, ForumInvitation, ForumJoinRequest,
+                    ForumMembership, ForumMessage, ForumMessageChange, ForumReply, Problem, ProblemImage,
+                    UserOnlineStatus, Vote)
+
+# Rows (or problems, with their comments, votes, bookmarks and images) deleted per transaction
+CHUNK_SIZE = int(os.getenv("FORUM_DELETE_CHUNK_SIZE", "500"))
+# A 'running' job without a committed chunk for this long was abandoned by its process and may be resumed
+STALE_SECONDS = 300
+RESUME_CHECK_SECONDS = 60
+
+
+def _delete_chunk(db: Session, model, key, *criteria) -> int:
+    """Delete up to CHUNK_SIZE matching rows, picked by key. Does not commit"""
+    keys = [value for value, in db.query(key).filter(*criteria).limit(CHUNK_SIZE).all()]
+    if not keys:
+        return 0
+    return db.query(model).filter(key.in_(keys), *criteria).delete(synchronize_session=False)
+
+
+def _forum_rows(model, key) -> Callable[[Session, int], Tuple[int, int]]:
+    def stage(db: Session, forum_id: int) -> Tuple[int, int]:
+        return 0, _delete_chunk(db, model, key, model.forum_id == forum_id)
+    return stage
+
+
+def _delete_messages(db: Session, forum_id: int) -> Tuple[int, int]:
+    message_ids = [message_id for message_id, in db.query(ForumMessage.id).filter(
+        ForumMessage.forum_id == forum_id
+    ).limit(CHUNK_SIZE).all()]
+    if not message_ids:
+        return 0, 0
+    # Replies posted after the replies stage finished
+    deleted = db.query(ForumReply).filter(ForumReply.parent_message_id.in_(message_ids)).delete(synchronize_session=False)
+    deleted += db.query(ForumMessage).filter(ForumMessage.id.in_(message_ids)).delete(synchronize_session=False)
+    return 0, deleted
+
+
+def _move_problems(db: Session, forum_id: int) -> Tuple[int, int]:
+    """Copy a chunk of the forum's problems into their authors' drafts, then delete them"""
+    problem_ids = [problem_id for problem_id, in db.query(Problem.id).filter(
+        Problem.forum_id == forum_id
+    ).order_by(Problem.id).limit(CHUNK_SIZE).all()]
+    if not problem_ids:
+        return 0, 0
+
+    now = datetime.utcnow()
+    problems = select(
+        Problem.title, Problem.description, Problem.subject, Problem.level, Problem.year, Problem.tags,
+        Problem.author_id, literal(now), literal(now)
+    ).where(Problem.id.in_(problem_ids), Problem.author_id.isnot(None)).order_by(Problem.id)
+    drafts = db.execute(insert(Draft).from_select(
+        ["title", "description", "subject", "level", "year", "tags", "author_id", "created_at", "updated_at"], problems
+    )).rowcount
+
+    # Problem messages may have been shared outside this forum
+    message_ids = select(ForumMessage.id).where(ForumMessage.problem_id.in_(problem_ids))
+    deleted = db.query(ForumReply).filter(ForumReply.parent_message_id.in_(message_ids)).delete(synchronize_session=False)
+    deleted += db.query(ForumMessage).filter(ForumMessage.problem_id.in_(problem_ids)).delete(synchronize_session=False)
+    # Comment threads go in one statement, so replies and their parents are removed together
+    for model in (Comment, Vote, Bookmark, ProblemImage):
+        deleted += db.query(model).filter(model.problem_id.in_(problem_ids)).delete(synchronize_session=False)
+    deleted += db.query(Problem).filter(Problem.id.in_(problem_ids)).delete(synchronize_session=False)
+    return drafts, deleted
+
+
+# Run in order; every stage only touches rows that are still there, so an interrupted job can repeat its stage
+STAGES: List[Tuple[str, Callable[[Session, int], Tuple[int, int]]]] = [
+    ("replies", _forum_rows(ForumReply, ForumReply.id)),
+    ("messages", _delete_messages),
+    ("message_changes", _forum_rows(ForumMessageChange, ForumMessageChange.id)),
+    ("problems", _move_problems),
+    ("online_status", _forum_rows(UserOnlineStatus, UserOnlineStatus.user_id)),
+    ("invitations", _forum_rows(ForumInvitation, ForumInvitation.id)),
+    ("join_requests", _forum_rows(ForumJoinRequest, ForumJoinRequest.id)),
+    ("memberships", _forum_rows(ForumMembership, ForumMembership.id)),
+]
+STAGE_NAMES = [name for name, _ in STAGES]
+
+
+def active_deletion_job(db: Session, forum_id: int) -> Optional[ForumDeletionJob]:
+    return db.query(ForumDeletionJob).filter(
+        ForumDeletionJob.forum_id == forum_id,
+        ForumDeletionJob.status == "running"
+    ).first()
+
+
+def forums_being_deleted():
+    """Ids of forums with a running deletion job, for excluding them from listings"""
+    return select(ForumDeletionJob.forum_id).where(ForumDeletionJob.status == "running")
+
+
+def serialize_deletion_job(job: ForumDeletionJob) -> Dict[str, Any]:
+    if job.status == "completed":
+        stages_done = len(STAGES)
+    else:
+        stages_done = STAGE_NAMES.index(job.stage) if job.stage in STAGE_NAMES else 0
+    return {
+        "id": job.id,
+        "forum_id": job.forum_id,
+        "forum_title": job.forum_title,
+        "status": job.status,
+        "stage": job.stage,
+        "stages_done": stages_done,
+        "stage_count": len(STAGES),
+        "drafts_created": job.drafts_created or 0,
+        "rows_deleted": job.rows_deleted or 0,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+class ForumDeleter:
+    """Deletes forums as background jobs, one asyncio task per job
+
+    Each chunk is its own short transaction that also records the job's
+    progress, so no lock is held for long, the request that asked for the
+    deletion does not wait for it, and a job whose process died is resumed
+    from its recorded stage.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def claim(self, db: Session, job_id: int) -> bool:
+        """Take over an abandoned job; commits"""
+        now = datetime.utcnow()
+        claimed = db.query(ForumDeletionJob).filter(
+            ForumDeletionJob.id == job_id,
+            ForumDeletionJob.status == "running",
+            or_(ForumDeletionJob.heartbeat_at == None, ForumDeletionJob.heartbeat_at < now - timedelta(seconds=STALE_SECONDS))
+        ).update({
+            "heartbeat_at": now,
+            "started_at": func.coalesce(ForumDeletionJob.started_at, now)
+        }, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    def start(self, job_id: int):
+        """Run a job in the background"""
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self.run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def is_running(self, job_id: int) -> bool:
+        return job_id in self._tasks
+
+    async def run(self, job_id: int):
+        loop = asyncio.get_running_loop()
+        try:
+            await self._delete_forum(job_id)
+        except asyncio.CancelledError:
+            raise  # Shutdown: the job stays 'running' and is resumed once its heartbeat goes stale
+        except Exception as e:
+            print(f"Forum deletion job {job_id} failed: {e}")
+            await loop.run_in_executor(None, self._fail, job_id, str(e))
+
+    async def _delete_forum(self, job_id: int):
+        loop = asyncio.get_running_loop()
+        with session_scope() as db:
+            job = db.query(ForumDeletionJob).filter(ForumDeletionJob.id == job_id).first()
+            if job is None or job.status != "running":
+                return
+            forum_id, stage = job.forum_id, job.stage
+
+        start = STAGE_NAMES.index(stage) if stage in STAGE_NAMES else 0
+        for name, step in STAGES[start:]:
+            while await loop.run_in_executor(None, self._run_chunk, job_id, forum_id, name, step):
+                pass
+        await loop.run_in_executor(None, self._finish, job_id, forum_id)
+
+        from presence_service import presence_service
+        from forum_access import invalidate_forum_access
+        presence_service.clear_forum(forum_id)
+        invalidate_forum_access(forum_id)
+
+    def _record(self, db: Session, job_id: int, drafts: int, deleted: int, **values):
+        db.query(ForumDeletionJob).filter(ForumDeletionJob.id == job_id).update({
+            "drafts_created": ForumDeletionJob.drafts_created + drafts,
+            "rows_deleted": ForumDeletionJob.rows_deleted + deleted,
+            "heartbeat_at": datetime.utcnow(),
+            **values
+        }, synchronize_session=False)
+
+    def _run_chunk(self, job_id: int, forum_id: int, name: str, step) -> bool:
+        """One chunk of a stage, committed with the job's progress; False once the stage is done"""
+        with session_scope() as db:
+            drafts, deleted = step(db, forum_id)
+            self._record(db, job_id, drafts, deleted, stage=name)
+            db.commit()
+        return bool(drafts or deleted)
+
+    def _finish(self, job_id: int, forum_id: int):
+        """Delete the forum itself, with anything added to it while the job ran"""
+        with session_scope() as db:
+            drafts = deleted = 0
+            for _, step in STAGES:
+                while True:
+                    step_drafts, step_deleted = step(db, forum_id)
+                    if not (step_drafts or step_deleted):
+                        break
+                    drafts += step_drafts
+                    deleted += step_deleted
+            deleted += db.query(Forum).filter(Forum.id == forum_id).delete(synchronize_session=False)
+            self._record(db, job_id, drafts, deleted, status="completed", finished_at=datetime.utcnow())
+            db.commit()
+
+    def _fail(self, job_id: int, error: str):
+        with session_scope() as db:
+            db.query(ForumDeletionJob).filter(ForumDeletionJob.id == job_id).update({
+                "status": "failed",
+                "error": error[:1000],
+                "finished_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+    def _claim_abandoned(self) -> List[int]:
+        with session_scope() as db:
+            stale_ids = [job_id for job_id, in db.query(ForumDeletionJob.id).filter(
+                ForumDeletionJob.status == "running",
+                or_(ForumDeletionJob.heartbeat_at == None, ForumDeletionJob.heartbeat_at < datetime.utcnow() - timedelta(seconds=STALE_SECONDS))
+            ).all()]
+            return [job_id for job_id in stale_ids if not self.is_running(job_id) and self.claim(db, job_id)]
+
+    async def resume_abandoned(self):
+        """Periodically pick up deletion jobs whose process died, from their last stage"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                for job_id in await loop.run_in_executor(None, self._claim_abandoned):
+                    print(f"Resuming forum deletion job {job_id}")
+                    self.start(job_id)
+            except Exception as e:
+                print(f"Forum deletion resume error: {e}")
+            await asyncio.sleep(RESUME_CHECK_SECONDS)
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global forum deleter instance
+forum_deleter = ForumDeleter()
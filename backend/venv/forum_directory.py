@@ -0,0 +1,120 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Query, Session, aliased
+from forum_deletion import forums_being_deleted
+from models import Forum, ForumJoinRequest, ForumMembership
+from pagination import decode_cursor, encode_cursor
+
+# sort name -> (sort key, descending)
+FORUM_SORTS = {
+    "created": ("created_at", False),
+    "activity": ("last_activity", True),
+    "members": ("member_count", True),
+}
+
+
+def member_count_subquery(db: Session):
+    """Active member count per forum"""
+    return db.query(
+        ForumMembership.forum_id.label("forum_id"),
+        func.count(ForumMembership.id).label("member_count")
+    ).filter(ForumMembership.is_active == True).group_by(ForumMembership.forum_id).subquery()
+
+
+def member_count_column():
+    """Correlated active member count, for selecting alongside a single Forum"""
+    return select(func.count(ForumMembership.id)).where(
+        ForumMembership.forum_id == Forum.id,
+        ForumMembership.is_active == True
+    ).correlate(Forum).scalar_subquery()
+
+
+def forum_directory_query(db: Session, user_id: int, subjects: Optional[List[str]] = None, level: Optional[str] = None,
+                          tags: Optional[List[str]] = None, is_private: Optional[bool] = None) -> Tuple[Query, dict]:
+    """Forums with their member count and the viewer's role and pending join request, in one query
+
+    Rows are (Forum, member_count, user_role, has_pending_request). Also
+    returns the sortable columns by name.
+    """
+    counts = member_count_subquery(db)
+    viewer = aliased(ForumMembership)
+    pending = db.query(ForumJoinRequest.forum_id.label("forum_id")).filter(
+        ForumJoinRequest.user_id == user_id,
+        ForumJoinRequest.status == "pending"
+    ).distinct().subquery()
+    member_count = func.coalesce(counts.c.member_count, 0)
+
+    query = db.query(
+        Forum,
+        member_count.label("member_count"),
+        viewer.role.label("user_role"),
+        (pending.c.forum_id != None).label("has_pending_request")
+    ).outerjoin(
+        counts, counts.c.forum_id == Forum.id
+    ).outerjoin(
+        viewer, and_(viewer.forum_id == Forum.id, viewer.user_id == user_id, viewer.is_active == True)
+    ).outerjoin(
+        pending, pending.c.forum_id == Forum.id
+    ).filter(~Forum.id.in_(forums_being_deleted()))
+
+    if subjects:
+        query = query.filter(Forum.subject.in_(subjects))
+    if level:
+        query = query.filter(Forum.level == level)
+    # Tags are stored comma-separated; every requested tag must appear
+    for tag in tags or []:
+        query = query.filter(Forum.tags.ilike(f"%{tag}%"))
+    if is_private is not None:
+        query = query.filter(Forum.is_private == is_private)
+
+    columns = {"created_at": Forum.created_at, "last_activity": Forum.last_activity, "member_count": member_count}
+    return query, columns
+
+
+def forum_directory_page(query: Query, columns: dict, sort: str, limit: int,
+                         cursor: Optional[str] = None, offset: int = 0) -> Tuple[list, Optional[str]]:
+    """Keyset page of forum_directory_query rows in the given sort order, and the next cursor"""
+    if sort not in FORUM_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(FORUM_SORTS)}")
+    key, descending = FORUM_SORTS[sort]
+    column = columns[key]
+    if key == "member_count":
+        sort_column = column
+    else:
+        # Older rows may have no timestamp; sort them as the oldest
+        sort_column = func.coalesce(column, datetime.min)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), Forum.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Forum.id.asc())
+
+    position = decode_cursor(cursor, "sort", "value", "id")
+    if position:
+        if position["sort"] != sort:
+            raise HTTPException(status_code=400, detail="Cursor belongs to another sort order")
+        try:
+            value = int(position["value"]) if key == "member_count" else datetime.fromisoformat(position["value"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if descending:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, Forum.id < position["id"])))
+        else:
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, Forum.id > position["id"])))
+    elif offset:
+        query = query.offset(offset)
+
+    # One extra row tells us whether another page exists without counting
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        forum, member_count = rows[-1][0], rows[-1][1]
+        if key == "member_count":
+            value = member_count
+        else:
+            value = (getattr(forum, key) or datetime.min).isoformat()
+        next_cursor = encode_cursor({"sort": sort, "value": value, "id": forum.id})
+    return rows, next_cursor
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from fastapi import WebSocket
+from fastapi.encoders import jsonable_encoder
+
+Deliver = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
+
+class Broker(ABC):
+    """Carries forum events to every process running a hub.
+
+    publish() sends an event to all subscribers, including this process;
+    start() receives the callback the hub uses to deliver incoming events.
+    """
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    @abstractmethod
+    async def publish(self, forum_id: int, event: Dict[str, Any]):
+        ...
+
+    async def stop(self):
+        pass
+
+
+class LocalBroker(Broker):
+    """Single-process broker: events go straight back to this process's hub"""
+
+    async def publish(self, forum_id: int, event: Dict[str, Any]):
+        await self._deliver(forum_id, event)
+
+
+class RedisBroker(Broker):
+    """Shares events between uvicorn workers over a Redis pub/sub channel"""
+
+    def __init__(self, url: str, channel: str = "forum-events"):
+        self.url = url
+        self.channel = channel
+        self._redis = None
+        self._listener = None
+
+    async def start(self, deliver: Deliver):
+        import redis.asyncio as redis
+        await super().start(deliver)
+        self._redis = redis.from_url(self.url)
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub):
+        async for item in pubsub.listen():
+            if item.get("type") != "message":
+                continue
+            try:
+                payload = json.loads(item["data"])
+                await self._deliver(payload["forum_id"], payload["event"])
+            except Exception as e:
+                print(f"Forum hub broker error: {e}")
+
+    async def publish(self, forum_id: int, event: Dict[str, Any]):
+        await self._redis.publish(self.channel, json.dumps({"forum_id": forum_id, "event": event}))
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        if self._redis:
+            await self._redis.close()
+
+
+def broker_from_env() -> Broker:
+    """FORUM_HUB_BROKER=redis (with REDIS_URL) shares the hub between workers; default is in-process"""
+    if os.getenv("FORUM_HUB_BROKER", "local") == "redis":
+        return RedisBroker(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return LocalBroker()
+
+
+class ForumHub:
+    """Fans forum chat events out to the WebSocket connections open in this process"""
+
+    # Sent to a removed member's sockets before they are closed with this code
+    MEMBER_REMOVED = "member.removed"
+    REMOVED_CLOSE_CODE = 4403
+
+    def __init__(self, broker: Optional[Broker] = None):
+        self.broker = broker or LocalBroker()
+        self._rooms: Dict[int, Set[WebSocket]] = defaultdict(set)
+        self._users: Dict[WebSocket, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start(self._deliver)
+
+    async def stop(self):
+        await self.broker.stop()
+        self._loop = None
+
+    def connect(self, forum_id: int, websocket: WebSocket, user_id: Optional[int] = None):
+        self._rooms[forum_id].add(websocket)
+        if user_id is not None:
+            self._users[websocket] = user_id
+
+    def disconnect(self, forum_id: int, websocket: WebSocket):
+        self._users.pop(websocket, None)
+        room = self._rooms.get(forum_id)
+        if room is not None:
+            room.discard(websocket)
+            if not room:
+                del self._rooms[forum_id]
+
+    def connection_count(self, forum_id: Optional[int] = None) -> int:
+        if forum_id is not None:
+            return len(self._rooms.get(forum_id, ()))
+        return sum(len(room) for room in self._rooms.values())
+
+    async def _deliver(self, forum_id: int, event: Dict[str, Any]):
+        if event.get("type") == self.MEMBER_REMOVED:
+            await self._drop_user(forum_id, event)
+            return
+        room = list(self._rooms.get(forum_id, ()))
+        if not room:
+            return
+        results = await asyncio.gather(*[ws.send_json(event) for ws in room], return_exceptions=True)
+        # Drop connections that failed to receive; their handlers clean up on disconnect too
+        for ws, result in zip(room, results):
+            if isinstance(result, Exception):
+                self.disconnect(forum_id, ws)
+
+    async def _drop_user(self, forum_id: int, event: Dict[str, Any]):
+        """Tell a removed member's sockets in this process, then close them"""
+        user_id = (event.get("data") or {}).get("user_id")
+        sockets = [ws for ws in self._rooms.get(forum_id, ()) if self._users.get(ws) == user_id]
+        for ws in sockets:
+            self.disconnect(forum_id, ws)
+            try:
+                await ws.send_json(event)
+                await ws.close(code=self.REMOVED_CLOSE_CODE)
+            except Exception:
+                pass  # Already gone
+
+    @staticmethod
+    def _event(forum_id: int, event_type: str, data: Any) -> Dict[str, Any]:
+        return {"type": event_type, "forum_id": forum_id, "data": jsonable_encoder(data)}
+
+    async def publish(self, forum_id: int, event_type: str, data: Any = None):
+        """Publish from the event loop (async route handlers); no-op before startup"""
+        if self._loop is None:
+            return
+        await self.broker.publish(forum_id, self._event(forum_id, event_type, data))
+
+    def emit(self, forum_id: int, event_type: str, data: Any = None):
+        """Publish from any thread (sync route handlers run in a threadpool); no-op before startup"""
+        if self._loop is None:
+            return
+        event = self._event(forum_id, event_type, data)
+        try:
+            asyncio.run_coroutine_threadsafe(self.broker.publish(forum_id, event), self._loop)
+        except RuntimeError:
+            pass
+
+    async def remove_member(self, forum_id: int, user_id: int):
+        """Stop pushing a forum's events to a user who left, was kicked or was banned, in every process"""
+        await self.publish(forum_id, self.MEMBER_REMOVED, {"user_id": user_id})
+
+
+# Global forum hub instance
+forum_hub = ForumHub(broker_from_env())
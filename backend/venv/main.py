@@ -0,0 +1,550 @@
+import warnings
+warnings.filterwarnings("ignore")
+
+from fastapi import FastAPI, Depends, Request, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import models
+from database import engine, get_db, session_scope
+from forum_hub import forum_hub
+# Import routers with error handling for production
+try:
+    from auth.routes import router as auth_router
+except ImportError as e:
+    print(f"Warning: Could not import auth routes: {e}")
+    auth_router = None
+
+try:
+    from admin_routes import router as admin_router
+except ImportError as e:
+    print(f"Warning: Could not import admin routes: {e}")
+    admin_router = None
+# Removed notification admin routes
+# Removed StaticFiles import - will use Cloudinary in production
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from models import User
+from dotenv import load_dotenv
+import os
+# Import settings service with error handling
+try:
+    from settings_service import get_settings_service
+except ImportError:
+    get_settings_service = None
+# Removed push notification service
+import jwt
+from auth.dependencies import SECRET_KEY
+
+# Load environment variables
+load_dotenv()
+
+app = FastAPI()
+# Removed static files mount - will use Cloudinary in production
+
+# Create database tables with error handling
+try:
+    models.Base.metadata.create_all(bind=engine)
+    print("Database tables created successfully")
+except Exception as e:
+    print(f"Warning: Could not create database tables: {e}")
+    print("This is normal if the database is not available yet")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Allow all origins for production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Last-Change-Id"],
+)
+
+# Settings middleware
+@app.middleware("http")
+async def settings_middleware(request: Request, call_next):
+    """Apply settings-based restrictions"""
+    try:
+        # Skip middleware for site-info endpoint to avoid auth issues
+        if request.url.path == "/admin/settings/site-info":
+            response = await call_next(request)
+            return response
+            
+        settings_service = get_settings_service() if get_settings_service else None
+        
+        
+        # Check feature toggles
+        if settings_service and request.url.path.startswith("/forums") and not settings_service.is_feature_enabled("forums"):
+            return JSONResponse(
+                status_code=404,
+                content={"message": "Forums are currently disabled"}
+            )
+        
+        if settings_service and request.url.path.startswith("/problems") and not settings_service.is_feature_enabled("problems"):
+            return JSONResponse(
+                status_code=404,
+                content={"message": "Problems are currently disabled"}
+            )
+        
+        response = await call_next(request)
+        return response
+        
+    except Exception as e:
+        response = await call_next(request)
+        return response
+
+# Include routers only if they were imported successfully
+if auth_router:
+    app.include_router(auth_router, prefix="/auth", tags=["auth"])
+if admin_router:
+    app.include_router(admin_router, tags=["admin"])
+# Removed notification admin router
+
+# Public site info endpoint (no auth required)
+@app.get("/site-info")
+async def get_site_info():
+    """Get public site information (no auth required)"""
+    try:
+        settings_service = get_settings_service() if get_settings_service else None
+        site_settings = settings_service.get_site_settings() if settings_service else {}
+        
+        # Site settings loaded
+        
+        # Get feature settings
+        feature_settings = settings_service.get_feature_settings() if settings_service else {}
+        
+        result = {
+            "site_name": site_settings.get('name', 'Science Pioneers'),
+            "site_description": site_settings.get('description', 'A platform for science enthusiasts'),
+            "site_logo": site_settings.get('logo', ''),
+            "site_favicon": site_settings.get('favicon', ''),
+            "site_theme": site_settings.get('theme', 'light'),
+            "maintenance_mode": site_settings.get('maintenance_mode', False),
+            "maintenance_message": site_settings.get('maintenance_message', 'Site under maintenance'),
+            # Add feature settings
+            "forums_enabled": feature_settings.get('forums_enabled', True),
+            "comments_enabled": feature_settings.get('comments_enabled', True),
+            "voting_enabled": feature_settings.get('voting_enabled', True),
+            "bookmarks_enabled": feature_settings.get('bookmarks_enabled', True),
+            "following_enabled": feature_settings.get('following_enabled', True),
+            "notifications_enabled": feature_settings.get('notifications_enabled', True),
+            "reports_enabled": feature_settings.get('reports_enabled', True),
+            # Add privacy settings
+            "profile_visibility": site_settings.get('profile_visibility', 'public')
+        }
+        
+        return result
+    except Exception as e:
+        # Return defaults if settings service fails
+        return {
+            "site_name": "Science Pioneers",
+            "site_description": "A platform for science enthusiasts",
+            "site_logo": "",
+            "site_favicon": "",
+            "site_theme": "light",
+            "maintenance_mode": False,
+            "maintenance_message": "Site under maintenance",
+            # Default feature settings
+            "forums_enabled": True,
+            "comments_enabled": True,
+            "voting_enabled": True,
+            "bookmarks_enabled": True,
+            "following_enabled": True,
+            "notifications_enabled": True,
+            "reports_enabled": True,
+            # Default privacy settings
+            "profile_visibility": "public"
+        }
+
+# Auto-cleanup function
+async def cleanup_expired_users():
+    """Clean up unverified users older than 1 hour"""
+    try:
+        with session_scope() as db:
+            cutoff_time = datetime.utcnow() - timedelta(minutes=15)  # 15 minutes expiry
+            expired_users = db.query(User).filter(
+                User.is_verified == False,
+                User.created_at < cutoff_time
+            ).all()
+            
+            for user in expired_users:
+                db.delete(user)
+            
+            db.commit()
+        
+    except Exception as e:
+        pass
+
+# Background task for cleanup
+@app.on_event("startup")
+async def startup_event():
+    """Start background cleanup task"""
+    asyncio.create_task(periodic_cleanup())
+    asyncio.create_task(periodic_trending_refresh())
+    asyncio.create_task(periodic_presence_sweep())
+    asyncio.create_task(periodic_view_flush())
+    asyncio.create_task(periodic_feed_trim())
+    await forum_hub.start()
+    from notification_worker import notification_worker
+    notification_worker.start()
+    from campaign_service import campaign_sender
+    asyncio.create_task(campaign_sender.resume_abandoned())
+    from forum_deletion import forum_deleter
+    asyncio.create_task(forum_deleter.resume_abandoned())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the forum chat hub, the notification worker, running campaigns and forum deletions, and flush buffered views"""
+    from notification_worker import notification_worker
+    from campaign_service import campaign_sender
+    from email_service import email_service
+    from forum_deletion import forum_deleter
+    await campaign_sender.stop()
+    await forum_deleter.stop()
+    await notification_worker.stop()
+    await forum_hub.stop()
+    # Write buffered problem views before the process exits
+    await asyncio.get_event_loop().run_in_executor(None, flush_views)
+    email_service.close()
+
+async def periodic_cleanup():
+    """Run cleanup every 5 minutes"""
+    while True:
+        await asyncio.sleep(300)  # 5 minutes
+        await cleanup_expired_users()
+
+def refresh_trending(full: bool = False):
+    """Refresh problems with new engagement, or rebuild the whole trending table"""
+    from trending_service import trending_service
+    try:
+        with session_scope() as db:
+            if full:
+                trending_service.rebuild(db)
+            else:
+                trending_service.refresh_dirty(db)
+    except Exception as e:
+        print(f"Trending refresh error: {e}")
+
+async def periodic_trending_refresh():
+    """Flush queued trending updates every 30 seconds and rebuild every hour"""
+    loop = asyncio.get_event_loop()
+    runs = 0
+    while True:
+        # Rebuild on startup so the table is populated and repairs any drift
+        full = runs % 120 == 0
+        await loop.run_in_executor(None, refresh_trending, full)
+        runs += 1
+        await asyncio.sleep(30)
+
+def flush_views():
+    """Write buffered problem views to the database"""
+    from view_counter import view_counter
+    try:
+        with session_scope() as db:
+            view_counter.flush(db)
+    except Exception as e:
+        print(f"View count flush error: {e}")
+
+async def periodic_view_flush():
+    """Flush buffered problem views every VIEW_FLUSH_SECONDS"""
+    from view_counter import FLUSH_INTERVAL_SECONDS
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        await loop.run_in_executor(None, flush_views)
+
+def trim_feeds():
+    """Cap following-feed timelines at FEED_MAX_ENTRIES"""
+    import feed_service
+    try:
+        with session_scope() as db:
+            feed_service.trim(db)
+    except Exception as e:
+        print(f"Feed trim error: {e}")
+
+async def periodic_feed_trim():
+    """Trim following-feed timelines every 10 minutes"""
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(600)
+        await loop.run_in_executor(None, trim_feeds)
+
+def write_presence_snapshot():
+    """Copy current forum presence into user_online_status for analytics"""
+    from presence_service import presence_service
+    try:
+        with session_scope() as db:
+            presence_service.write_snapshot(db)
+    except Exception as e:
+        print(f"Presence snapshot error: {e}")
+
+async def periodic_presence_sweep():
+    """Expire stale presence entries every 15 seconds and snapshot them every 5 minutes"""
+    from presence_service import presence_service, SWEEP_INTERVAL_SECONDS, SNAPSHOT_INTERVAL_SECONDS
+    loop = asyncio.get_event_loop()
+    last_snapshot = loop.time()
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        presence_service.sweep()
+        if loop.time() - last_snapshot >= SNAPSHOT_INTERVAL_SECONDS:
+            last_snapshot = loop.time()
+            await loop.run_in_executor(None, write_presence_snapshot)
+
+@app.get("/")
+def read_root():
+    return {"message": "Hello, Science Pioneers with PostgreSQL!"}
+
+@app.get("/test-settings")
+async def test_settings_simple(db: Session = Depends(get_db)):
+    """Simple test endpoint without authentication"""
+    try:
+        from models import SystemSettings
+        
+        settings = db.query(SystemSettings).filter(
+            SystemSettings.key.in_([
+                'site_name', 'site_description', 'maintenance_mode', 
+                'forums_enabled', 'registration_enabled',
+                'smtp_server', 'smtp_port', 'smtp_username', 'smtp_password', 'smtp_use_tls',
+                'email_from_name', 'email_from_address'
+            ])
+        ).all()
+        
+        settings_dict = {setting.key: setting.value for setting in settings}
+        
+        return {
+            "message": "Settings test completed",
+            "results": {
+                "settings_loaded": len(settings_dict) > 0,
+                "site_name": settings_dict.get('site_name', 'Not Set'),
+                "maintenance_mode": settings_dict.get('maintenance_mode') == 'true',
+                "forums_enabled": settings_dict.get('forums_enabled') == 'true',
+                "registration_enabled": settings_dict.get('registration_enabled') == 'true',
+                "smtp_server": settings_dict.get('smtp_server', 'Not Set'),
+                "smtp_port": settings_dict.get('smtp_port', 'Not Set'),
+                "smtp_username": settings_dict.get('smtp_username', 'Not Set'),
+                "smtp_password": 'Set' if settings_dict.get('smtp_password') else 'Not Set',
+                "smtp_use_tls": settings_dict.get('smtp_use_tls') == 'true',
+                "email_from_name": settings_dict.get('email_from_name', 'Not Set'),
+                "email_from_address": settings_dict.get('email_from_address', 'Not Set'),
+                "total_settings": len(settings_dict)
+            },
+            "all_settings": settings_dict
+        }
+    except Exception as e:
+        return {
+            "message": f"Settings test failed: {str(e)}",
+            "error": str(e)
+        }
+
+@app.get("/get-settings")
+async def get_all_settings(db: Session = Depends(get_db)):
+    """Get all settings without authentication"""
+    try:
+        from models import SystemSettings
+        
+        all_settings = db.query(SystemSettings).all()
+        
+        # Organize settings by category
+        settings_by_category = {
+            'site': {},
+            'email': {},
+            'security': {},
+            'content': {},
+            'forum': {},
+            'notification': {},
+            'analytics': {},
+            'maintenance': {},
+            'feature': {},
+            'privacy': {},
+            'integration': {},
+            'advanced': {}
+        }
+        
+        for setting in all_settings:
+            key = setting.key
+            value = setting.value
+            
+            # Categorize settings
+            if key.startswith('site_'):
+                settings_by_category['site'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('smtp_') or (key.startswith('email_') and not key.startswith('email_notifications_')):
+                # Don't return password in API response
+                if key == 'smtp_password':
+                    settings_by_category['email'][key] = {
+                        'value': 'ENCRYPTED',
+                        'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                        'updated_by': setting.updater.username if setting.updater else None
+                    }
+                else:
+                    settings_by_category['email'][key] = {
+                        'value': value,
+                        'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                        'updated_by': setting.updater.username if setting.updater else None
+                    }
+            elif key.startswith('password_') or key.startswith('session_') or key.startswith('max_login_') or key.startswith('lockout_'):
+                settings_by_category['security'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('forum_') or key.startswith('max_forum_') or key.startswith('max_members_'):
+                settings_by_category['forum'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('max_') and ('problem' in key or 'comment' in key):
+                settings_by_category['content'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('notification_') or key.startswith('email_notifications_') or key.startswith('in_app_notifications_') or key.startswith('push_notifications_'):
+                settings_by_category['notification'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('analytics_') or key.startswith('track_') or key.startswith('data_retention_') or key.startswith('export_'):
+                settings_by_category['analytics'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('maintenance_') or key.startswith('backup_') or key.startswith('auto_'):
+                settings_by_category['maintenance'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.endswith('_enabled') or key.startswith('registration_') or key.startswith('auto_'):
+                settings_by_category['feature'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('gdpr_') or key.startswith('profile_') or key.startswith('show_') or key.startswith('allow_'):
+                settings_by_category['privacy'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            elif key.startswith('google_') or key.startswith('facebook_') or key.startswith('twitter_') or key.startswith('discord_'):
+                settings_by_category['integration'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+            else:
+                settings_by_category['advanced'][key] = {
+                    'value': value,
+                    'updated_at': setting.updated_at.isoformat() if setting.updated_at else None,
+                    'updated_by': setting.updater.username if setting.updater else None
+                }
+        
+        return settings_by_category
+        
+    except Exception as e:
+        return {
+            "error": str(e)
+        }
+
+@app.post("/save-settings")
+async def save_settings_simple(settings_data: dict, db: Session = Depends(get_db)):
+    """Simple save endpoint without authentication"""
+    try:
+        from models import SystemSettings
+        
+        # Handle both direct settings and nested settings
+        if 'settings' in settings_data:
+            settings = settings_data.get('settings', {})
+        else:
+            settings = settings_data
+        
+        # Saving settings
+        
+        updated_count = 0
+        for key, value in settings.items():
+            # Encrypt password fields (only if not already encrypted and not empty)
+            if key == 'smtp_password' and value and value != 'ENCRYPTED' and value.strip() != '':
+                import base64
+                value = base64.b64encode(str(value).encode('utf-8')).decode('utf-8')
+            
+            # Find existing setting or create new one
+            setting = db.query(SystemSettings).filter(SystemSettings.key == key).first()
+            if setting:
+                setting.value = str(value)
+                setting.updated_at = datetime.utcnow()
+            else:
+                new_setting = SystemSettings(
+                    key=key,
+                    value=str(value),
+                    updated_at=datetime.utcnow()
+                )
+                db.add(new_setting)
+            updated_count += 1
+        
+        db.commit()
+        
+        # Refresh the settings cache
+        from settings_service import refresh_settings_cache
+        refresh_settings_cache(db)
+        
+        return {
+            "message": f"Settings saved successfully! Updated {updated_count} settings.",
+            "updated_count": updated_count
+        }
+    except Exception as e:
+        return {
+            "message": f"Failed to save settings: {str(e)}",
+            "error": str(e)
+        }
+
+# Removed WebSocket endpoint for push notifications
+
+# Forum chat push channel
+@app.websocket("/ws/forums/{forum_id}")
+async def forum_chat_socket(websocket: WebSocket, forum_id: int, token: str = ""):
+    """Push new, edited, deleted and pinned messages and replies of one forum
+
+    Browsers cannot set headers on WebSocket requests, so the JWT comes in the
+    token query parameter. Access is checked once on connect; the socket is closed
+    with 4401 for a bad token and 4403 for users who cannot read the forum, and
+    later with 4403 when the user leaves, is kicked or is banned.
+    """
+    from auth.dependencies import authenticate_token
+    from forum_access import resolve_forum_access
+
+    # Accept first: a close before the handshake completes reaches the client as a
+    # plain 403, without the 4401/4403 code
+    await websocket.accept()
+
+    # Check access with a short-lived session; the open socket holds no connection
+    with session_scope() as db:
+        try:
+            user = authenticate_token(token, db)
+        except HTTPException:
+            await websocket.close(code=4401)
+            return
+
+        access = resolve_forum_access(db, forum_id, user)
+        allowed = not access.is_banned and (access.is_site_staff or access.is_member)
+        user_id = user.id
+
+    if not allowed:
+        await websocket.close(code=4403)
+        return
+
+    forum_hub.connect(forum_id, websocket, user_id)
+    try:
+        while True:
+            # Clients only send keepalives
+            if await websocket.receive_text() == "ping":
+                await websocket.send_text("pong")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forum_hub.disconnect(forum_id, websocket)
@@ -0,0 +1,242 @@
+from sqlalchemy.orm import Session
+from models import Notification, NotificationPreferences, NotificationOutbox
+# Removed push notification service import
+from datetime import datetime
+from typing import List, Optional
+
+class NotificationService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    async def create_notification(
+        self, 
+        user_id: int, 
+        notification_type: str, 
+        title: str, 
+        message: str,
+        commit: bool = True
+    ) -> Optional[Notification]:
+        """Create a notification and queue an email if user has email notifications enabled
+
+        The in-app notification and the outbox row are added to the caller's
+        transaction; the email itself is sent later by the notification worker.
+        Pass commit=False to commit them together with the triggering action.
+        """
+        try:
+            # Get user's notification preferences
+            preferences = self.db.query(NotificationPreferences).filter(
+                NotificationPreferences.user_id == user_id
+            ).first()
+            
+            # Create in-app notification only if user has in-app notifications enabled
+            notification = None
+            if preferences and self._should_create_in_app_notification(preferences, notification_type):
+                notification = Notification(
+                    user_id=user_id,
+                    type=notification_type,
+                    title=title,
+                    message=message
+                )
+                self.db.add(notification)
+            
+            # Queue email notification if enabled (independent of in-app notifications)
+            should_send = self._should_send_email(preferences, notification_type)
+            if should_send:
+                self.db.add(NotificationOutbox(
+                    user_id=user_id,
+                    type=notification_type,
+                    title=title,
+                    message=message
+                ))
+            
+            if commit:
+                self.db.commit()
+                if notification:
+                    self.db.refresh(notification)
+            else:
+                self.db.flush()
+            
+            # Push notifications removed
+            
+            # Return notification if created, or a success indicator if email was queued
+            if notification:
+                return notification
+            elif should_send:
+                return "email_queued"
+            else:
+                return None
+            
+        except Exception as e:
+            if not commit:
+                raise  # Part of the caller's transaction, let the caller roll back
+            self.db.rollback()
+            return None
+    
+    def create_bulk_notifications(
+        self,
+        user_ids: List[int],
+        notification_type: str,
+        title: str,
+        message: str,
+        commit: bool = True
+    ) -> int:
+        """Notify many users at once: one preferences query, one bulk insert each for
+        in-app notifications and queued emails. Returns the number of in-app notifications."""
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return 0
+        
+        preferences_by_user = {
+            preferences.user_id: preferences
+            for preferences in self.db.query(NotificationPreferences).filter(
+                NotificationPreferences.user_id.in_(user_ids)
+            ).all()
+        }
+        
+        now = datetime.utcnow()
+        notifications = []
+        emails = []
+        for user_id in user_ids:
+            preferences = preferences_by_user.get(user_id)
+            row = {"user_id": user_id, "type": notification_type, "title": title, "message": message, "created_at": now}
+            if preferences and self._should_create_in_app_notification(preferences, notification_type):
+                notifications.append(dict(row, is_read=False))
+            if self._should_send_email(preferences, notification_type):
+                emails.append(dict(row, status="pending", attempts=0, next_attempt_at=now))
+        
+        if notifications:
+            self.db.bulk_insert_mappings(Notification, notifications)
+        if emails:
+            self.db.bulk_insert_mappings(NotificationOutbox, emails)
+        if commit:
+            self.db.commit()
+        return len(notifications)
+    
+    def _should_send_email(self, preferences: NotificationPreferences, notification_type: str) -> bool:
+        """Check if email should be sent based on user preferences"""
+        # Skip system-wide email setting check for now - only check user preferences
+        # If no user preferences exist, default to sending emails
+        if not preferences:
+            return True  # If no user preferences, send email by default
+        
+        if notification_type == "like":
+            return preferences.email_likes
+        elif notification_type == "comment":
+            return preferences.email_comments
+        elif notification_type == "follow":
+            return preferences.email_follows
+        elif notification_type in ["forum_invitation", "forum_invitation_accepted"]:
+            return preferences.email_forum_invitations
+        elif notification_type in ["forum_join_request", "forum_join_request_accepted", "forum_join_request_declined"]:
+            return preferences.email_forum_join_requests
+        elif notification_type == "forum_deleted":
+            return preferences.email_forum_deleted
+        return False
+    
+    def _should_create_in_app_notification(self, preferences: NotificationPreferences, notification_type: str) -> bool:
+        """Check if in-app notification should be created based on system settings and user preferences"""
+        # First check system-wide in-app notification setting
+        from settings_service import get_settings_service
+        if get_settings_service().get_setting('in_app_notifications_enabled') != 'true':
+            return False  # System-wide in-app notifications disabled
+        
+        # If system allows, check user preferences
+        if notification_type == "like":
+            return preferences.in_app_likes
+        elif notification_type == "comment":
+            return preferences.in_app_comments
+        elif notification_type == "follow":
+            return preferences.in_app_follows
+        elif notification_type in ["forum_invitation", "forum_invitation_accepted", "forum_join_request", "forum_join_request_accepted", "forum_join_request_declined"]:
+            return True  # Always show forum invitations and join requests in-app (required for Accept/Decline)
+        elif notification_type == "forum_deleted":
+            return preferences.in_app_forum_deleted
+        return False
+    
+    async def send_like_notification(self, user_id: int, liker_username: str, problem_title: str, commit: bool = True):
+        """Send notification when someone likes a problem"""
+        title = "Someone liked your problem!"
+        message = f"{liker_username} liked your problem '{problem_title}'"
+        return await self.create_notification(user_id, "like", title, message, commit=commit)
+    
+    async def send_comment_notification(self, user_id: int, commenter_username: str, problem_title: str, commit: bool = True):
+        """Send notification when someone comments on a problem"""
+        title = "New comment on your problem!"
+        message = f"{commenter_username} commented on your problem '{problem_title}'"
+        return await self.create_notification(user_id, "comment", title, message, commit=commit)
+    
+    async def send_follow_notification(self, user_id: int, follower_username: str, commit: bool = True):
+        """Send notification when someone follows the user"""
+        title = "New follower!"
+        message = f"{follower_username} started following you"
+        return await self.create_notification(user_id, "follow", title, message, commit=commit)
+    
+    async def send_forum_invitation_notification(self, user_id: int, inviter_username: str, forum_title: str, forum_id: int = None, invitation_id: int = None):
+        """Send notification when invited to a forum"""
+        title = "Forum Invitation"
+        message = f"{inviter_username} invited you to join '{forum_title}'"
+        
+        # Create notification with data for Accept/Decline buttons
+        notification = await self.create_notification(user_id, "forum_invitation", title, message)
+        
+        # Add data field for frontend buttons
+        if notification and forum_id and invitation_id:
+            notification.data = {
+                "forum_id": forum_id,
+                "invitation_id": invitation_id,
+                "inviter_name": inviter_username,
+                "forum_title": forum_title
+            }
+            self.db.commit()
+        
+        return notification
+    
+    async def send_forum_invitation_accepted_notification(self, user_id: int, invitee_username: str, forum_title: str):
+        """Send notification when forum invitation is accepted"""
+        title = "Invitation Accepted"
+        message = f"{invitee_username} accepted your invitation to '{forum_title}'"
+        return await self.create_notification(user_id, "forum_invitation_accepted", title, message)
+    
+    async def send_forum_join_request_notification(self, user_id: int, requester_username: str, forum_title: str, forum_id: int = None, request_id: int = None):
+        """Send notification when someone requests to join a forum"""
+        title = "Join Request"
+        message = f"{requester_username} wants to join '{forum_title}'"
+        
+        # Create notification with data for Accept/Decline buttons
+        notification = await self.create_notification(user_id, "forum_join_request", title, message)
+        
+        # Add data field for frontend buttons
+        if notification and forum_id and request_id:
+            notification.data = {
+                "forum_id": forum_id,
+                "request_id": request_id,
+                "requester_name": requester_username,
+                "forum_title": forum_title
+            }
+            self.db.commit()
+        
+        return notification
+    
+    async def send_forum_join_request_accepted_notification(self, user_id: int, forum_title: str):
+        """Send notification when join request is accepted"""
+        title = "Request Accepted"
+        message = f"Your request to join '{forum_title}' has been accepted"
+        return await self.create_notification(user_id, "forum_join_request_accepted", title, message)
+    
+    async def send_forum_join_request_declined_notification(self, user_id: int, forum_title: str):
+        """Send notification when join request is declined"""
+        title = "Request Declined"
+        message = f"Your request to join '{forum_title}' has been declined"
+        return await self.create_notification(user_id, "forum_join_request_declined", title, message)
+    
+    async def send_forum_deleted_notification(self, user_id: int, forum_title: str, creator_username: str):
+        """Send notification when a forum is deleted"""
+        title = "Forum Deleted"
+        message = f"The forum '{forum_title}' created by {creator_username} has been deleted"
+        return await self.create_notification(user_id, "forum_deleted", title, message)
+    
+    def send_forum_deleted_notifications(self, user_ids: List[int], forum_title: str, creator_username: str, commit: bool = True) -> int:
+        """Notify every former member of a deleted forum in one batch"""
+        title = "Forum Deleted"
+        message = f"The forum '{forum_title}' created by {creator_username} has been deleted"
+        return self.create_bulk_notifications(user_ids, "forum_deleted", title, message, commit=commit)
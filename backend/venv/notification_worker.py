@@ -0,0 +1,267 @@
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from database import session_scope
+from models import NotificationOutbox, User
+
+# Queue polling and batching
+POLL_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "2"))
+BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50"))
+SEND_CONCURRENCY = int(os.getenv("NOTIFICATION_SEND_CONCURRENCY", "4"))
+# Retries: 30s, 60s, 120s, ... (with jitter) until MAX_ATTEMPTS, then the row is dead-lettered
+MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = int(os.getenv("NOTIFICATION_BACKOFF_SECONDS", "30"))
+# A claimed row is retried after this long if its worker died mid-send
+CLAIM_LEASE_SECONDS = 300
+# Delivered rows are kept this long for diagnostics
+RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "7"))
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class OutboxMetrics:
+    """Delivery counters for the notification worker in this process"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.started_at = time.time()
+        self.sent = 0
+        self.skipped = 0
+        self.retried = 0
+        self.dead = 0
+        self.batches = 0
+        self.send_seconds = 0.0
+        self.last_batch_at: Optional[datetime] = None
+
+    def record_batch(self, sent: int, skipped: int, retried: int, dead: int, send_seconds: float):
+        with self._lock:
+            self.sent += sent
+            self.skipped += skipped
+            self.retried += retried
+            self.dead += dead
+            self.batches += 1
+            self.send_seconds += send_seconds
+            self.last_batch_at = datetime.utcnow()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            uptime = max(time.time() - self.started_at, 1)
+            attempts = self.sent + self.retried + self.dead
+            return {
+                "sent": self.sent,
+                "skipped": self.skipped,
+                "retried": self.retried,
+                "dead": self.dead,
+                "batches": self.batches,
+                "sent_per_minute": round(self.sent / uptime * 60, 2),
+                "avg_send_ms": round(self.send_seconds / attempts * 1000, 1) if attempts else 0.0,
+                "last_batch_at": self.last_batch_at
+            }
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds before retry number `attempts`, doubling each time with +/-20% jitter"""
+    return BACKOFF_BASE_SECONDS * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+
+def compose_email(user: User, title: str, message: str):
+    """Subject and body of a notification email"""
+    subject = f"SciencePioneers: {title}"
+    body = f"""
+            Hi {user.username},
+
+            {message}
+
+            Visit SciencePioneers to see more: http://localhost:3000
+
+            Best regards,
+            SciencePioneers Team
+            """
+    return subject, body
+
+def outbox_counts(db: Session) -> Dict[str, int]:
+    """Number of outbox rows per status"""
+    rows = db.query(NotificationOutbox.status, func.count(NotificationOutbox.id)).group_by(NotificationOutbox.status).all()
+    return {status: count for status, count in rows}
+
+
+class NotificationWorker:
+    """Drains notification_outbox: claims due rows, sends the emails and records the outcome
+
+    Every process may run a worker; rows are claimed with FOR UPDATE SKIP LOCKED
+    and a lease that is only taken while the row is still due (SQLite ignores
+    SKIP LOCKED), so a row is only sent by one worker at a time.
+    """
+
+    def __init__(self, email_service=None):
+        self._email_service = email_service
+        self.metrics = OutboxMetrics()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def email_service(self):
+        if self._email_service is None:
+            from email_service import email_service
+            self._email_service = email_service
+        return self._email_service
+
+    def claim_batch(self, db: Session, limit: int = BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Lease up to `limit` due rows and return what is needed to send them"""
+        now = datetime.utcnow()
+        rows = db.query(NotificationOutbox).filter(
+            NotificationOutbox.status == "pending",
+            NotificationOutbox.next_attempt_at <= now
+        ).order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id).limit(limit).with_for_update(skip_locked=True).all()
+        if not rows:
+            db.commit()
+            return []
+
+        # Only leases rows that are still due: without SKIP LOCKED (SQLite) another
+        # worker may have leased some of them since the select above
+        attempts = dict(db.execute(
+            update(NotificationOutbox).where(
+                NotificationOutbox.id.in_([row.id for row in rows]),
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.next_attempt_at <= now
+            ).values(
+                attempts=NotificationOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+            ).returning(NotificationOutbox.id, NotificationOutbox.attempts).execution_options(synchronize_session=False)
+        ).all())
+        rows = [row for row in rows if row.id in attempts]
+        users = {
+            user.id: user for user in db.query(User.id, User.username, User.email, User.is_verified).filter(
+                User.id.in_({row.user_id for row in rows})
+            ).all()
+        } if rows else {}
+        claimed = [
+            {"id": row.id, "attempts": attempts[row.id], "user": users.get(row.user_id), "title": row.title, "message": row.message}
+            for row in rows
+        ]
+        db.commit()
+        return claimed
+
+    def record_results(self, db: Session, results: List[Dict[str, Any]]):
+        """Mark rows sent/skipped, schedule retries and dead-letter rows out of attempts"""
+        now = datetime.utcnow()
+        rows = {row.id: row for row in db.query(NotificationOutbox).filter(
+            NotificationOutbox.id.in_([result["id"] for result in results])
+        ).all()}
+        for result in results:
+            row = rows.get(result["id"])
+            if row is None:
+                continue  # User deleted meanwhile, the row went with them
+            row.status = result["status"]
+            row.last_error = result.get("error")
+            if result["status"] in ("sent", "skipped"):
+                row.sent_at = now
+            elif result["status"] == "pending":
+                row.next_attempt_at = now + timedelta(seconds=backoff_delay(row.attempts))
+        db.commit()
+
+    def _send(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one email (blocking, runs in a worker thread)"""
+        user = item["user"]
+        if user is None or not user.is_verified or not user.email:
+            return {"id": item["id"], "status": "skipped", "error": "User not found or not verified"}
+        subject, body = compose_email(user, item["title"], item["message"])
+        try:
+            ok = self.email_service.deliver_notification_email(user.email, subject, body)
+            error = None if ok else "Email service reported failure"
+        except Exception as e:
+            ok, error = False, str(e)
+        if ok:
+            return {"id": item["id"], "status": "sent"}
+        return {"id": item["id"], "status": "dead" if item["attempts"] >= MAX_ATTEMPTS else "pending", "error": error}
+
+    def process_batch(self) -> int:
+        """Claim, send and record one batch; returns how many rows were claimed"""
+        with session_scope() as db:
+            claimed = self.claim_batch(db)
+        if not claimed:
+            return 0
+
+        start = time.perf_counter()
+        results = self._send_all(claimed)
+        send_seconds = time.perf_counter() - start
+
+        with session_scope() as db:
+            self.record_results(db, results)
+
+        statuses = [result["status"] for result in results]
+        self.metrics.record_batch(
+            sent=statuses.count("sent"), skipped=statuses.count("skipped"),
+            retried=statuses.count("pending"), dead=statuses.count("dead"),
+            send_seconds=send_seconds
+        )
+        return len(claimed)
+
+    def _send_all(self, claimed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if SEND_CONCURRENCY <= 1 or len(claimed) == 1:
+            return [self._send(item) for item in claimed]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(SEND_CONCURRENCY, len(claimed))) as pool:
+            return list(pool.map(self._send, claimed))
+
+    def purge(self) -> int:
+        """Delete delivered rows older than the retention period; dead rows are kept"""
+        cutoff = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+        with session_scope() as db:
+            deleted = db.query(NotificationOutbox).filter(
+                NotificationOutbox.status.in_(["sent", "skipped"]),
+                NotificationOutbox.sent_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+        return deleted
+
+    def retry_dead(self, db: Session, outbox_id: Optional[int] = None) -> int:
+        """Put dead-lettered rows (or one of them) back in the queue; committed by the caller"""
+        query = db.query(NotificationOutbox).filter(NotificationOutbox.status == "dead")
+        if outbox_id is not None:
+            query = query.filter(NotificationOutbox.id == outbox_id)
+        return query.update({
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": datetime.utcnow(),
+            "last_error": None
+        }, synchronize_session=False)
+
+    async def run(self):
+        """Drain the outbox until cancelled; batches run in a thread so the event loop never blocks on email"""
+        loop = asyncio.get_running_loop()
+        last_purge = loop.time()
+        while True:
+            try:
+                claimed = await loop.run_in_executor(None, self.process_batch)
+                if loop.time() - last_purge >= PURGE_INTERVAL_SECONDS:
+                    last_purge = loop.time()
+                    await loop.run_in_executor(None, self.purge)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Notification worker error: {e}")
+                claimed = 0
+            # A full batch means more rows are probably due, keep going
+            if claimed < BATCH_SIZE:
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global notification worker instance
+notification_worker = NotificationWorker()
@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor"""
+    raw = json.dumps(position, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *keys: str) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor, checking it carries the expected keys"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(position, dict) or any(key not in position for key in keys):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+
+def keyset_page(query, created_column, id_column, limit: int, cursor: Optional[str] = None,
+                offset: int = 0, descending: bool = True) -> Tuple[list, Optional[str]]:
+    """Fetch one page ordered by (created_at, id) and the cursor for the page after it.
+
+    With a cursor the page starts right after the row it encodes (keyset); without
+    one the legacy offset is used, so page/limit clients keep working.
+    """
+    if descending:
+        query = query.order_by(created_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(created_column.asc(), id_column.asc())
+
+    position = decode_cursor(cursor, "created_at", "id")
+    if position:
+        try:
+            created_at = datetime.fromisoformat(position["created_at"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if descending:
+            query = query.filter(or_(
+                created_column < created_at,
+                and_(created_column == created_at, id_column < position["id"])
+            ))
+        else:
+            query = query.filter(or_(
+                created_column > created_at,
+                and_(created_column == created_at, id_column > position["id"])
+            ))
+    elif offset:
+        query = query.offset(offset)
+
+    # One extra row tells us whether another page exists without counting
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            "created_at": last.created_at.isoformat() if last.created_at else None,
+            "id": last.id
+        })
+    return rows, next_cursor
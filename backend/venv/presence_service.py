@@ -0,0 +1,231 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models import UserOnlineStatus
+
+# A user stays online this long after a heartbeat (clients send one every 30s)
+ONLINE_TTL_SECONDS = int(os.getenv("PRESENCE_ONLINE_TTL_SECONDS", "60"))
+# A typing indicator lasts this long after the last keystroke update
+TYPING_TTL_SECONDS = int(os.getenv("PRESENCE_TYPING_TTL_SECONDS", "5"))
+SWEEP_INTERVAL_SECONDS = 15
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("PRESENCE_SNAPSHOT_SECONDS", "300"))
+
+ONLINE = "online"
+TYPING = "typing"
+
+
+class PresenceBackend(ABC):
+    """Storage for TTL-expiring presence sets, one per (kind, forum)"""
+
+    @abstractmethod
+    def touch(self, kind: str, forum_id: int, user_id: int, ttl: int, data: Any = None):
+        ...
+
+    @abstractmethod
+    def remove(self, kind: str, forum_id: int, user_id: int):
+        ...
+
+    @abstractmethod
+    def members(self, kind: str, forum_id: int) -> Dict[int, Any]:
+        """Live (unexpired) user ids of a set with their data"""
+        ...
+
+    def count(self, kind: str, forum_id: int) -> int:
+        return len(self.members(kind, forum_id))
+
+    @abstractmethod
+    def clear_forum(self, forum_id: int):
+        ...
+
+    def sweep(self) -> int:
+        """Drop expired entries; returns how many were removed"""
+        return 0
+
+    @abstractmethod
+    def entries(self, kind: str) -> List[Tuple[int, int, float]]:
+        """(forum_id, user_id, last_seen timestamp) for every live entry of a kind"""
+        ...
+
+
+class MemoryPresenceBackend(PresenceBackend):
+    """Per-process presence sets; updates are O(1) dict writes under a lock"""
+
+    def __init__(self):
+        self._lock = Lock()
+        # (kind, forum_id) -> user_id -> (expires_at, last_seen, data)
+        self._sets: Dict[Tuple[str, int], Dict[int, Tuple[float, float, Any]]] = defaultdict(dict)
+
+    def touch(self, kind, forum_id, user_id, ttl, data=None):
+        now = time.time()
+        with self._lock:
+            self._sets[(kind, forum_id)][user_id] = (now + ttl, now, data)
+
+    def remove(self, kind, forum_id, user_id):
+        with self._lock:
+            room = self._sets.get((kind, forum_id))
+            if room is not None:
+                room.pop(user_id, None)
+
+    def members(self, kind, forum_id):
+        now = time.time()
+        with self._lock:
+            room = self._sets.get((kind, forum_id), {})
+            return {user_id: data for user_id, (expires_at, _, data) in room.items() if expires_at > now}
+
+    def clear_forum(self, forum_id):
+        with self._lock:
+            for kind in (ONLINE, TYPING):
+                self._sets.pop((kind, forum_id), None)
+
+    def sweep(self):
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key in list(self._sets):
+                room = self._sets[key]
+                for user_id in [user_id for user_id, entry in room.items() if entry[0] <= now]:
+                    del room[user_id]
+                    removed += 1
+                if not room:
+                    del self._sets[key]
+        return removed
+
+    def entries(self, kind):
+        now = time.time()
+        with self._lock:
+            return [
+                (forum_id, user_id, last_seen)
+                for (set_kind, forum_id), room in self._sets.items() if set_kind == kind
+                for user_id, (expires_at, last_seen, _) in room.items() if expires_at > now
+            ]
+
+
+class RedisPresenceBackend(PresenceBackend):
+    """Presence shared by all workers: one sorted set per (kind, forum) scored by expiry time"""
+
+    def __init__(self, url: str, prefix: str = "presence"):
+        import redis
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, kind, forum_id):
+        return f"{self.prefix}:{kind}:{forum_id}"
+
+    def touch(self, kind, forum_id, user_id, ttl, data=None):
+        key = self._key(kind, forum_id)
+        pipe = self._redis.pipeline()
+        pipe.zadd(key, {str(user_id): time.time() + ttl})
+        if data is not None:
+            pipe.hset(f"{key}:data", str(user_id), data)
+        pipe.expire(key, ttl * 2)
+        pipe.expire(f"{key}:data", ttl * 2)
+        pipe.execute()
+
+    def remove(self, kind, forum_id, user_id):
+        key = self._key(kind, forum_id)
+        self._redis.zrem(key, str(user_id))
+        self._redis.hdel(f"{key}:data", str(user_id))
+
+    def members(self, kind, forum_id):
+        key = self._key(kind, forum_id)
+        self._redis.zremrangebyscore(key, "-inf", time.time())
+        user_ids = self._redis.zrange(key, 0, -1)
+        data = self._redis.hmget(f"{key}:data", user_ids) if user_ids else []
+        return {int(user_id): value for user_id, value in zip(user_ids, data)}
+
+    def count(self, kind, forum_id):
+        return self._redis.zcount(self._key(kind, forum_id), time.time(), "+inf")
+
+    def clear_forum(self, forum_id):
+        keys = [self._key(kind, forum_id) for kind in (ONLINE, TYPING)]
+        self._redis.delete(*keys, *[f"{key}:data" for key in keys])
+
+    def entries(self, kind):
+        now = time.time()
+        ttl = ONLINE_TTL_SECONDS if kind == ONLINE else TYPING_TTL_SECONDS
+        result = []
+        for key in self._redis.scan_iter(f"{self.prefix}:{kind}:*"):
+            if key.endswith(":data"):
+                continue
+            forum_id = int(key.rsplit(":", 1)[1])
+            for user_id, expires_at in self._redis.zrangebyscore(key, now, "+inf", withscores=True):
+                result.append((forum_id, int(user_id), expires_at - ttl))
+        return result
+
+
+def backend_from_env() -> PresenceBackend:
+    """PRESENCE_BACKEND=redis (with REDIS_URL) shares presence between workers; default is in-process"""
+    if os.getenv("PRESENCE_BACKEND", "memory") == "redis":
+        return RedisPresenceBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return MemoryPresenceBackend()
+
+
+class PresenceService:
+    """Who is online and who is typing in each forum, without touching the database"""
+
+    def __init__(self, backend: Optional[PresenceBackend] = None):
+        self.backend = backend or MemoryPresenceBackend()
+
+    def heartbeat(self, forum_id: int, user_id: int):
+        self.backend.touch(ONLINE, forum_id, user_id, ONLINE_TTL_SECONDS)
+
+    def leave(self, forum_id: int, user_id: int):
+        self.backend.remove(ONLINE, forum_id, user_id)
+        self.backend.remove(TYPING, forum_id, user_id)
+
+    def online_count(self, forum_id: int) -> int:
+        return self.backend.count(ONLINE, forum_id)
+
+    def set_typing(self, forum_id: int, user_id: int, username: str, is_typing: bool):
+        if is_typing:
+            self.backend.touch(TYPING, forum_id, user_id, TYPING_TTL_SECONDS, username)
+        else:
+            self.backend.remove(TYPING, forum_id, user_id)
+
+    def typing_users(self, forum_id: int, exclude_user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [
+            {"user_id": user_id, "username": username}
+            for user_id, username in self.backend.members(TYPING, forum_id).items()
+            if user_id != exclude_user_id
+        ]
+
+    def clear_forum(self, forum_id: int):
+        self.backend.clear_forum(forum_id)
+
+    def sweep(self) -> int:
+        return self.backend.sweep()
+
+    def write_snapshot(self, db: Session) -> int:
+        """Copy current online users into user_online_status for analytics; returns rows written"""
+        entries = self.backend.entries(ONLINE)
+        seen = {(forum_id, user_id): datetime.utcfromtimestamp(last_seen) for forum_id, user_id, last_seen in entries}
+
+        # Everyone not in the snapshot has gone offline
+        db.query(UserOnlineStatus).filter(UserOnlineStatus.is_online == True).update(
+            {"is_online": False}, synchronize_session=False
+        )
+        if seen:
+            forum_ids = {forum_id for forum_id, _ in seen}
+            existing = {
+                (row.forum_id, row.user_id)
+                for row in db.query(UserOnlineStatus.forum_id, UserOnlineStatus.user_id).filter(
+                    UserOnlineStatus.forum_id.in_(forum_ids)
+                ).all()
+            }
+            rows = [
+                {"forum_id": forum_id, "user_id": user_id, "last_heartbeat": last_seen, "is_online": True}
+                for (forum_id, user_id), last_seen in seen.items()
+            ]
+            db.bulk_update_mappings(UserOnlineStatus, [row for row in rows if (row["forum_id"], row["user_id"]) in existing])
+            db.bulk_insert_mappings(UserOnlineStatus, [row for row in rows if (row["forum_id"], row["user_id"]) not in existing])
+        db.commit()
+        return len(seen)
+
+
+# Global presence service instance
+presence_service = PresenceService(backend_from_env())
@@ -0,0 +1,141 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models import User, Problem, Comment, Vote, Bookmark, ProblemImage
+from typing import Dict, List, Iterable, Optional, Any
+from trending_service import trending_service
+from view_counter import view_counter
+
+
+def load_problem_cards(db: Session, problems: Iterable[Problem]) -> Dict[int, Dict[str, Any]]:
+    """Load author, comment count, vote counts and images for a page of problems.
+
+    Uses one query per relation regardless of how many problems are passed,
+    instead of one query per problem.
+    """
+    problems = list(problems)
+    cards = {
+        problem.id: {
+            "author": None,
+            "comment_count": 0,
+            "like_count": 0,
+            "dislike_count": 0,
+            "images": []
+        } for problem in problems
+    }
+    if not cards:
+        return cards
+
+    problem_ids = list(cards.keys())
+
+    # Authors (query regardless of is_active so deleted users still render)
+    author_ids = {problem.author_id for problem in problems if problem.author_id is not None}
+    authors = {}
+    if author_ids:
+        authors = {author.id: author for author in db.query(User).filter(User.id.in_(author_ids)).all()}
+    for problem in problems:
+        cards[problem.id]["author"] = authors.get(problem.author_id)
+        # Engagement counters are denormalized onto the problem row
+        cards[problem.id]["comment_count"] = problem.comment_count or 0
+        cards[problem.id]["like_count"] = problem.like_count or 0
+        cards[problem.id]["dislike_count"] = problem.dislike_count or 0
+
+    # Images
+    images = db.query(ProblemImage.problem_id, ProblemImage.filename).filter(
+        ProblemImage.problem_id.in_(problem_ids)
+    ).order_by(ProblemImage.id).all()
+    for problem_id, filename in images:
+        cards[problem_id]["images"].append(filename)
+
+    return cards
+
+
+def author_summary(author: Optional[User]) -> Optional[Dict[str, Any]]:
+    """Public author fields shown on problem cards"""
+    if not author:
+        return None
+    return {
+        "id": author.id,
+        "username": author.username,
+        "profile_picture": author.profile_picture
+    }
+
+
+def serialize_problem_card(problem: Problem, card: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize a problem with its preloaded card data into the common listing shape"""
+    return {
+        "id": problem.id,
+        "title": problem.title,
+        "description": problem.description,
+        "tags": problem.tags,
+        "subject": problem.subject,
+        "level": problem.level,
+        "year": problem.year,
+        "author_id": problem.author_id,
+        "forum_id": problem.forum_id,
+        # Include views still buffered in this process
+        "view_count": (problem.view_count or 0) + view_counter.pending(problem.id),
+        "comment_count": card["comment_count"],
+        "like_count": card["like_count"],
+        "dislike_count": card["dislike_count"],
+        "images": card["images"],
+        "created_at": problem.created_at.isoformat() if problem.created_at else None,
+        "updated_at": problem.updated_at.isoformat() if problem.updated_at else None,
+        "author": author_summary(card["author"])
+    }
+
+
+def serialize_problem_cards(db: Session, problems: List[Problem]) -> List[Dict[str, Any]]:
+    """Load card data for a page of problems and serialize them in order"""
+    cards = load_problem_cards(db, problems)
+    return [serialize_problem_card(problem, cards[problem.id]) for problem in problems]
+
+
+VOTE_COUNTER_COLUMNS = {
+    "like": "like_count",
+    "dislike": "dislike_count"
+}
+
+
+def adjust_problem_counters(db: Session, problem_id: int, **deltas: int) -> None:
+    """Atomically add deltas to a problem's engagement counters in the current transaction.
+
+    Example: adjust_problem_counters(db, problem.id, comment_count=1)
+    """
+    values = {
+        getattr(Problem, column): getattr(Problem, column) + delta
+        for column, delta in deltas.items() if delta
+    }
+    if values:
+        db.query(Problem).filter(Problem.id == problem_id).update(values, synchronize_session=False)
+        trending_service.mark_dirty_on_commit(db, problem_id)
+
+
+def adjust_vote_counter(db: Session, problem_id: int, vote_type: Optional[str], delta: int) -> None:
+    """Adjust the like/dislike counter matching a vote type"""
+    column = VOTE_COUNTER_COLUMNS.get(vote_type)
+    if column:
+        adjust_problem_counters(db, problem_id, **{column: delta})
+
+
+def recount_problem_counters(db: Session, problem_ids: Optional[List[int]] = None) -> int:
+    """Recompute engagement counters from the comments, votes and bookmarks tables.
+
+    Repairs any drift between the denormalized columns and the source rows.
+    Returns the number of problems updated. Does not commit.
+    """
+    def counted(column, *criteria):
+        return db.query(func.count(column)).filter(*criteria).scalar_subquery()
+
+    values = {
+        Problem.comment_count: counted(Comment.id, Comment.problem_id == Problem.id),
+        Problem.like_count: counted(Vote.id, Vote.problem_id == Problem.id, Vote.vote_type == "like"),
+        Problem.dislike_count: counted(Vote.id, Vote.problem_id == Problem.id, Vote.vote_type == "dislike"),
+        Problem.bookmark_count: counted(Bookmark.id, Bookmark.problem_id == Problem.id)
+    }
+
+    query = db.query(Problem)
+    if problem_ids is not None:
+        if not problem_ids:
+            return 0
+        query = query.filter(Problem.id.in_(problem_ids))
+    return query.update(values, synchronize_session=False)
@@ -0,0 +1,69 @@
+from typing import Any, Dict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models import Bookmark, Comment, Follow, Problem
+
+PROFILE_PAGE_SIZE = 20
+MAX_PROFILE_PAGE_SIZE = 100
+
+
+def _count(model, *criteria):
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def profile_counts(db: Session, user_id: int) -> Dict[str, int]:
+    """Everything a profile header counts, in one query of indexed scalar subqueries"""
+    row = db.query(
+        _count(Problem, Problem.author_id == user_id).label("problems"),
+        _count(Comment, Comment.author_id == user_id).label("comments"),
+        _count(Comment, Comment.author_id == user_id, Comment.is_solution == True).label("solutions"),
+        _count(Bookmark, Bookmark.user_id == user_id).label("bookmarks"),
+        _count(Follow, Follow.following_id == user_id).label("followers"),
+        _count(Follow, Follow.follower_id == user_id).label("following")
+    ).one()
+    return dict(row._mapping)
+
+
+def page_limit(limit: int) -> int:
+    return min(max(limit, 1), MAX_PROFILE_PAGE_SIZE)
+
+
+def serialize_profile_comment(comment: Comment) -> Dict[str, Any]:
+    """A user's comment with the problem it was made on"""
+    return {
+        "id": comment.id,
+        "text": comment.text,
+        "author_id": comment.author_id,
+        "problem_id": comment.problem_id,
+        "is_solution": comment.is_solution,
+        "created_at": comment.created_at.isoformat() if comment.created_at else None,
+        "updated_at": comment.updated_at.isoformat() if comment.updated_at else None,
+        "problem": {
+            "id": comment.problem.id,
+            "title": comment.problem.title,
+            "subject": comment.problem.subject,
+            "level": comment.problem.level
+        }
+    }
+
+
+def serialize_profile_bookmark(bookmark: Bookmark) -> Dict[str, Any]:
+    """A bookmark with the bookmarked problem"""
+    problem = bookmark.problem
+    return {
+        "id": bookmark.id,
+        "user_id": bookmark.user_id,
+        "problem_id": bookmark.problem_id,
+        "created_at": bookmark.created_at.isoformat() if bookmark.created_at else None,
+        "problem": {
+            "id": problem.id,
+            "title": problem.title,
+            "description": problem.description,
+            "tags": problem.tags,
+            "subject": problem.subject,
+            "level": problem.level,
+            "author_id": problem.author_id,
+            "created_at": problem.created_at.isoformat() if problem.created_at else None,
+            "updated_at": problem.updated_at.isoformat() if problem.updated_at else None
+        }
+    }
@@ -0,0 +1,119 @@
+import re
+from typing import Dict, List, Optional, Any
+from sqlalchemy import case, false, func, literal_column, or_
+from sqlalchemy.orm import Session, Query
+from models import User, Problem, Forum, Follow
+
+# Text search configuration. The ix_problems_search and ix_forums_search indexes are
+# built on exactly these expressions (see the add_search_indexes migration), so any
+# change here needs a matching migration or Postgres will stop using the indexes.
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+EMPTY_TEXT = literal_column("''")
+PROBLEM_SEARCH_FIELDS = [(Problem.title, "A"), (Problem.tags, "B"), (Problem.description, "C")]
+FORUM_SEARCH_FIELDS = [(Forum.title, "A"), (Forum.description, "B")]
+FALLBACK_WEIGHTS = {"A": 3, "B": 2, "C": 1}
+MAX_SEARCH_TERMS = 8
+
+
+def is_postgres(db: Session) -> bool:
+    """Full-text search needs Postgres; other databases use the ILIKE fallback"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a search box query into plain word terms (punctuation is dropped)"""
+    return re.findall(r"\w+", (q or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def search_document(fields):
+    """Weighted tsvector over the given (column, weight) pairs"""
+    document = None
+    for column, weight in fields:
+        part = func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, EMPTY_TEXT)), literal_column(f"'{weight}'"))
+        document = part if document is None else document.op("||")(part)
+    return document
+
+
+def prefix_tsquery(terms: List[str]):
+    """tsquery matching every term as a prefix, so partial words in the search bar match"""
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+
+
+def _apply_text_search(db: Session, query: Query, fields, terms: List[str], newest_column) -> Query:
+    if is_postgres(db):
+        document = search_document(fields)
+        tsquery = prefix_tsquery(terms)
+        return query.filter(document.op("@@")(tsquery)).order_by(
+            func.ts_rank_cd(document, tsquery).desc(), newest_column.desc()
+        )
+
+    # SQLite fallback: every term must appear in some field, ranked by field weight
+    rank = 0
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(or_(*[column.ilike(pattern) for column, _ in fields]))
+        for column, weight in fields:
+            rank = rank + case((column.ilike(pattern), FALLBACK_WEIGHTS[weight]), else_=0)
+    return query.order_by(rank.desc(), newest_column.desc())
+
+
+def search_problems_query(db: Session, q: str, query: Optional[Query] = None) -> Query:
+    """Filter problems matching q and order them by relevance"""
+    query = query if query is not None else db.query(Problem)
+    terms = search_terms(q)
+    if not terms:
+        return query.filter(false())
+    return _apply_text_search(db, query, PROBLEM_SEARCH_FIELDS, terms, Problem.created_at)
+
+
+def search_forums_query(db: Session, q: str, query: Optional[Query] = None) -> Query:
+    """Filter forums matching q and order them by relevance"""
+    query = query if query is not None else db.query(Forum)
+    terms = search_terms(q)
+    if not terms:
+        return query.filter(false())
+    return _apply_text_search(db, query, FORUM_SEARCH_FIELDS, terms, Forum.created_at)
+
+
+def search_users_query(db: Session, q: str, query: Optional[Query] = None) -> Query:
+    """Filter verified users whose username contains q, exact and prefix matches first
+
+    On Postgres the substring match is served by the ix_users_username_trgm trigram index.
+    """
+    query = query if query is not None else db.query(User)
+    needle = (q or "").strip().lower()
+    escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    username = func.lower(User.username)
+    rank = case(
+        (username == needle, 0),
+        (username.like(f"{escaped}%", escape="\\"), 1),
+        else_=2
+    )
+    return query.filter(
+        User.username.ilike(f"%{escaped}%", escape="\\"),
+        User.is_verified == True
+    ).order_by(rank, func.length(User.username), User.id)
+
+
+def serialize_user_results(db: Session, users: List[User], current_user: User) -> List[Dict[str, Any]]:
+    """Serialize user search hits with follower counts and follow state loaded in two queries"""
+    user_ids = [user.id for user in users]
+    follower_counts = {}
+    followed_ids = set()
+    if user_ids:
+        follower_counts = dict(db.query(Follow.following_id, func.count(Follow.id)).filter(
+            Follow.following_id.in_(user_ids)
+        ).group_by(Follow.following_id).all())
+        followed_ids = {row[0] for row in db.query(Follow.following_id).filter(
+            Follow.follower_id == current_user.id,
+            Follow.following_id.in_(user_ids)
+        ).all()}
+
+    return [{
+        "id": user.id,
+        "username": user.username,
+        "bio": user.bio,
+        "profile_picture": user.profile_picture,
+        "follower_count": follower_counts.get(user.id, 0),
+        "is_following": user.id != current_user.id and user.id in followed_ids
+    } for user in users]
@@ -0,0 +1,184 @@
+import os
+import time
+from datetime import datetime
+from threading import Lock
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import session_scope
+from models import SystemSettings, SettingsVersion
+
+# How often a process checks the shared settings version for writes made by other workers
+VERSION_CHECK_SECONDS = float(os.getenv("SETTINGS_VERSION_CHECK_SECONDS", "5"))
+
+
+class SettingsSnapshot:
+    """Immutable view of all system settings at one version"""
+
+    __slots__ = ("version", "values", "loaded_at")
+
+    def __init__(self, version: Optional[int], values: Mapping[str, Any]):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "values", MappingProxyType(dict(values)))
+        object.__setattr__(self, "loaded_at", datetime.utcnow())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SettingsSnapshot is immutable")
+
+    def get_setting(self, key: str, default: Any = None) -> Any:
+        """Get a setting value"""
+        return self.values.get(key, default)
+
+    def get_boolean(self, key: str, default: bool = False) -> bool:
+        """Get a boolean setting"""
+        value = self.values.get(key)
+        if value is None:
+            return default
+        return value.lower() in ('true', '1', 'yes', 'on')
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """Get an integer setting"""
+        try:
+            return int(self.values.get(key) or default)
+        except (ValueError, TypeError):
+            return default
+
+
+class SettingsService:
+    """Service to manage and apply system settings
+
+    Reads are served from an immutable snapshot shared by the whole process. A
+    write bumps the settings_version row and swaps the snapshot; other processes
+    pick the change up on their next version check.
+    """
+
+    def __init__(self, db: Optional[Session] = None):
+        self._lock = Lock()
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._checked_at = 0.0
+
+    @property
+    def snapshot(self) -> SettingsSnapshot:
+        """Current settings snapshot, reloaded if another process changed the settings"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._checked_at >= VERSION_CHECK_SECONDS:
+            snapshot = self._sync()
+        return snapshot
+
+    def _read_version(self, db: Session) -> Optional[int]:
+        try:
+            return db.query(SettingsVersion.version).filter(SettingsVersion.id == 1).scalar()
+        except Exception:
+            # Table not migrated yet, fall back to reloading on every check
+            db.rollback()
+            return None
+
+    def _sync(self, force: bool = False) -> SettingsSnapshot:
+        with self._lock:
+            # Another request may have synced while we waited for the lock
+            if not force and self._snapshot is not None and time.monotonic() - self._checked_at < VERSION_CHECK_SECONDS:
+                return self._snapshot
+
+            with session_scope() as db:
+                version = self._read_version(db)
+                if force or self._snapshot is None or version is None or version != self._snapshot.version:
+                    settings = db.query(SystemSettings.key, SystemSettings.value).all()
+                    self._snapshot = SettingsSnapshot(version, {key: value for key, value in settings})
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def get_setting(self, key: str, default: Any = None) -> Any:
+        """Get a setting value"""
+        return self.snapshot.get_setting(key, default)
+
+    def get_boolean(self, key: str, default: bool = False) -> bool:
+        """Get a boolean setting"""
+        return self.snapshot.get_boolean(key, default)
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """Get an integer setting"""
+        return self.snapshot.get_int(key, default)
+
+    def get_site_settings(self) -> Dict[str, Any]:
+        """Get site-related settings"""
+        return {
+            'name': self.get_setting('site_name', 'Science Pioneers'),
+            'description': self.get_setting('site_description', 'A platform for science enthusiasts'),
+            'logo': self.get_setting('site_logo', ''),
+            'theme': self.get_setting('site_theme', 'light'),
+            'language': self.get_setting('site_language', 'en'),
+            'maintenance_mode': self.get_boolean('maintenance_mode', False),
+            'maintenance_message': self.get_setting('maintenance_message', 'Site under maintenance'),
+            'profile_visibility': self.get_setting('profile_visibility', 'public')
+        }
+
+    def get_feature_settings(self) -> Dict[str, bool]:
+        """Get feature toggle settings"""
+        return {
+            'forums_enabled': self.get_boolean('forums_enabled', True),
+            'comments_enabled': self.get_boolean('comments_enabled', True),
+            'voting_enabled': self.get_boolean('voting_enabled', True),
+            'bookmarks_enabled': self.get_boolean('bookmarks_enabled', True),
+            'following_enabled': self.get_boolean('following_enabled', True),
+            'notifications_enabled': self.get_boolean('notifications_enabled', True),
+            'reports_enabled': self.get_boolean('reports_enabled', True),
+            'registration_enabled': self.get_boolean('registration_enabled', True)
+        }
+
+    def get_security_settings(self) -> Dict[str, Any]:
+        """Get security-related settings"""
+        return {
+            'password_min_length': self.get_int('password_min_length', 8),
+            'password_require_special': self.get_boolean('password_require_special', True),
+            'session_timeout_hours': self.get_int('session_timeout_hours', 24),
+            'max_login_attempts': self.get_int('max_login_attempts', 5),
+            'lockout_duration_minutes': self.get_int('lockout_duration_minutes', 30)
+        }
+
+    def get_content_settings(self) -> Dict[str, Any]:
+        """Get content-related settings"""
+        return {
+            'max_problem_length': self.get_int('max_problem_length', 5000),
+            'max_comment_length': self.get_int('max_comment_length', 1000),
+            'max_forum_description_length': self.get_int('max_forum_description_length', 2000),
+            'auto_moderate_content': self.get_boolean('auto_moderate_content', False),
+            'require_approval_for_problems': self.get_boolean('require_approval_for_problems', False)
+        }
+
+    def is_maintenance_mode(self) -> bool:
+        """Check if maintenance mode is enabled"""
+        return self.get_boolean('maintenance_mode', False)
+
+    def is_feature_enabled(self, feature: str) -> bool:
+        """Check if a specific feature is enabled"""
+        return self.get_boolean(f'{feature}_enabled', True)
+
+    def refresh_cache(self):
+        """Reload the settings snapshot in this process"""
+        self._sync(force=True)
+
+
+# Global settings service instance
+_settings_service = SettingsService()
+
+def get_settings_service(db: Optional[Session] = None) -> SettingsService:
+    """Get the global settings service instance (db is accepted for older callers and unused)"""
+    return _settings_service
+
+def bump_settings_version(db: Session):
+    """Mark settings as changed for every process; committed by the caller"""
+    result = db.execute(
+        update(SettingsVersion).where(SettingsVersion.id == 1).values(
+            version=SettingsVersion.version + 1,
+            updated_at=datetime.utcnow()
+        )
+    )
+    if result.rowcount == 0:
+        db.add(SettingsVersion(id=1, version=1, updated_at=datetime.utcnow()))
+
+def refresh_settings_cache(db: Session):
+    """Publish a settings write: bump the shared version and swap this process's snapshot"""
+    bump_settings_version(db)
+    db.commit()
+    _settings_service.refresh_cache()
@@ -0,0 +1,114 @@
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of logged-in SMTP sessions reused across messages
+
+    Opening a session costs a TCP connect, STARTTLS and AUTH; a pooled one is
+    reused as long as the server keeps it. Sessions idle for a while are
+    checked with NOOP before reuse, and dropped ones are replaced, so callers
+    only see errors for messages the server actually rejected. Blocking: call
+    it from a worker thread (run_in_executor), never from the event loop.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str], password: Optional[str],
+                 use_tls: bool = True, size: int = 4, timeout: float = 30,
+                 keepalive_seconds: float = 10, max_idle_seconds: float = 120, max_messages: int = 100):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max_messages
+        # Most recently used first, so surplus sessions go idle and expire
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        self.connects += 1
+        return smtp
+
+    @staticmethod
+    def _close(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _usable(self, smtp: smtplib.SMTP, idle_since: float, sent: int) -> bool:
+        idle = time.monotonic() - idle_since
+        if idle > self.max_idle_seconds or sent >= self.max_messages:
+            return False
+        if idle > self.keepalive_seconds:
+            try:
+                return smtp.noop()[0] == 250
+            except Exception:
+                return False
+        return True
+
+    def _checkout(self):
+        while True:
+            try:
+                smtp, idle_since, sent = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+            if self._usable(smtp, idle_since, sent):
+                return smtp, sent
+            self._close(smtp)
+
+    @contextmanager
+    def connection(self):
+        """A logged-in session; returned to the pool unless it failed"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise smtplib.SMTPException("Timed out waiting for a pooled SMTP connection")
+        try:
+            smtp, sent = self._checkout()
+            try:
+                yield smtp
+            except Exception:
+                self._close(smtp)
+                raise
+            self._idle.put((smtp, time.monotonic(), sent + 1))
+        finally:
+            self._slots.release()
+
+    def send_message(self, msg):
+        """Send one message, reconnecting once if the server dropped the pooled session"""
+        for attempt in range(2):
+            try:
+                with self.connection() as smtp:
+                    smtp.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                if attempt:
+                    raise
+
+    def close(self):
+        """Close every idle session (on shutdown)"""
+        while True:
+            try:
+                smtp, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(smtp)
@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# The app reads DATABASE_URL when database.py is imported; point it at a throwaway SQLite file
+_db_dir = tempfile.mkdtemp(prefix="sciencepioneers-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main
+import models
+from auth.utils import create_jwt
+from cache_service import cache_service
+from database import SessionLocal, engine
+
+USER_COUNT = 5
+PROBLEM_COUNT = 20
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self):
+        self.count = 0
+        self.active = False
+
+    def __call__(self, *args, **kwargs):
+        if self.active:
+            self.count += 1
+
+
+@pytest.fixture(scope="session")
+def query_counter():
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture(scope="session")
+def seed():
+    """Users, a forum, and problems with comments, votes and images; ids of what was created"""
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        users = [models.User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x",
+                             is_verified=True, last_login=datetime.utcnow()) for i in range(USER_COUNT)]
+        db.add_all(users)
+        db.commit()
+        forum = models.Forum(title="Olympiad prep", description="Practice", creator_id=users[0].id, subject="Math")
+        db.add(forum)
+        db.commit()
+        db.add(models.ForumMembership(forum_id=forum.id, user_id=users[0].id, role="creator"))
+        db.add(models.ForumMembership(forum_id=forum.id, user_id=users[1].id, role="member"))
+
+        for i in range(PROBLEM_COUNT):
+            problem = models.Problem(title=f"alpha problem {i}", description="find alpha", subject="Math",
+                                     tags="algebra", author_id=users[i % USER_COUNT].id,
+                                     forum_id=forum.id if i % 4 == 0 else None)
+            db.add(problem)
+            db.flush()
+            for j in range(3):
+                db.add(models.Comment(text="comment", author_id=users[j].id, problem_id=problem.id))
+            for j in range(i % USER_COUNT):
+                db.add(models.Vote(user_id=users[j].id, problem_id=problem.id, vote_type="like" if j % 2 == 0 else "dislike"))
+            db.add(models.ProblemImage(problem_id=problem.id, filename=f"image{i}.png"))
+        db.add(models.Follow(follower_id=users[0].id, following_id=users[1].id))
+        db.commit()
+
+        import feed_service
+        feed_service.add_author(db, users[0].id, users[1].id)
+        db.commit()
+
+        from problem_service import recount_problem_counters
+        from trending_service import trending_service
+        recount_problem_counters(db)
+        db.commit()
+        trending_service.rebuild(db)
+        return {"user_ids": [user.id for user in users], "forum_id": forum.id}
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def client(seed):
+    # Not entered as a context manager: startup would launch the background loops,
+    # whose queries would land in the query counts
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(seed):
+    def headers(user_index: int = 0):
+        return {"Authorization": f"Bearer {create_jwt(seed['user_ids'][user_index])}"}
+    return headers
+
+
+@pytest.fixture
+def count_queries(client, query_counter, auth_headers):
+    """GET a URL with cold caches and return (response, statements executed)"""
+    def run(url: str, user_index: int = 0):
+        headers = auth_headers(user_index)
+        # Warm process-wide state (settings snapshot and the like) first
+        client.get(url, headers=headers)
+        cache_service.clear()
+        query_counter.count = 0
+        query_counter.active = True
+        try:
+            response = client.get(url, headers=headers)
+        finally:
+            query_counter.active = False
+        return response, query_counter.count
+    return run
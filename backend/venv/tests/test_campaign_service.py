@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import models
+from campaign_service import CampaignSender, STALE_SECONDS
+from database import SessionLocal
+
+
+class BrokenTemplateEmailService:
+    def create_campaign_email(self, content):
+        raise ValueError("template could not be rendered")
+
+
+def test_campaign_that_cannot_start_is_failed_and_not_reclaimed(seed):
+    db = SessionLocal()
+    try:
+        campaign = models.EmailCampaign(subject="Launch", content="<p>Hi</p>", target_audience="all",
+                                        created_by=seed["user_ids"][0], status="draft")
+        db.add(campaign)
+        db.commit()
+        sender = CampaignSender(email_service=BrokenTemplateEmailService())
+        assert sender.claim(db, campaign.id)
+
+        asyncio.run(sender.run(campaign.id))
+
+        db.expire_all()
+        assert campaign.status == "failed"
+        # Even once its heartbeat is long stale, the resume loop leaves it alone
+        campaign.heartbeat_at = datetime.utcnow() - timedelta(seconds=STALE_SECONDS * 2)
+        db.commit()
+        assert campaign.id not in sender._claim_abandoned()
+    finally:
+        db.query(models.EmailCampaign).delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import forum_deletion
+import models
+from database import SessionLocal
+from forum_deletion import STAGE_NAMES, STALE_SECONDS, ForumDeleter
+
+PROBLEMS = 5
+
+
+@pytest.fixture
+def doomed_forum(seed, monkeypatch):
+    """A forum of its own (the seeded one is shared with other tests) with rows in every table a deletion touches
+
+    Yields (db, forum id, its running deletion job, problem titles, rows the
+    deletion must remove, drafts before it).
+    """
+    monkeypatch.setattr(forum_deletion, "CHUNK_SIZE", 2)
+    user_ids = seed["user_ids"]
+    db = SessionLocal()
+    forum = models.Forum(title="Doomed", creator_id=user_ids[0])
+    other = models.Forum(title="Neighbour", creator_id=user_ids[1])
+    db.add_all([forum, other])
+    db.flush()
+
+    rows = 0
+    for user_id in user_ids[:3]:
+        db.add(models.ForumMembership(forum_id=forum.id, user_id=user_id, role="member"))
+        db.add(models.UserOnlineStatus(forum_id=forum.id, user_id=user_id))
+    db.add(models.ForumInvitation(forum_id=forum.id, inviter_id=user_ids[0], invitee_id=user_ids[3]))
+    db.add(models.ForumJoinRequest(forum_id=forum.id, user_id=user_ids[4]))
+    rows += 3 + 3 + 1 + 1
+
+    titles = []
+    for i in range(PROBLEMS):
+        problem = models.Problem(title=f"Doomed problem {i}", description="...", subject="Math",
+                                 author_id=user_ids[i % 3], forum_id=forum.id)
+        db.add(problem)
+        db.flush()
+        titles.append(problem.title)
+        comment = models.Comment(text="comment", author_id=user_ids[1], problem_id=problem.id)
+        db.add(comment)
+        db.flush()
+        db.add(models.Comment(text="reply", author_id=user_ids[2], problem_id=problem.id, parent_comment_id=comment.id))
+        db.add(models.Vote(user_id=user_ids[3], problem_id=problem.id, vote_type="like"))
+        db.add(models.Bookmark(user_id=user_ids[4], problem_id=problem.id))
+        db.add(models.ProblemImage(problem_id=problem.id, filename=f"doomed{i}.png"))
+        rows += 1 + 2 + 1 + 1 + 1
+
+        message = models.ForumMessage(forum_id=forum.id, author_id=user_ids[0], content="look", problem_id=problem.id)
+        db.add(message)
+        db.flush()
+        db.add(models.ForumReply(forum_id=forum.id, parent_message_id=message.id, author_id=user_ids[1], content="nice"))
+        db.add(models.ForumMessageChange(forum_id=forum.id, message_id=message.id, change_type="replied"))
+        rows += 3
+
+    # One problem was also shared in another forum; that message and its reply go with the problem
+    shared = models.ForumMessage(forum_id=other.id, author_id=user_ids[1], content="see this", problem_id=problem.id)
+    db.add(shared)
+    db.flush()
+    db.add(models.ForumReply(forum_id=other.id, parent_message_id=shared.id, author_id=user_ids[2], content="ok"))
+    rows += 2 + 1  # ... and the forum row itself
+
+    job = models.ForumDeletionJob(forum_id=forum.id, forum_title=forum.title, requested_by=user_ids[0],
+                                  status="running", started_at=datetime.utcnow(), heartbeat_at=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    drafts_before = db.query(models.Draft).count()
+    try:
+        yield db, forum.id, job, titles, rows, drafts_before
+    finally:
+        db.rollback()
+        db.query(models.Draft).filter(models.Draft.title.in_(titles)).delete(synchronize_session=False)
+        db.query(models.ForumDeletionJob).delete()
+        db.query(models.Forum).filter(models.Forum.id == other.id).delete()
+        db.commit()
+        db.close()
+
+
+def assert_forum_gone(db, forum_id: int, titles):
+    for model in (models.ForumMembership, models.UserOnlineStatus, models.ForumInvitation, models.ForumJoinRequest,
+                  models.ForumMessage, models.ForumReply, models.ForumMessageChange, models.Problem):
+        assert db.query(model).filter(model.forum_id == forum_id).count() == 0, model.__tablename__
+    problem_ids = db.query(models.Problem.id).filter(models.Problem.title.in_(titles))
+    assert problem_ids.count() == 0
+    for model in (models.Comment, models.Vote, models.Bookmark, models.ProblemImage, models.ForumMessage):
+        assert db.query(model).filter(model.problem_id.in_(problem_ids)).count() == 0, model.__tablename__
+    assert db.query(models.ForumMessage).filter(models.ForumMessage.content == "see this").count() == 0
+    assert db.query(models.ForumReply).filter(models.ForumReply.content == "ok").count() == 0
+    assert db.query(models.Forum).filter(models.Forum.id == forum_id).count() == 0
+
+
+def test_deletion_moves_problems_to_drafts_and_removes_everything(doomed_forum):
+    db, forum_id, job, titles, rows, drafts_before = doomed_forum
+    deleter = ForumDeleter()
+    chunks = []
+    run_chunk = deleter._run_chunk
+
+    def recording_chunk(job_id, forum_id, name, step):
+        chunks.append(name)
+        return run_chunk(job_id, forum_id, name, step)
+
+    deleter._run_chunk = recording_chunk
+    asyncio.run(deleter.run(job.id))
+
+    db.expire_all()
+    assert_forum_gone(db, forum_id, titles)
+    drafts = db.query(models.Draft).filter(models.Draft.title.in_(titles)).order_by(models.Draft.title).all()
+    assert [draft.title for draft in drafts] == sorted(titles)
+    assert db.query(models.Draft).count() == drafts_before + PROBLEMS
+    assert (job.status, job.stage, job.drafts_created, job.rows_deleted) == ("completed", STAGE_NAMES[-1], PROBLEMS, rows)
+    assert job.finished_at is not None
+    # CHUNK_SIZE is 2, so the five problems took three chunks (and one more to find none left)
+    assert chunks.count("problems") == 4
+
+
+def test_abandoned_job_resumes_from_its_stage_and_sweeps_late_rows(doomed_forum, seed):
+    db, forum_id, job, titles, rows, _ = doomed_forum
+    first = ForumDeleter()
+    # The first process gets through the replies and messages, then dies mid-way through the problems
+    for name, step in forum_deletion.STAGES[:3]:
+        while first._run_chunk(job.id, forum_id, name, step):
+            pass
+    problems_stage = dict(forum_deletion.STAGES)["problems"]
+    assert first._run_chunk(job.id, forum_id, "problems", problems_stage)
+
+    # A message and a reply posted after their stages already ran
+    late = models.ForumMessage(forum_id=forum_id, author_id=seed["user_ids"][0], content="late")
+    db.add(late)
+    db.flush()
+    db.add(models.ForumReply(forum_id=forum_id, parent_message_id=late.id, author_id=seed["user_ids"][1], content="late"))
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=STALE_SECONDS + 1)
+    db.commit()
+
+    second = ForumDeleter()
+    assert second._claim_abandoned() == [job.id]
+    stages = []
+    run_chunk = second._run_chunk
+
+    def recording_chunk(job_id, forum_id, name, step):
+        stages.append(name)
+        return run_chunk(job_id, forum_id, name, step)
+
+    second._run_chunk = recording_chunk
+    asyncio.run(second.run(job.id))
+
+    db.expire_all()
+    # Picked up at the recorded stage; the late rows are swept by _finish
+    assert stages[0] == "problems"
+    assert "replies" not in stages and "messages" not in stages
+    assert_forum_gone(db, forum_id, titles)
+    assert db.query(models.Draft).filter(models.Draft.title.in_(titles)).count() == PROBLEMS
+    assert (job.status, job.drafts_created, job.rows_deleted) == ("completed", PROBLEMS, rows + 2)
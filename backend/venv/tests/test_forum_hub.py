@@ -0,0 +1,12 @@
+import pytest
+
+from forum_hub import Broker, LocalBroker
+
+
+def test_broker_without_publish_fails_at_construction():
+    class IncompleteBroker(Broker):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBroker()
+    LocalBroker()
@@ -0,0 +1,55 @@
+"""get_messages' ETag moves when replies change the reply counts it embeds"""
+import pytest
+
+
+@pytest.fixture
+def message_id(client, auth_headers, seed):
+    response = client.post(f"/auth/forums/{seed['forum_id']}/messages",
+                           json={"content": "Who has a hint for problem 4?"}, headers=auth_headers())
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def _get_messages(client, headers, forum_id, etag=None):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(f"/auth/forums/{forum_id}/messages", headers=headers)
+
+
+def _reply_count(response, message_id):
+    return next(message["reply_count"] for message in response.json() if message["id"] == message_id)
+
+
+def test_reply_invalidates_message_etag(client, auth_headers, seed, message_id):
+    forum_id = seed["forum_id"]
+    headers = auth_headers()
+    first = _get_messages(client, headers, forum_id)
+    etag = first.headers["ETag"]
+    assert _get_messages(client, headers, forum_id, etag).status_code == 304
+
+    reply = client.post(f"/auth/forums/{forum_id}/messages/{message_id}/replies",
+                        json={"content": "Try induction", "parent_message_id": message_id}, headers=auth_headers(1))
+    assert reply.status_code == 200
+
+    after_reply = _get_messages(client, headers, forum_id, etag)
+    assert after_reply.status_code == 200
+    assert after_reply.headers["ETag"] != etag
+    assert _reply_count(after_reply, message_id) == 1
+
+    deleted = client.delete(f"/auth/forums/{forum_id}/replies/{reply.json()['id']}", headers=auth_headers(1))
+    assert deleted.status_code == 200
+
+    after_delete = _get_messages(client, headers, forum_id, after_reply.headers["ETag"])
+    assert after_delete.status_code == 200
+    assert _reply_count(after_delete, message_id) == 0
+
+
+def test_reply_changes_are_in_the_change_log(client, auth_headers, seed, message_id):
+    forum_id = seed["forum_id"]
+    after = int(_get_messages(client, auth_headers(), forum_id).headers["X-Last-Change-Id"])
+
+    client.post(f"/auth/forums/{forum_id}/messages/{message_id}/replies",
+                json={"content": "Look at small cases", "parent_message_id": message_id}, headers=auth_headers(1))
+
+    changes = client.get(f"/auth/forums/{forum_id}/messages/changes?after={after}", headers=auth_headers()).json()["changes"]
+    assert [(change["message_id"], change["change_type"], change["reply_count"]) for change in changes] == [(message_id, "replied", 1)]
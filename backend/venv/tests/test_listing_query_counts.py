@@ -0,0 +1,38 @@
+"""Listing endpoints load problem cards with a fixed number of queries, whatever the page size"""
+import pytest
+
+# (url, statements on a cold cache); the auth lookup is included
+LISTINGS = [
+    ("/auth/problems/?limit={limit}", 4),
+    ("/auth/problems/trending?limit={limit}", 5),
+    ("/auth/problems/Math?limit={limit}", 3),
+    ("/auth/forums/{forum_id}/problems?limit={limit}", 5),
+    ("/auth/user/user1/problems?limit={limit}", 5),
+    ("/auth/feed/following?limit={limit}", 6),
+    ("/auth/search/combined?q=alpha&limit={limit}", 6),
+    ("/auth/search/advanced?q=alpha&limit={limit}", 5),
+]
+
+
+def _problems(body):
+    return body if isinstance(body, list) else body["problems"]
+
+
+@pytest.mark.parametrize("url,expected", LISTINGS)
+@pytest.mark.parametrize("limit", [2, 10])
+def test_listing_query_count(count_queries, seed, url, expected, limit):
+    response, queries = count_queries(url.format(limit=limit, forum_id=seed["forum_id"]))
+
+    assert response.status_code == 200
+    problems = _problems(response.json())
+    assert problems, "the seed data should give every listing at least one problem"
+    assert queries == expected
+
+
+def test_cards_carry_batched_fields(client, auth_headers):
+    response = client.get("/auth/problems/?limit=5", headers=auth_headers())
+
+    for card in response.json()["problems"]:
+        assert card["author"]["username"].startswith("user")
+        assert card["comment_count"] == 3
+        assert len(card["images"]) == 1
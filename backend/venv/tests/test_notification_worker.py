@@ -0,0 +1,147 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+from database import SessionLocal
+from notification_worker import BACKOFF_BASE_SECONDS, CLAIM_LEASE_SECONDS, MAX_ATTEMPTS, NotificationWorker
+
+
+class StubEmailService:
+    def __init__(self, ok: bool):
+        self.ok = ok
+        self.sent = []
+
+    def deliver_notification_email(self, email, subject, body):
+        self.sent.append(email)
+        return self.ok
+
+
+@pytest.fixture
+def outbox(seed):
+    """Adds outbox rows for a verified user; returns (db, add)"""
+    db = SessionLocal()
+
+    def add(count: int = 1):
+        rows = [models.NotificationOutbox(user_id=seed["user_ids"][0], type="like", title="New like", message="Someone liked your problem")
+                for _ in range(count)]
+        db.add_all(rows)
+        db.commit()
+        return rows
+
+    try:
+        yield db, add
+    finally:
+        db.rollback()
+        db.query(models.NotificationOutbox).delete()
+        db.commit()
+        db.close()
+
+
+def make_due(db, row):
+    row.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_failed_delivery_is_retried_with_backoff(outbox):
+    db, add = outbox
+    row, = add()
+    worker = NotificationWorker(email_service=StubEmailService(ok=False))
+
+    before = datetime.utcnow()
+    assert worker.process_batch() == 1
+
+    db.refresh(row)
+    assert row.status == "pending"
+    assert row.attempts == 1
+    assert row.last_error == "Email service reported failure"
+    delay = (row.next_attempt_at - before).total_seconds()
+    assert BACKOFF_BASE_SECONDS * 0.8 - 1 <= delay <= BACKOFF_BASE_SECONDS * 1.2 + 1
+    assert worker.metrics.snapshot()["retried"] == 1
+    # Not due again until the backoff has passed
+    assert worker.process_batch() == 0
+
+    # The second retry waits about twice as long
+    make_due(db, row)
+    before = datetime.utcnow()
+    assert worker.process_batch() == 1
+    db.refresh(row)
+    delay = (row.next_attempt_at - before).total_seconds()
+    assert BACKOFF_BASE_SECONDS * 1.6 - 1 <= delay <= BACKOFF_BASE_SECONDS * 2.4 + 1
+
+
+def test_delivery_is_dead_lettered_after_max_attempts(outbox):
+    db, add = outbox
+    row, = add()
+    email_service = StubEmailService(ok=False)
+    worker = NotificationWorker(email_service=email_service)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        make_due(db, row)
+        assert worker.process_batch() == 1
+        db.refresh(row)
+        assert row.attempts == attempt
+        assert row.status == ("dead" if attempt == MAX_ATTEMPTS else "pending")
+
+    # Dead rows are never claimed again, however old
+    make_due(db, row)
+    assert worker.process_batch() == 0
+    assert len(email_service.sent) == MAX_ATTEMPTS
+    assert worker.metrics.snapshot()["dead"] == 1
+
+    # Until an admin puts them back in the queue
+    assert worker.retry_dead(db, row.id) == 1
+    db.commit()
+    email_service.ok = True
+    assert worker.process_batch() == 1
+    db.refresh(row)
+    assert (row.status, row.attempts, row.last_error) == ("sent", 1, None)
+
+
+def test_claimed_row_is_leased_until_the_lease_expires(outbox):
+    db, add = outbox
+    row, = add()
+    worker = NotificationWorker(email_service=StubEmailService(ok=True))
+
+    claim_db = SessionLocal()
+    try:
+        assert [item["id"] for item in worker.claim_batch(claim_db)] == [row.id]
+        # Its worker is still sending: nobody else gets it
+        assert worker.claim_batch(claim_db) == []
+        db.refresh(row)
+        assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=CLAIM_LEASE_SECONDS - 5)
+
+        # Its worker died mid-send: once the lease runs out the row is claimed again
+        make_due(db, row)
+        claimed = worker.claim_batch(claim_db)
+        assert [(item["id"], item["attempts"]) for item in claimed] == [(row.id, 2)]
+    finally:
+        claim_db.close()
+
+
+def test_concurrent_workers_claim_each_row_once(outbox):
+    db, add = outbox
+    rows = add(20)
+    worker = NotificationWorker(email_service=StubEmailService(ok=True))
+    start = threading.Barrier(6)
+    claimed, errors = [], []
+
+    def claim():
+        claim_db = SessionLocal()
+        try:
+            start.wait()
+            claimed.extend(item["id"] for item in worker.claim_batch(claim_db))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            claim_db.close()
+
+    threads = [threading.Thread(target=claim) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert sorted(claimed) == sorted(row.id for row in rows)
@@ -0,0 +1,125 @@
+"""Load behaviour of the bcrypt worker pool
+
+Logins and registrations hash on PasswordHasher's own threads, so a burst
+of them must not stall other requests, and a full queue answers 503
+instead of growing.
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import main
+import models
+from auth.utils import PasswordHasher, password_hasher, pwd_context
+from database import SessionLocal
+
+CONCURRENT_LOGINS = 6
+PASSWORD = "correct horse battery"
+
+
+@pytest.fixture(scope="module")
+def login_user(seed):
+    db = SessionLocal()
+    try:
+        user = models.User(username="loadtester", email="loadtester@example.com",
+                           password_hash=pwd_context.hash(PASSWORD), is_verified=True)
+        db.add(user)
+        db.commit()
+        yield user.email
+        db.delete(user)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_cheap_requests_stay_fast_during_a_login_burst(login_user):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def login():
+                return await client.post("/auth/login", json={"email": login_user, "password": PASSWORD})
+
+            async def probe():
+                latencies = []
+                while not logins.done():
+                    started = time.perf_counter()
+                    response = await client.get("/")
+                    latencies.append(time.perf_counter() - started)
+                    assert response.status_code == 200
+                    await asyncio.sleep(0.02)
+                return latencies
+
+            logins = asyncio.ensure_future(asyncio.gather(*[login() for _ in range(CONCURRENT_LOGINS)]))
+            latencies = await probe()
+            return await logins, latencies
+
+    completed_before = password_hasher.completed
+    responses, latencies = asyncio.run(scenario())
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_LOGINS
+    assert password_hasher.completed - completed_before == CONCURRENT_LOGINS
+    assert len(latencies) >= 3
+    # Each login holds a bcrypt worker for a few hundred ms; the probe never waits on one
+    assert max(latencies) < 0.1, f"slowest probe took {max(latencies) * 1000:.0f} ms"
+
+
+def test_hashing_does_not_block_the_event_loop():
+    async def scenario():
+        hasher = PasswordHasher(workers=2, max_pending=16)
+        hashes = asyncio.ensure_future(asyncio.gather(*[hasher.hash_async(PASSWORD) for _ in range(4)]))
+        lag = 0.0
+        while not hashes.done():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - started - 0.01)
+        return await hashes, lag
+
+    hashes, lag = asyncio.run(scenario())
+
+    assert all(pwd_context.verify(PASSWORD, hashed) for hashed in hashes)
+    assert lag < 0.05, f"event loop stalled for {lag * 1000:.0f} ms"
+
+
+def test_full_queue_is_rejected_with_503():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        queued = [hasher.submit(release.wait, 5) for _ in range(2)]
+        with pytest.raises(HTTPException) as rejected:
+            hasher.submit(release.wait, 5)
+        assert rejected.value.status_code == 503
+        assert hasher.snapshot()["rejected"] == 1
+    finally:
+        release.set()
+    for future in queued:
+        future.result(timeout=5)
+
+    # Room again once the queue drains
+    assert hasher.submit(lambda: "ok").result(timeout=5) == "ok"
+    assert hasher.snapshot()["max_pending_seen"] == 2
+
+
+def test_cancelled_callers_free_their_queue_slots():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, max_pending=8)
+        release = threading.Event()
+        blocker = hasher.submit(release.wait, 5)
+        waiting = [asyncio.ensure_future(hasher.hash_async(PASSWORD)) for _ in range(7)]
+        await asyncio.sleep(0)
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        queued = hasher.snapshot()["queued"]
+        release.set()
+        await asyncio.wrap_future(blocker)
+        return hasher, queued
+
+    hasher, queued = asyncio.run(scenario())
+
+    assert queued == 0
+    assert hasher.pending == 0
+    assert hasher.snapshot()["completed"] == 1
@@ -0,0 +1,13 @@
+import pytest
+
+from presence_service import MemoryPresenceBackend, PresenceBackend
+
+
+def test_backend_missing_a_method_fails_at_construction():
+    class IncompleteBackend(PresenceBackend):
+        def touch(self, kind, forum_id, user_id, ttl, data=None):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+    MemoryPresenceBackend()
@@ -0,0 +1,85 @@
+from sqlalchemy import func
+
+import models
+from database import SessionLocal
+from problem_service import recount_problem_counters
+
+COUNTERS = ("comment_count", "like_count", "dislike_count", "bookmark_count")
+
+
+def counters(db, problem_id: int):
+    db.expire_all()
+    problem = db.query(models.Problem).filter(models.Problem.id == problem_id).one()
+    return {column: getattr(problem, column) for column in COUNTERS}
+
+
+def source_counts(db, problem_id: int):
+    def votes(vote_type):
+        return db.query(func.count(models.Vote.id)).filter(models.Vote.problem_id == problem_id, models.Vote.vote_type == vote_type).scalar()
+
+    return {
+        "comment_count": db.query(func.count(models.Comment.id)).filter(models.Comment.problem_id == problem_id).scalar(),
+        "like_count": votes("like"),
+        "dislike_count": votes("dislike"),
+        "bookmark_count": db.query(func.count(models.Bookmark.id)).filter(models.Bookmark.problem_id == problem_id).scalar()
+    }
+
+
+def test_engagement_endpoints_keep_counters_equal_to_source_rows(client, auth_headers):
+    db = SessionLocal()
+    try:
+        problem_id = db.query(models.Problem.id).filter(models.Problem.title == "alpha problem 3").scalar()
+        base = "/auth/problems/{}".format(problem_id)
+        before = counters(db, problem_id)
+        assert before == source_counts(db, problem_id)
+
+        def step(user_index, method, path, **kwargs):
+            response = client.request(method, base + path, headers=auth_headers(user_index), **kwargs)
+            assert response.status_code == 200, response.text
+            assert counters(db, problem_id) == source_counts(db, problem_id), f"{method} {path}"
+            return response.json()
+
+        comment = step(1, "POST", "/comments", json={"text": "first"})
+        reply = step(2, "POST", "/comments", json={"text": "reply", "parent_comment_id": comment["id"]})
+        step(4, "POST", "/vote", json={"vote_type": "like"})
+        step(4, "POST", "/vote", json={"vote_type": "dislike"})  # Switches the vote
+        step(4, "POST", "/vote", json={"vote_type": "dislike"})  # Same type again removes it
+        step(4, "POST", "/vote", json={"vote_type": "like"})
+        step(3, "POST", "/bookmark")
+        step(4, "POST", "/bookmark")
+        step(3, "DELETE", "/bookmark")
+        step(2, "DELETE", f"/comments/{reply['id']}")
+        step(1, "DELETE", f"/comments/{comment['id']}")
+
+        after = counters(db, problem_id)
+        assert after["like_count"] == before["like_count"] + 1
+        assert after["bookmark_count"] == before["bookmark_count"] + 1
+        assert after["comment_count"] == before["comment_count"]
+    finally:
+        db.close()
+
+
+def test_recount_repairs_drifted_counters(seed):
+    db = SessionLocal()
+    try:
+        problem_ids = [problem_id for problem_id, in db.query(models.Problem.id).order_by(models.Problem.id).limit(3)]
+        expected = {problem_id: source_counts(db, problem_id) for problem_id in problem_ids}
+        db.query(models.Problem).filter(models.Problem.id.in_(problem_ids)).update(
+            {getattr(models.Problem, column): 99 for column in COUNTERS}, synchronize_session=False
+        )
+        db.commit()
+
+        # Only the problems asked for are touched
+        assert recount_problem_counters(db, problem_ids[:2]) == 2
+        db.commit()
+        assert [counters(db, problem_id) for problem_id in problem_ids[:2]] == [expected[problem_id] for problem_id in problem_ids[:2]]
+        assert counters(db, problem_ids[2]) == {column: 99 for column in COUNTERS}
+        assert recount_problem_counters(db, []) == 0
+
+        assert recount_problem_counters(db) == db.query(models.Problem).count()
+        db.commit()
+        assert counters(db, problem_ids[2]) == expected[problem_ids[2]]
+    finally:
+        recount_problem_counters(db)
+        db.commit()
+        db.close()
@@ -0,0 +1,218 @@
+"""The main endpoint queries are served by the indexes meant for them
+
+Seeds a scratch schema on Postgres with a few thousand rows per table,
+ANALYZEs it, and checks that EXPLAIN for each query shape uses the index
+built for its filter and ordering. Sequential scans stay enabled, so the
+planner picks an index only where it actually beats reading the table.
+Needs TEST_POSTGRES_URL; the schema is dropped afterwards.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import models
+from models import (
+    User, Problem, ProblemTrending, Comment, Vote, Bookmark, Follow, Notification, Forum, ProblemImage,
+    ForumMembership, ForumMessage, ForumMessageChange, ForumReply, AdminAction, FeedEntry
+)
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+SCHEMA = "query_plan_check"
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to check query plans against Postgres")
+
+USERS = 2000
+FORUMS = 50
+PROBLEMS = 5000
+FORUM_MESSAGES = 20000
+
+# (name, indexes that may serve it, query) matching the filters and ordering used by the endpoints
+ENDPOINT_QUERIES = [
+    ("feed problems", {"ix_problems_forum_id_created_at"},
+     lambda db: db.query(Problem).filter(Problem.forum_id.is_(None)).order_by(Problem.created_at.desc(), Problem.id.desc()).limit(11)),
+    ("forum problems", {"ix_problems_forum_id_created_at"},
+     lambda db: db.query(Problem).filter(Problem.forum_id == 1).order_by(Problem.created_at.desc(), Problem.id.desc()).limit(51)),
+    ("profile problems", {"ix_problems_author_id_created_at"},
+     lambda db: db.query(Problem).filter(Problem.author_id == 1).order_by(Problem.created_at.desc())),
+    ("trending", {"ix_problem_trending_score"},
+     lambda db: db.query(ProblemTrending).order_by(ProblemTrending.score.desc(), ProblemTrending.problem_id.desc()).limit(11)),
+    ("problem comments", {"ix_comments_problem_id_created_at"},
+     lambda db: db.query(Comment).filter(Comment.problem_id == 1, Comment.parent_comment_id.is_(None)).order_by(Comment.created_at.desc())),
+    ("comment replies", {"ix_comments_parent_comment_id_created_at"},
+     lambda db: db.query(Comment).filter(Comment.parent_comment_id == 1).order_by(Comment.created_at.asc())),
+    ("profile comments", {"ix_comments_author_id_created_at"},
+     lambda db: db.query(Comment).filter(Comment.author_id == 1).order_by(Comment.created_at.desc())),
+    ("vote counts", {"ix_votes_problem_id_vote_type"},
+     lambda db: db.query(func.count(Vote.id)).filter(Vote.problem_id == 1, Vote.vote_type == "like")),
+    ("user vote", {"uix_user_problem", "ix_votes_problem_id_vote_type"},
+     lambda db: db.query(Vote).filter(Vote.user_id == 1, Vote.problem_id == 1)),
+    ("user bookmarks", {"ix_bookmarks_user_id_created_at", "uix_user_problem_bookmark"},
+     lambda db: db.query(Bookmark).filter(Bookmark.user_id == 1).order_by(Bookmark.created_at.desc())),
+    ("bookmark counts", {"ix_bookmarks_problem_id"},
+     lambda db: db.query(func.count(Bookmark.id)).filter(Bookmark.problem_id == 1)),
+    ("follower counts", {"ix_follows_following_id"},
+     lambda db: db.query(func.count(Follow.id)).filter(Follow.following_id == 1)),
+    ("following list", {"uix_follower_following"},
+     lambda db: db.query(Follow).filter(Follow.follower_id == 1)),
+    ("notifications", {"ix_notifications_user_id_is_read_created_at"},
+     lambda db: db.query(Notification).filter(Notification.user_id == 1).order_by(Notification.created_at.desc())),
+    ("unread notifications", {"ix_notifications_user_id_is_read_created_at"},
+     lambda db: db.query(func.count(Notification.id)).filter(Notification.user_id == 1, Notification.is_read == False)),
+    ("my forums", {"ix_forum_memberships_user_id"},
+     lambda db: db.query(ForumMembership).filter(ForumMembership.user_id == 1, ForumMembership.is_active == True)),
+    ("forum membership", {"unique_forum_membership", "ix_forum_memberships_user_id"},
+     lambda db: db.query(ForumMembership).filter(ForumMembership.forum_id == 1, ForumMembership.user_id == 1)),
+    ("forum messages", {"ix_forum_messages_forum_id_created_at"},
+     lambda db: db.query(ForumMessage).filter(ForumMessage.forum_id == 1).order_by(ForumMessage.created_at.desc(), ForumMessage.id.desc()).limit(101)),
+    ("forum messages after id", {"ix_forum_messages_forum_id_id"},
+     lambda db: db.query(ForumMessage).filter(ForumMessage.forum_id == 1, ForumMessage.id > 1).order_by(ForumMessage.id.asc()).limit(100)),
+    ("forum message version", {"ix_forum_messages_forum_id_id"},
+     lambda db: db.query(func.max(ForumMessage.id)).filter(ForumMessage.forum_id == 1)),
+    ("forum message changes", {"ix_forum_message_changes_forum_id_id"},
+     lambda db: db.query(ForumMessageChange).filter(ForumMessageChange.forum_id == 1, ForumMessageChange.id > 0).order_by(ForumMessageChange.id.asc()).limit(200)),
+    ("message replies", {"ix_forum_replies_parent_message_id_created_at"},
+     lambda db: db.query(ForumReply).filter(ForumReply.parent_message_id == 1).order_by(ForumReply.created_at.asc())),
+    ("following feed", {"ix_feed_entries_user_id_created_at"},
+     lambda db: db.query(FeedEntry).filter(FeedEntry.user_id == 1).order_by(FeedEntry.created_at.desc(), FeedEntry.problem_id.desc()).limit(21)),
+    ("forum replies to delete", {"ix_forum_replies_forum_id"},
+     lambda db: db.query(ForumReply.id).filter(ForumReply.forum_id == 1).limit(500)),
+    ("problem messages to delete", {"ix_forum_messages_problem_id"},
+     lambda db: db.query(ForumMessage.id).filter(ForumMessage.problem_id.in_([1, 2]))),
+    ("problem images to delete", {"ix_problem_images_problem_id"},
+     lambda db: db.query(ProblemImage.id).filter(ProblemImage.problem_id.in_([1, 2]))),
+    ("admin users", {"ix_users_created_at"},
+     lambda db: db.query(User).order_by(User.created_at.desc(), User.id.desc()).limit(21)),
+    ("admin actions", {"ix_admin_actions_created_at"},
+     lambda db: db.query(AdminAction).order_by(AdminAction.created_at.desc(), AdminAction.id.desc()).limit(51)),
+]
+
+
+def seed_rows(db: Session):
+    """A site with a few thousand rows per table, spread over users, forums and problems"""
+    start = datetime(2024, 1, 1)
+
+    def at(i: int) -> datetime:
+        return start + timedelta(minutes=i)
+
+    def user(i: int) -> int:
+        return i % USERS + 1
+
+    def problem(i: int) -> int:
+        return i % PROBLEMS + 1
+
+    db.execute(insert(User), [
+        {"username": f"user{i}", "email": f"user{i}@example.com", "password_hash": "x", "created_at": at(i)}
+        for i in range(USERS)
+    ])
+    db.execute(insert(Forum), [{"title": f"Forum {i}", "creator_id": user(i), "created_at": at(i)} for i in range(FORUMS)])
+    db.execute(insert(ForumMembership), [
+        {"forum_id": (i + k * 7) % FORUMS + 1, "user_id": i + 1, "role": "member"}
+        for i in range(USERS) for k in range(3)
+    ])
+    # One problem in five is posted in a forum
+    db.execute(insert(Problem), [
+        {"title": f"Problem {i}", "description": "...", "subject": "Math", "author_id": user(i * 7),
+         "forum_id": i % FORUMS + 1 if i % 5 == 0 else None, "created_at": at(i)}
+        for i in range(PROBLEMS)
+    ])
+    db.execute(insert(ProblemTrending), [{"problem_id": i + 1, "score": float(i % 997)} for i in range(PROBLEMS)])
+    db.execute(insert(ProblemImage), [{"problem_id": i + 1, "filename": f"image{i}.png"} for i in range(PROBLEMS)])
+    db.execute(insert(Comment), [
+        {"text": "comment", "author_id": user(i * 3), "problem_id": problem(i), "created_at": at(i)}
+        for i in range(PROBLEMS * 4)
+    ])
+    db.execute(insert(Comment), [
+        {"text": "reply", "author_id": user(i * 5), "problem_id": problem(i), "parent_comment_id": i + 1, "created_at": at(i)}
+        for i in range(PROBLEMS)
+    ])
+    db.execute(insert(Vote), [
+        {"user_id": user(i + k * 101), "problem_id": i + 1, "vote_type": "like" if k % 3 else "dislike"}
+        for i in range(PROBLEMS) for k in range(4)
+    ])
+    db.execute(insert(Bookmark), [
+        {"user_id": user(i * 11 + k * 13), "problem_id": i + 1, "created_at": at(i)}
+        for i in range(PROBLEMS) for k in range(2)
+    ])
+    db.execute(insert(Follow), [
+        {"follower_id": i + 1, "following_id": user(i + k * 17 + 1)} for i in range(USERS) for k in range(10)
+    ])
+    db.execute(insert(FeedEntry), [
+        {"user_id": i + 1, "problem_id": problem(i * 10 + k), "author_id": user(i + 1), "created_at": at(i * 10 + k)}
+        for i in range(USERS) for k in range(10)
+    ])
+    db.execute(insert(Notification), [
+        {"user_id": user(i), "type": "like", "title": "Like", "message": "Someone liked your problem",
+         "is_read": i % 3 == 0, "created_at": at(i)}
+        for i in range(USERS * 10)
+    ])
+    # One message in ten shares a problem
+    db.execute(insert(ForumMessage), [
+        {"forum_id": i % FORUMS + 1, "author_id": user(i), "content": "message", "message_type": "text",
+         "problem_id": problem(i) if i % 10 == 0 else None, "created_at": at(i)}
+        for i in range(FORUM_MESSAGES)
+    ])
+    db.execute(insert(ForumReply), [
+        {"forum_id": i % FORUMS + 1, "parent_message_id": i % FORUM_MESSAGES + 1, "author_id": user(i),
+         "content": "reply", "created_at": at(i)}
+        for i in range(FORUM_MESSAGES // 2)
+    ])
+    db.execute(insert(ForumMessageChange), [
+        {"forum_id": i % FORUMS + 1, "message_id": i % FORUM_MESSAGES + 1, "change_type": "edited", "created_at": at(i)}
+        for i in range(FORUM_MESSAGES // 4)
+    ])
+    db.execute(insert(AdminAction), [
+        {"admin_id": 1, "action_type": "ban_user", "target_id": user(i), "target_type": "user", "created_at": at(i)}
+        for i in range(USERS)
+    ])
+
+
+def plan_nodes(plan):
+    """(node type, relation, index) for every node of a JSON plan tree"""
+    yield plan.get("Node Type"), plan.get("Relation Name"), plan.get("Index Name")
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture(scope="module")
+def pg_session():
+    engine = create_engine(POSTGRES_URL)
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Postgres at TEST_POSTGRES_URL is not reachable: {e}")
+
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    connection.execute(text(f"SET search_path TO {SCHEMA}"))
+    models.Base.metadata.create_all(bind=connection)
+    db = Session(bind=connection)
+    seed_rows(db)
+    db.flush()
+    connection.execute(text("ANALYZE"))
+    try:
+        yield db
+    finally:
+        db.close()
+        connection.rollback()
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.commit()
+        connection.close()
+        engine.dispose()
+
+
+@pytest.mark.parametrize("name,indexes,build", ENDPOINT_QUERIES, ids=[name for name, _, _ in ENDPOINT_QUERIES])
+def test_query_uses_its_index(pg_session, name, indexes, build):
+    query = build(pg_session)
+    sql = str(query.statement.compile(dialect=pg_session.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    plan = pg_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    nodes = list(plan_nodes(plan[0]["Plan"]))
+    used = {index for _, _, index in nodes if index}
+    assert used & indexes, f"{name}: expected {' or '.join(sorted(indexes))}, plan was {nodes}"
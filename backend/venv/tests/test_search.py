@@ -0,0 +1,32 @@
+"""Problem search is reachable through the router and served by search_service"""
+
+
+def test_problem_search_route_is_not_shadowed_by_subject_listing(client, auth_headers):
+    response = client.get("/auth/problems/search?q=alpha&limit=5", headers=auth_headers())
+
+    assert response.status_code == 200
+    body = response.json()
+    # The subject listing would return a bare list for a subject called "search"
+    assert isinstance(body, dict)
+    assert body["total"] == 20
+    assert len(body["problems"]) == 5
+    assert all("alpha" in problem["title"] for problem in body["problems"])
+
+
+def test_problem_search_prefix_match(client, auth_headers):
+    response = client.get("/auth/problems/search?q=alph", headers=auth_headers())
+
+    assert response.json()["total"] == 20
+
+
+def test_problem_search_short_query(client, auth_headers):
+    response = client.get("/auth/problems/search?q=a", headers=auth_headers())
+
+    assert response.json() == {"problems": [], "total": 0, "page": 1, "limit": 10, "total_pages": 0}
+
+
+def test_problem_search_query_count(count_queries):
+    response, queries = count_queries("/auth/problems/search?q=alpha&limit=10")
+
+    assert response.status_code == 200
+    assert queries == 5
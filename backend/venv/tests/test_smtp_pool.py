@@ -0,0 +1,100 @@
+"""SMTPConnectionPool against a local aiosmtpd server
+
+Sends the same batch through the pool and through a fresh connection per
+message, and checks the pool reuses a handful of sessions and is faster.
+"""
+import smtplib
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+
+import pytest
+
+from smtp_pool import SMTPConnectionPool
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+MESSAGE_COUNT = 200
+THREADS = 8
+POOL_SIZE = 4
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+def make_message(i: int) -> MIMEText:
+    msg = MIMEText(f"Message {i}", "plain")
+    msg["Subject"] = f"Benchmark {i}"
+    msg["From"] = "noreply@example.com"
+    msg["To"] = f"user{i}@example.com"
+    return msg
+
+
+def send_all(send) -> float:
+    """Messages per second for MESSAGE_COUNT sends spread over THREADS threads"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(send, [make_message(i) for i in range(MESSAGE_COUNT)]))
+    return MESSAGE_COUNT / (time.perf_counter() - started)
+
+
+def test_pool_reuses_sessions_and_beats_connection_per_message(smtp_server):
+    controller, handler = smtp_server
+
+    def send_unpooled(msg):
+        with smtplib.SMTP(controller.hostname, controller.port, timeout=10) as smtp:
+            smtp.send_message(msg)
+
+    unpooled_rate = send_all(send_unpooled)
+
+    pool = SMTPConnectionPool(controller.hostname, controller.port, None, None, use_tls=False,
+                              size=POOL_SIZE, timeout=10, max_messages=MESSAGE_COUNT)
+    try:
+        pooled_rate = send_all(pool.send_message)
+    finally:
+        pool.close()
+
+    print(f"\nunpooled {unpooled_rate:.0f} msg/s, pooled {pooled_rate:.0f} msg/s over {pool.connects} sessions")
+    assert handler.received == 2 * MESSAGE_COUNT
+    assert pool.connects <= POOL_SIZE
+    assert pooled_rate > unpooled_rate
+
+
+def test_pool_replaces_a_session_the_server_dropped(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(controller.hostname, controller.port, None, None, use_tls=False, size=1, timeout=10)
+    try:
+        pool.send_message(make_message(0))
+        # Drop the pooled session from under the pool, as a server timing it out would
+        smtp, _, _ = pool._idle.queue[0]
+        smtp.sock.shutdown(socket.SHUT_RDWR)
+        pool.send_message(make_message(1))
+    finally:
+        pool.close()
+
+    assert handler.received == 2
+    assert pool.connects == 2
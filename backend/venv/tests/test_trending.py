@@ -0,0 +1,55 @@
+import models
+from database import SessionLocal
+from problem_service import adjust_problem_counters
+from trending_service import engagement_score, trending_service
+from view_counter import view_counter
+
+
+def test_counter_change_marks_trending_dirty_only_once_committed(seed):
+    db = SessionLocal()
+    refresh_db = SessionLocal()
+    try:
+        problem_id = db.query(models.Problem.id).filter(models.Problem.forum_id.is_(None)).first()[0]
+        db.commit()
+        trending_service.refresh_dirty(refresh_db)
+
+        adjust_problem_counters(db, problem_id, bookmark_count=1)
+        # A refresh running between the update and the commit finds nothing to do
+        assert trending_service.refresh_dirty(refresh_db) == 0
+        db.commit()
+
+        assert trending_service.refresh_dirty(refresh_db) == 1
+        problem = refresh_db.query(models.Problem).filter_by(id=problem_id).one()
+        row = refresh_db.query(models.ProblemTrending).filter_by(problem_id=problem_id).one()
+        assert row.engagement_score == engagement_score(problem)
+
+        # A rolled back change is never queued
+        adjust_problem_counters(db, problem_id, bookmark_count=1)
+        db.rollback()
+        db.commit()
+        assert trending_service.refresh_dirty(refresh_db) == 0
+    finally:
+        adjust_problem_counters(db, problem_id, bookmark_count=-1)
+        db.commit()
+        trending_service.refresh_dirty(refresh_db)
+        refresh_db.close()
+        db.close()
+
+
+def test_trending_view_counts_include_pending_views(client, auth_headers):
+    headers = auth_headers(0)
+    problem = client.get("/auth/problems/trending?limit=1", headers=headers).json()["problems"][0]
+    try:
+        view_counter.record(problem["id"])
+        view_counter.record(problem["id"])
+
+        trending = client.get("/auth/problems/trending?limit=1", headers=headers).json()["problems"][0]
+        feed = client.get("/auth/problems/?limit=50", headers=headers).json()["problems"]
+        assert trending["view_count"] == problem["view_count"] + 2
+        assert trending["view_count"] == next(card for card in feed if card["id"] == problem["id"])["view_count"]
+    finally:
+        db = SessionLocal()
+        try:
+            view_counter.flush(db)
+        finally:
+            db.close()
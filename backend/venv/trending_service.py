@@ -0,0 +1,152 @@
+import math
+from datetime import datetime
+from threading import Lock
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Problem, ProblemTrending
+
+# Scores are log10(engagement) plus a bonus that grows with creation time, so a
+# problem posted TRENDING_DECAY_SECONDS later needs 10x less engagement to rank
+# the same. The ordering never changes as time passes, so a row only has to be
+# rewritten when that problem's engagement changes.
+TRENDING_EPOCH = datetime(2025, 1, 1)
+TRENDING_DECAY_SECONDS = 45000
+REFRESH_BATCH_SIZE = 500
+# Session.info key of the problems to mark dirty when that session commits
+DIRTY_ON_COMMIT = "trending_dirty_on_commit"
+
+
+def engagement_score(problem: Problem) -> float:
+    """(comments × 2) + (votes × 1) + (views × 0.3) + (bookmarks × 1.5)"""
+    return (
+        (problem.comment_count or 0) * 2 +
+        ((problem.like_count or 0) + (problem.dislike_count or 0)) * 1 +
+        (problem.view_count or 0) * 0.3 +
+        (problem.bookmark_count or 0) * 1.5
+    )
+
+
+def trending_score(engagement: float, created_at: Optional[datetime]) -> float:
+    """Time-decayed rank for an engagement score"""
+    order = math.log10(max(engagement, 1))
+    seconds = ((created_at or TRENDING_EPOCH) - TRENDING_EPOCH).total_seconds()
+    return round(order + seconds / TRENDING_DECAY_SECONDS, 7)
+
+
+class TrendingService:
+    """Keeps the problem_trending table in sync with problem engagement"""
+
+    def __init__(self):
+        self._dirty: Set[int] = set()
+        self._lock = Lock()
+
+    def mark_dirty(self, problem_id: int) -> None:
+        """Queue a problem for the next incremental refresh"""
+        with self._lock:
+            self._dirty.add(problem_id)
+
+    def mark_dirty_on_commit(self, db: Session, problem_id: int) -> None:
+        """Queue a problem once db's transaction commits
+
+        Marking it earlier would let a refresh read the old counters and clear
+        the flag, leaving the row stale until the next full rebuild.
+        """
+        db.info.setdefault(DIRTY_ON_COMMIT, set()).add(problem_id)
+
+    def refresh_dirty(self, db: Session) -> int:
+        """Refresh every problem queued since the last call. Returns rows refreshed"""
+        with self._lock:
+            problem_ids, self._dirty = list(self._dirty), set()
+        if not problem_ids:
+            return 0
+        try:
+            for start in range(0, len(problem_ids), REFRESH_BATCH_SIZE):
+                self.refresh_problems(db, problem_ids[start:start + REFRESH_BATCH_SIZE])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Requeue so the next run retries them
+            with self._lock:
+                self._dirty.update(problem_ids)
+            raise
+        return len(problem_ids)
+
+    def refresh_problems(self, db: Session, problem_ids: Iterable[int]) -> None:
+        """Upsert trending rows for the given problems. Does not commit"""
+        problem_ids = list(problem_ids)
+        problems = db.query(Problem).filter(Problem.id.in_(problem_ids)).all()
+        existing = {
+            row.problem_id: row for row in
+            db.query(ProblemTrending).filter(ProblemTrending.problem_id.in_(problem_ids)).all()
+        }
+        self._apply(db, problems, existing)
+
+        # Problems that were deleted no longer have a row to rank
+        missing = set(problem_ids) - {problem.id for problem in problems}
+        for problem_id in missing:
+            if problem_id in existing:
+                db.delete(existing[problem_id])
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute every row in batches and drop rows for removed or forum problems"""
+        refreshed = 0
+        last_id = 0
+        now = datetime.utcnow()
+        while True:
+            problems = db.query(Problem).filter(
+                Problem.id > last_id
+            ).order_by(Problem.id).limit(REFRESH_BATCH_SIZE).all()
+            if not problems:
+                break
+            existing = {
+                row.problem_id: row for row in
+                db.query(ProblemTrending).filter(
+                    ProblemTrending.problem_id.in_([problem.id for problem in problems])
+                ).all()
+            }
+            refreshed += self._apply(db, problems, existing, now)
+            db.commit()
+            last_id = problems[-1].id
+
+        # Rows whose problem no longer exists
+        db.query(ProblemTrending).filter(
+            ~ProblemTrending.problem_id.in_(db.query(Problem.id))
+        ).delete(synchronize_session=False)
+        db.commit()
+        return refreshed
+
+    def _apply(self, db: Session, problems: List[Problem], existing: dict, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        applied = 0
+        for problem in problems:
+            row = existing.get(problem.id)
+            # Forum problems are excluded from trending
+            if problem.forum_id is not None:
+                if row:
+                    db.delete(row)
+                continue
+            engagement = engagement_score(problem)
+            if not row:
+                row = ProblemTrending(problem_id=problem.id)
+                db.add(row)
+            row.engagement_score = engagement
+            row.score = trending_score(engagement, problem.created_at)
+            row.updated_at = now
+            applied += 1
+        return applied
+
+
+# Global trending service instance
+trending_service = TrendingService()
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed_dirty(session: Session):
+    for problem_id in session.info.pop(DIRTY_ON_COMMIT, ()):
+        trending_service.mark_dirty(problem_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_dirty(session: Session):
+    session.info.pop(DIRTY_ON_COMMIT, None)
@@ -0,0 +1,147 @@
+import os
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Integer, column, func, update, values
+from sqlalchemy.orm import Session
+from cache_service import cache_service
+from models import Problem
+
+# Buffered views are written to the database this often, and on shutdown
+FLUSH_INTERVAL_SECONDS = int(os.getenv("VIEW_FLUSH_SECONDS", "10"))
+# Repeat views of a problem by the same user within this window count once (0 disables)
+DEDUP_WINDOW_SECONDS = int(os.getenv("VIEW_DEDUP_SECONDS", "1800"))
+SHARD_COUNT = 16
+FLUSH_BATCH_SIZE = 1000
+# How long a persisted count is trusted as the base for approximate counts
+BASE_COUNT_TTL_SECONDS = 300
+
+
+class _Shard:
+    __slots__ = ("lock", "pending", "seen")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.pending: Dict[int, int] = {}
+        self.seen: Dict[Tuple[int, int], float] = {}
+
+
+class ViewCounter:
+    """Write-behind problem view counts
+
+    Views are added to an in-memory counter sharded by problem id, so
+    concurrent requests rarely contend on a lock, and written to
+    problems.view_count in one batched UPDATE per flush instead of one
+    transaction per view. Increments are added to the stored value, so
+    several processes can each run a counter. Counts read back from the
+    counter are approximate: the last persisted value plus this process's
+    pending views.
+    """
+
+    def __init__(self, shards: int = SHARD_COUNT, dedup_seconds: int = DEDUP_WINDOW_SECONDS):
+        self._shards = [_Shard() for _ in range(shards)]
+        self.dedup_seconds = dedup_seconds
+
+    def _shard(self, problem_id: int) -> _Shard:
+        return self._shards[problem_id % len(self._shards)]
+
+    def record(self, problem_id: int, user_id: Optional[int] = None) -> bool:
+        """Count a view; False when it repeats this user's view within the dedup window"""
+        shard = self._shard(problem_id)
+        now = time.monotonic()
+        with shard.lock:
+            if user_id is not None and self.dedup_seconds > 0:
+                key = (user_id, problem_id)
+                if shard.seen.get(key, 0) > now:
+                    return False
+                shard.seen[key] = now + self.dedup_seconds
+            shard.pending[problem_id] = shard.pending.get(problem_id, 0) + 1
+        return True
+
+    def pending(self, problem_id: int) -> int:
+        shard = self._shard(problem_id)
+        with shard.lock:
+            return shard.pending.get(problem_id, 0)
+
+    def approximate_count(self, db: Session, problem_id: int) -> Optional[int]:
+        """Persisted count plus pending views; None if the problem does not exist
+
+        The persisted count is cached (and refreshed by every flush), so the
+        database is only read the first time a problem is seen.
+        """
+        base = cache_service.get(f"problem_views:{problem_id}")
+        if base is None:
+            row = db.query(Problem.view_count).filter(Problem.id == problem_id).first()
+            if row is None:
+                return None
+            base = row[0] or 0
+            cache_service.set(f"problem_views:{problem_id}", base, BASE_COUNT_TTL_SECONDS)
+        return base + self.pending(problem_id)
+
+    def _drain(self) -> Dict[int, int]:
+        drained: Dict[int, int] = {}
+        now = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                drained.update(shard.pending)
+                shard.pending = {}
+                shard.seen = {key: expires for key, expires in shard.seen.items() if expires > now}
+        return drained
+
+    def _requeue(self, counts: Dict[int, int]):
+        for problem_id, views in counts.items():
+            shard = self._shard(problem_id)
+            with shard.lock:
+                shard.pending[problem_id] = shard.pending.get(problem_id, 0) + views
+
+    def flush(self, db: Session) -> int:
+        """Write pending views to the database. Returns the number of problems updated"""
+        counts = self._drain()
+        if not counts:
+            return 0
+        items = sorted(counts.items())  # Same lock order in every process
+        try:
+            updated = []
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                updated.extend(self._apply(db, items[start:start + FLUSH_BATCH_SIZE]))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the views for the next flush
+            self._requeue(counts)
+            raise
+
+        from trending_service import trending_service
+        for problem_id, view_count in updated:
+            cache_service.set(f"problem_views:{problem_id}", view_count or 0, BASE_COUNT_TTL_SECONDS)
+            trending_service.mark_dirty(problem_id)
+        return len(updated)
+
+    def _apply(self, db: Session, items: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Add views to problems.view_count; returns (id, new count) of the rows that exist"""
+        if db.get_bind().dialect.name == "postgresql":
+            pending_views = values(
+                column("id", Integer), column("views", Integer), name="pending_views"
+            ).data(items)
+            rows = db.execute(
+                update(Problem)
+                .where(Problem.id == pending_views.c.id)
+                .values(view_count=func.coalesce(Problem.view_count, 0) + pending_views.c.views)
+                .returning(Problem.id, Problem.view_count)
+                .execution_options(synchronize_session=False)
+            ).all()
+            return [(problem_id, view_count) for problem_id, view_count in rows]
+
+        # SQLite has no column aliases for a VALUES list; one statement per problem instead
+        for problem_id, views in items:
+            db.query(Problem).filter(Problem.id == problem_id).update(
+                {Problem.view_count: func.coalesce(Problem.view_count, 0) + views},
+                synchronize_session=False
+            )
+        return db.query(Problem.id, Problem.view_count).filter(
+            Problem.id.in_([problem_id for problem_id, _ in items])
+        ).all()
+
+
+# Global view counter instance
+view_counter = ViewCounter()
@@ -20,9 +20,16 @@ const AdminEmail = () => {
     fetchCampaigns();
   }, []);
 
-  const fetchCampaigns = async () => {
+  // Campaigns send in the background; refresh their progress until they finish
+  useEffect(() => {
+    if (!campaigns.some(campaign => campaign.status === 'sending')) return;
+    const interval = setInterval(() => fetchCampaigns(true), 5000);
+    return () => clearInterval(interval);
+  }, [campaigns]);
+
+  const fetchCampaigns = async (silent = false) => {
     try {
-      setLoading(true);
+      if (!silent) setLoading(true);
       const token = localStorage.getItem('token');
       const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/admin/email/campaigns`, {
         headers: { Authorization: `Bearer ${token}` }
@@ -74,6 +81,7 @@ const AdminEmail = () => {
             color: '#0c5460',
             border: '1px solid #bee5eb'
           };
+        case 'sending':
         case 'scheduled':
           return {
             background: '#d4edda',
@@ -132,7 +140,7 @@ const AdminEmail = () => {
         headers: { Authorization: `Bearer ${token}` }
       });
       
-      alert(`Campaign sent successfully! ${response.data.message}`);
+      alert(response.data.message);
       fetchCampaigns(); // Refresh the campaigns list
     } catch (err) {
       console.error('Send campaign error:', err);
@@ -188,7 +196,7 @@ const AdminEmail = () => {
       <div className="admin-card">
         <h2>Error</h2>
         <p>{error}</p>
-        <button className="admin-btn" onClick={fetchCampaigns}>
+        <button className="admin-btn" onClick={() => fetchCampaigns()}>
           Try Again
         </button>
       </div>
@@ -326,7 +334,9 @@ const AdminEmail = () => {
                       borderRadius: '12px',
                       fontSize: '0.8rem'
                     }}>
-                      {campaign.recipient_count} users
+                      {campaign.status === 'sending'
+                        ? `${campaign.sent_count} / ${campaign.recipient_count} sent${campaign.failed_count ? `, ${campaign.failed_count} failed` : ''}`
+                        : `${campaign.recipient_count} users`}
                     </span>
                   </td>
                   <td>{campaign.created_by}</td>
@@ -522,6 +532,7 @@ const AdminEmail = () => {
                 fontWeight: '500'
               }}>
                 {selectedCampaign.recipient_count} users
+                {selectedCampaign.status !== 'draft' && ` (${selectedCampaign.sent_count || 0} sent, ${selectedCampaign.failed_count || 0} failed)`}
               </span>
             </div>
             
@@ -51,6 +51,7 @@ function Feed() {
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const [totalProblems, setTotalProblems] = useState(0);
+  const [followingCursor, setFollowingCursor] = useState(null);
   
   // Feature settings
   const { checkFeatureEnabled, showFeatureDisabledAlert } = useFeatureSettings();
@@ -149,19 +150,23 @@ function Feed() {
     }
   };
 
-  const fetchFollowingProblems = async () => {
-    setLoading(true);
+  const fetchFollowingProblems = async (cursor = null) => {
+    // Loading the next page keeps the current list on screen
+    if (!cursor) setLoading(true);
     try {
       const token = localStorage.getItem("token");
       const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/feed/following`, {
+        params: cursor ? { cursor } : {},
         headers: {
           Authorization: `Bearer ${token}`
         }
       });
       
-      // The backend returns an object with 'problems' array
-      const problemsData = Array.isArray(response.data.problems) ? response.data.problems : [];
+      // The backend returns an object with 'problems' array and the cursor of the next page
+      const pageData = Array.isArray(response.data.problems) ? response.data.problems : [];
+      const problemsData = cursor ? [...problems, ...pageData] : pageData;
       setProblems(problemsData);
+      setFollowingCursor(response.data.next_cursor || null);
       
       // Only fetch vote data and follow status if we have problems
       if (problemsData.length > 0) {
@@ -173,7 +178,7 @@ function Feed() {
     } catch (error) {
       console.error("Error fetching following problems:", error);
       // Set empty array on error to prevent map error
-      setProblems([]);
+      if (!cursor) setProblems([]);
     } finally {
       setLoading(false);
     }
@@ -975,6 +980,24 @@ function Feed() {
         </div>
       )}
 
+      {/* Following feed: load the next page from the cursor */}
+      {activeTab === "following" && followingCursor && (
+        <div style={{ 
+          display: "flex", 
+          justifyContent: "center", 
+          marginTop: spacing.xl,
+          padding: spacing.lg
+        }}>
+          <Button
+            onClick={() => fetchFollowingProblems(followingCursor)}
+            variant="primary"
+            size="md"
+          >
+            Load more
+          </Button>
+        </div>
+      )}
+
       {/* Pagination */}
       {(activeTab === "all" || activeTab === "trending") && totalPages > 1 && (
         <div style={{ 
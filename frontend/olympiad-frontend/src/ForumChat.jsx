@@ -7,6 +7,7 @@ import { InlineMath, BlockMath } from 'react-katex';
 import 'katex/dist/katex.min.css';
 import ForumProblemModal from './ForumProblemModal';
 import ForumProblemCard from './ForumProblemCard';
+import { openForumSocket, applyForumEvent, applyMessageChanges, mergeMessages, forumCursor, fetchForumUpdates } from './forumSocket';
 
 // Helper function to render math content
 const renderMathContent = (text) => {
@@ -43,6 +44,7 @@ const ForumChat = () => {
     const typingTimeoutRef = useRef(null);
     const pollingIntervalRef = useRef(null);
     const heartbeatIntervalRef = useRef(null);
+    const messageCursorRef = useRef(null);
 
     useEffect(() => {
         const loadInitialData = async () => {
@@ -65,9 +67,16 @@ const ForumChat = () => {
         // Mark user as online when entering chat
         markUserOnline();
         
-        // Set up polling for new messages (simple approach, can be upgraded to WebSocket later)
-        // Increased to 10 seconds to reduce server load
-        pollingIntervalRef.current = setInterval(fetchMessages, 2000);
+        // Apply what the server pushes; catch up after a reconnect and poll only if the socket is unavailable
+        const closeSocket = openForumSocket(forumId, {
+            onEvent: handleForumEvent,
+            onOpen: catchUpMessages,
+            onFallback: () => {
+                if (!pollingIntervalRef.current) {
+                    pollingIntervalRef.current = setInterval(catchUpMessages, 2000);
+                }
+            }
+        });
         
         // Set up heartbeat to keep user online
         heartbeatIntervalRef.current = setInterval(markUserOnline, 30000); // Every 30 seconds
@@ -79,8 +88,10 @@ const ForumChat = () => {
         const onlineCountInterval = setInterval(fetchOnlineCount, 10000); // Every 10 seconds
         
         return () => {
+            closeSocket();
             if (pollingIntervalRef.current) {
                 clearInterval(pollingIntervalRef.current);
+                pollingIntervalRef.current = null;
             }
             if (heartbeatIntervalRef.current) {
                 clearInterval(heartbeatIntervalRef.current);
@@ -133,6 +144,22 @@ const ForumChat = () => {
         }
     };
 
+    const stopOnMessageError = (error) => {
+        if (error.response?.status === 403) {
+            setError("You must be a member of this forum to view messages");
+        } else if (error.response?.status === 404) {
+            setError("Forum not found");
+        } else {
+            return;
+        }
+        // Stop polling on error
+        if (pollingIntervalRef.current) {
+            clearInterval(pollingIntervalRef.current);
+            pollingIntervalRef.current = null;
+        }
+    };
+
+    // Full load of the latest messages; after this only deltas are fetched
     const fetchMessages = async () => {
         try {
             const token = localStorage.getItem("token");
@@ -142,56 +169,74 @@ const ForumChat = () => {
                 headers: { Authorization: `Bearer ${token}` }
             });
             const messages = response.data.reverse(); // Reverse to show oldest first
-            setMessages(messages);
-
-            // Fetch problem data for problem messages
-            const problemIds = messages
-                .filter(msg => msg.message_type === 'problem' && msg.problem_id)
-                .map(msg => msg.problem_id);
-
-            if (problemIds.length > 0) {
-                const problemPromises = problemIds.map(id => 
-                    axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/problems/${id}`, {
-                        headers: { Authorization: `Bearer ${token}` }
-                    }).then(res => ({ id, data: res.data }))
-                    .catch(err => {
-                        console.error(`Error fetching problem ${id}:`, err);
-                        return { id, data: null };
-                    })
-                );
-
-                const problemResults = await Promise.all(problemPromises);
-                const problemMap = {};
-                problemResults.forEach(({ id, data }) => {
-                    if (data) {
-                        problemMap[id] = data;
-                    }
-                });
-                setProblemData(problemMap);
-            }
+            const cursor = forumCursor(messages, response);
+            messageCursorRef.current = cursor;
+            // Keep anything the socket delivered while this request was in flight
+            setMessages(prev => mergeMessages(messages, prev.filter(msg => msg.id > cursor.lastMessageId)));
+            fetchProblemData(messages);
         } catch (error) {
             console.error("Error fetching messages:", error);
             console.error("Error response:", error.response);
             console.error("Error status:", error.response?.status);
-            
-            if (error.response?.status === 403) {
-                setError("You must be a member of this forum to view messages");
-                // Stop polling on error
-                if (pollingIntervalRef.current) {
-                    clearInterval(pollingIntervalRef.current);
-                    pollingIntervalRef.current = null;
-                }
-            } else if (error.response?.status === 404) {
-                setError("Forum not found");
-                // Stop polling on error
-                if (pollingIntervalRef.current) {
-                    clearInterval(pollingIntervalRef.current);
-                    pollingIntervalRef.current = null;
-                }
+            stopOnMessageError(error);
+        }
+    };
+
+    // Fetch only what changed since the last load (after a reconnect, or while polling)
+    const catchUpMessages = async () => {
+        const cursor = messageCursorRef.current;
+        if (!cursor) return; // The initial load hasn't finished yet
+
+        try {
+            const updates = await fetchForumUpdates(forumId, cursor);
+            if (!updates) return;
+            setMessages(prev => applyMessageChanges(mergeMessages(prev, updates.messages), updates.changes));
+            fetchProblemData(updates.messages);
+        } catch (error) {
+            console.error("Error catching up on messages:", error);
+            stopOnMessageError(error);
+        }
+    };
+
+    const handleForumEvent = (event) => {
+        setMessages(prev => applyForumEvent(prev, event));
+        if (event.type === 'message.created') {
+            if (messageCursorRef.current) {
+                messageCursorRef.current.lastMessageId = Math.max(messageCursorRef.current.lastMessageId, event.data.id);
             }
+            fetchProblemData([event.data]);
         }
     };
 
+    // Fetch problem data for problem messages we don't have yet
+    const fetchProblemData = async (messages) => {
+        const token = localStorage.getItem("token");
+        const problemIds = messages
+            .filter(msg => msg.message_type === 'problem' && msg.problem_id)
+            .map(msg => msg.problem_id);
+
+        if (!token || problemIds.length === 0) return;
+
+        const problemPromises = problemIds.map(id => 
+            axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/problems/${id}`, {
+                headers: { Authorization: `Bearer ${token}` }
+            }).then(res => ({ id, data: res.data }))
+            .catch(err => {
+                console.error(`Error fetching problem ${id}:`, err);
+                return { id, data: null };
+            })
+        );
+
+        const problemResults = await Promise.all(problemPromises);
+        const problemMap = {};
+        problemResults.forEach(({ id, data }) => {
+            if (data) {
+                problemMap[id] = data;
+            }
+        });
+        setProblemData(prev => ({ ...prev, ...problemMap }));
+    };
+
     // Online status functions
     const markUserOnline = async () => {
         try {
@@ -248,7 +293,7 @@ const ForumChat = () => {
                 headers: { Authorization: `Bearer ${token}` }
             });
             setNewMessage('');
-            fetchMessages(); // Refresh messages
+            handleForumEvent({ type: 'message.created', data: response.data });
         } catch (error) {
             console.error("Error sending message:", error);
             console.error("Error response:", error.response);
@@ -299,8 +344,8 @@ const ForumChat = () => {
     };
 
     const handleProblemCreated = (problem) => {
-        // Refresh messages to show the new problem
-        fetchMessages();
+        // Pick up the new problem message if the socket hasn't delivered it
+        catchUpMessages();
     };
 
     const scrollToBottom = () => {
@@ -14,6 +14,7 @@ import ForumProblemModal from './ForumProblemModal';
 import ForumProblemCard from './ForumProblemCard';
 import ForumInviteModal from './ForumInviteModal';
 import ReportModal from './ReportModal';
+import { openForumSocket, applyForumEvent, applyMessageChanges, mergeMessages, forumCursor, fetchForumUpdates } from './forumSocket';
 
 // CSS for typing animation and new message indicator
 const typingAnimation = `
@@ -114,6 +115,7 @@ const ForumDetail = () => {
     const [isTyping, setIsTyping] = useState(false);
     const [typingTimeout, setTypingTimeout] = useState(null);
     const messagesEndRef = useRef(null);
+    const messageCursorRef = useRef(null);
     const [showInviteModal, setShowInviteModal] = useState(false);
     const [userHasScrolledUp, setUserHasScrolledUp] = useState(false);
     const [showNewMessageIndicator, setShowNewMessageIndicator] = useState(false);
@@ -165,8 +167,7 @@ const ForumDetail = () => {
             const response = await axios.post(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/forums/${forumId}/messages/${messageId}/pin`, {}, {
                 headers: { Authorization: `Bearer ${token}` }
             });
-            // Refresh messages to get updated pinned status
-            fetchMessages();
+            handleForumEvent({ type: 'message.pinned', data: { id: messageId } });
         } catch (error) {
             console.error("Error pinning message:", error);
             console.error("Error details:", error.response?.data);
@@ -182,7 +183,7 @@ const ForumDetail = () => {
             const response = await axios.delete(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/forums/${forumId}/messages/unpin`, {
                 headers: { Authorization: `Bearer ${token}` }
             });
-            setPinnedMessage(null);
+            handleForumEvent({ type: 'message.unpinned', data: null });
         } catch (error) {
             console.error("Error unpinning message:", error);
             console.error("Error details:", error.response?.data);
@@ -200,8 +201,7 @@ const ForumDetail = () => {
                 headers: { Authorization: `Bearer ${token}` }
             });
             
-            // Refresh messages
-            fetchMessages();
+            handleForumEvent({ type: 'message.deleted', data: { id: messageId } });
         } catch (error) {
             console.error("Error deleting message:", error);
         }
@@ -320,28 +320,13 @@ const ForumDetail = () => {
         }
     };
 
-    // Fetch reply counts for all messages
-    const fetchReplyCounts = async () => {
-        try {
-            const token = localStorage.getItem("token");
-            if (!token) return;
-
-            const counts = {};
-            for (const message of messages) {
-                try {
-                    const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/forums/${forumId}/messages/${message.id}/reply-count`, {
-                        headers: { Authorization: `Bearer ${token}` }
-                    });
-                    counts[message.id] = response.data.reply_count;
-                } catch (error) {
-                    console.error(`Error fetching reply count for message ${message.id}:`, error);
-                    counts[message.id] = 0;
-                }
-            }
-            setReplyCounts(counts);
-        } catch (error) {
-            console.error("Error fetching reply counts:", error);
+    // Reply counts come with each message from the messages endpoint
+    const fetchReplyCounts = () => {
+        const counts = {};
+        for (const message of messages) {
+            counts[message.id] = message.reply_count || 0;
         }
+        setReplyCounts(counts);
     };
 
     // Navigate to thread
@@ -450,11 +435,12 @@ const ForumDetail = () => {
         return () => document.removeEventListener('mousedown', handleClickOutside);
     }, [showMessageDropdown, showMemberDropdown, showActionsDropdown]);
 
-    // Fetch reply counts when messages change
+    // Reply counts and the pinned message follow the message list
     useEffect(() => {
         if (messages.length > 0) {
             fetchReplyCounts();
         }
+        setPinnedMessage(messages.find(msg => msg.is_pinned) || null);
     }, [messages]);
 
     // Restore scroll position when component mounts (returning from thread)
@@ -653,8 +639,19 @@ const ForumDetail = () => {
     useEffect(() => {
         if (showChat && onlineStatusInitialized) {
             
-            // Set up polling for new messages
-            const messageInterval = setInterval(fetchMessages, 2000);
+            fetchMessages();
+            
+            // Apply what the server pushes; catch up after a reconnect and poll only if the socket is unavailable
+            let messageInterval = null;
+            const closeSocket = openForumSocket(forumId, {
+                onEvent: handleForumEvent,
+                onOpen: catchUpMessages,
+                onFallback: () => {
+                    if (!messageInterval) {
+                        messageInterval = setInterval(catchUpMessages, 2000);
+                    }
+                }
+            });
             
             // Set up heartbeat to keep user online (only if not already online)
             const heartbeatInterval = setInterval(() => {
@@ -677,6 +674,7 @@ const ForumDetail = () => {
             window.addEventListener('beforeunload', handleBeforeUnload);
             
             return () => {
+                closeSocket();
                 clearInterval(messageInterval);
                 clearInterval(heartbeatInterval);
                 clearInterval(onlineCountInterval);
@@ -759,6 +757,7 @@ const ForumDetail = () => {
         }
     };
 
+    // Full load of the latest messages; after this only deltas are fetched
     const fetchMessages = async () => {
         try {
             const token = localStorage.getItem("token");
@@ -768,45 +767,69 @@ const ForumDetail = () => {
                 headers: { Authorization: `Bearer ${token}` }
             });
             const messages = response.data.reverse();
-            setMessages(messages);
-            
-            // Check for pinned message
-            const pinned = messages.find(msg => msg.is_pinned);
-            if (pinned) {
-                setPinnedMessage(pinned);
-            } else {
-                setPinnedMessage(null);
-            }
-
-            // Fetch problem data for problem messages
-            const problemIds = messages
-                .filter(msg => msg.message_type === 'problem' && msg.problem_id)
-                .map(msg => msg.problem_id);
-
-            if (problemIds.length > 0) {
-                const problemPromises = problemIds.map(id => 
-                    axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/problems/id/${id}`, {
-                        headers: { Authorization: `Bearer ${token}` }
-                    }).then(res => ({ id, data: res.data }))
-                    .catch(err => {
-                        console.error(`Error fetching problem ${id}:`, err);
-                        return { id, data: null };
-                    })
-                );
-                const problemResults = await Promise.all(problemPromises);
-                const problemMap = {};
-                problemResults.forEach(({ id, data }) => {
-                    if (data && data.id) {
-                        problemMap[id] = data;
-                    }
-                });
-                setProblemData(problemMap);
-            }
+            const cursor = forumCursor(messages, response);
+            messageCursorRef.current = cursor;
+            // Keep anything the socket delivered while this request was in flight
+            setMessages(prev => mergeMessages(messages, prev.filter(msg => msg.id > cursor.lastMessageId)));
+            fetchProblemData(messages);
         } catch (error) {
             console.error("Error fetching messages:", error);
         }
     };
 
+    // Fetch only what changed since the last load (after a reconnect, or while polling)
+    const catchUpMessages = async () => {
+        const cursor = messageCursorRef.current;
+        if (!cursor) return; // The initial load hasn't finished yet
+
+        try {
+            const updates = await fetchForumUpdates(forumId, cursor);
+            if (!updates) return;
+            setMessages(prev => applyMessageChanges(mergeMessages(prev, updates.messages), updates.changes));
+            fetchProblemData(updates.messages);
+        } catch (error) {
+            console.error("Error catching up on messages:", error);
+        }
+    };
+
+    const handleForumEvent = (event) => {
+        setMessages(prev => applyForumEvent(prev, event));
+        if (event.type === 'message.created') {
+            if (messageCursorRef.current) {
+                messageCursorRef.current.lastMessageId = Math.max(messageCursorRef.current.lastMessageId, event.data.id);
+            }
+            fetchProblemData([event.data]);
+        }
+    };
+
+    // Fetch problem data for problem messages
+    const fetchProblemData = async (messages) => {
+        const token = localStorage.getItem("token");
+        const problemIds = messages
+            .filter(msg => msg.message_type === 'problem' && msg.problem_id)
+            .map(msg => msg.problem_id);
+
+        if (!token || problemIds.length === 0) return;
+
+        const problemPromises = problemIds.map(id => 
+            axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/problems/id/${id}`, {
+                headers: { Authorization: `Bearer ${token}` }
+            }).then(res => ({ id, data: res.data }))
+            .catch(err => {
+                console.error(`Error fetching problem ${id}:`, err);
+                return { id, data: null };
+            })
+        );
+        const problemResults = await Promise.all(problemPromises);
+        const problemMap = {};
+        problemResults.forEach(({ id, data }) => {
+            if (data && data.id) {
+                problemMap[id] = data;
+            }
+        });
+        setProblemData(prev => ({ ...prev, ...problemMap }));
+    };
+
     // Production-ready online status functions
     const markUserOnline = async () => {
         // Prevent duplicate calls
@@ -946,7 +969,7 @@ const ForumDetail = () => {
             const token = localStorage.getItem("token");
             if (!token) return;
 
-            await axios.post(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/forums/${forumId}/messages`, {
+            const response = await axios.post(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/forums/${forumId}/messages`, {
                 content: messageContent,
                 message_type: messageType
             }, {
@@ -956,7 +979,7 @@ const ForumDetail = () => {
             if (messageType === "text") {
                 setNewMessage('');
             }
-            fetchMessages();
+            handleForumEvent({ type: 'message.created', data: response.data });
         } catch (error) {
             console.error("Error sending message:", error);
         }
@@ -1058,7 +1081,7 @@ const ForumDetail = () => {
     };
 
     const handleProblemCreated = (problem) => {
-        fetchMessages(); // Refresh messages to show the new problem
+        catchUpMessages(); // Pick up the new problem message if the socket hasn't delivered it
     };
 
     // Filter handlers
@@ -1135,7 +1158,7 @@ const ForumDetail = () => {
                 headers: { Authorization: `Bearer ${token}` }
             });
             
-            alert("Forum deleted successfully");
+            alert("Forum is being deleted. Its problems will appear in their authors' drafts shortly.");
             navigate('/forums');
         } catch (error) {
             console.error("Error deleting forum:", error);
@@ -48,6 +48,8 @@ const PublicUserProfile = () => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [following, setFollowing] = useState(false);
+    const [problemsCursor, setProblemsCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [followLoading, setFollowLoading] = useState(false);
     const [voteData, setVoteData] = useState({});
     const [showReportModal, setShowReportModal] = useState(false);
@@ -75,15 +77,19 @@ const PublicUserProfile = () => {
         try {
             setLoading(true);
             const token = localStorage.getItem('token');
-            const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/user/${username}`, {
-                headers: { Authorization: `Bearer ${token}` }
-            });
-            setUserProfile(response.data);
+            const [response, problemsPage] = await Promise.all([
+                axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/user/${username}`, {
+                    headers: { Authorization: `Bearer ${token}` }
+                }),
+                fetchProblemsPage()
+            ]);
+            setUserProfile({ ...response.data, problems: problemsPage.problems });
+            setProblemsCursor(problemsPage.next_cursor || null);
             setFollowing(response.data.is_following);
             
             // Fetch vote data for user's problems
-            if (response.data.problems && response.data.problems.length > 0) {
-                await fetchVoteData(response.data.problems);
+            if (problemsPage.problems.length > 0) {
+                await fetchVoteData(problemsPage.problems);
             }
         } catch (err) {
             setError('User not found');
@@ -93,6 +99,31 @@ const PublicUserProfile = () => {
         }
     };
 
+    const fetchProblemsPage = async (cursor = null) => {
+        const token = localStorage.getItem('token');
+        const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/user/${username}/problems`, {
+            params: cursor ? { cursor } : {},
+            headers: { Authorization: `Bearer ${token}` }
+        });
+        return { problems: response.data.problems || [], next_cursor: response.data.next_cursor };
+    };
+
+    const loadMoreProblems = async () => {
+        setLoadingMore(true);
+        try {
+            const page = await fetchProblemsPage(problemsCursor);
+            setUserProfile(prev => ({ ...prev, problems: [...prev.problems, ...page.problems] }));
+            setProblemsCursor(page.next_cursor || null);
+            if (page.problems.length > 0) {
+                await fetchVoteData(page.problems);
+            }
+        } catch (err) {
+            console.error('Error loading more problems:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleFollow = async () => {
         if (!userProfile) return;
         
@@ -160,7 +191,7 @@ const PublicUserProfile = () => {
             voteResults.forEach(({ problemId, voteData }) => {
                 voteDataMap[problemId] = voteData;
             });
-            setVoteData(voteDataMap);
+            setVoteData(prev => ({ ...prev, ...voteDataMap }));
         } catch (error) {
             console.error("Error fetching vote data:", error);
         }
@@ -315,7 +346,7 @@ const PublicUserProfile = () => {
                         >
                             <strong>{userProfile.following_count}</strong> following
                         </span>
-                        <span><strong>{canViewProblems(userProfile.user, currentUser, following, userProfile.is_followed_by_profile_owner) ? userProfile.problems.length : '?'}</strong> problems</span>
+                        <span><strong>{canViewProblems(userProfile.user, currentUser, following, userProfile.is_followed_by_profile_owner) ? userProfile.problem_count : '?'}</strong> problems</span>
                     </div>
                 </div>
                 <div style={{ display: 'flex', gap: '12px', alignItems: 'center' }}>
@@ -511,6 +542,25 @@ const PublicUserProfile = () => {
                                 </div>
                             </div>
                         ))}
+                        {problemsCursor && (
+                            <div style={{ textAlign: 'center' }}>
+                                <button
+                                    onClick={loadMoreProblems}
+                                    disabled={loadingMore}
+                                    style={{
+                                        padding: '10px 24px',
+                                        backgroundColor: '#007bff',
+                                        color: 'white',
+                                        border: 'none',
+                                        borderRadius: '5px',
+                                        cursor: loadingMore ? 'default' : 'pointer',
+                                        opacity: loadingMore ? 0.7 : 1
+                                    }}
+                                >
+                                    {loadingMore ? 'Loading...' : 'Load more'}
+                                </button>
+                            </div>
+                        )}
                     </div>
                 )}
             </div>
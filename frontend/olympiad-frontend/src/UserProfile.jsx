@@ -42,6 +42,9 @@ function UserProfile() {
     const [voteData, setVoteData] = useState({});
     const [showImageModal, setShowImageModal] = useState(false);
     const [drafts, setDrafts] = useState([]);
+    // Cursor of the next page of each profile list (null when everything is loaded)
+    const [listCursors, setListCursors] = useState({ problems: null, comments: null, bookmarks: null });
+    const [loadingMore, setLoadingMore] = useState(null);
     const fileInputRef = useRef(null);
     const [editFormData, setEditFormData] = useState({
         bio: ""
@@ -65,16 +68,24 @@ function UserProfile() {
                 return;
             }
             
+            // Summary (user and counts) first, then the first page of each list
             const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/user/profile`, {
                 headers: {
                     Authorization: `Bearer ${token}`
                 }
             });
-            setProfileData(response.data);
+            const lists = await Promise.all(["problems", "comments", "bookmarks"].map(kind => fetchProfilePage(kind)));
+            setProfileData({
+                ...response.data,
+                problems: lists[0][0],
+                comments: lists[1][0],
+                bookmarks: lists[2][0]
+            });
+            setListCursors({ problems: lists[0][1], comments: lists[1][1], bookmarks: lists[2][1] });
             
             // Fetch vote data for user's problems
-            if (response.data.problems && response.data.problems.length > 0) {
-                await fetchVoteData(response.data.problems);
+            if (lists[0][0].length > 0) {
+                await fetchVoteData(lists[0][0]);
             }
         } catch (error) {
             console.error("Error fetching user profile:", error);
@@ -85,6 +96,33 @@ function UserProfile() {
         }
     };
 
+    const fetchProfilePage = async (kind, cursor = null) => {
+        const token = localStorage.getItem("token");
+        const response = await axios.get(`${process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000'}/auth/user/profile/${kind}`, {
+            params: cursor ? { cursor } : {},
+            headers: {
+                Authorization: `Bearer ${token}`
+            }
+        });
+        return [response.data[kind] || [], response.data.next_cursor || null];
+    };
+
+    const loadMore = async (kind) => {
+        setLoadingMore(kind);
+        try {
+            const [items, nextCursor] = await fetchProfilePage(kind, listCursors[kind]);
+            setProfileData(prev => ({ ...prev, [kind]: [...prev[kind], ...items] }));
+            setListCursors(prev => ({ ...prev, [kind]: nextCursor }));
+            if (kind === "problems" && items.length > 0) {
+                await fetchVoteData(items);
+            }
+        } catch (error) {
+            console.error(`Error loading more ${kind}:`, error);
+        } finally {
+            setLoadingMore(null);
+        }
+    };
+
     const fetchVoteData = async (problemsList) => {
         try {
             const token = localStorage.getItem("token");
@@ -111,7 +149,7 @@ function UserProfile() {
             voteResults.forEach(({ problemId, voteData }) => {
                 voteDataMap[problemId] = voteData;
             });
-            setVoteData(voteDataMap);
+            setVoteData(prev => ({ ...prev, ...voteDataMap }));
         } catch (error) {
             console.error("Error fetching vote data:", error);
         }
@@ -373,7 +411,29 @@ function UserProfile() {
         );
     }
 
-    const { user, problems, comments, bookmarks } = profileData;
+    const { user, counts, problems, comments, bookmarks } = profileData;
+    
+    const renderLoadMore = (kind) => listCursors[kind] && (
+        <div style={{ textAlign: "center", marginTop: "20px" }}>
+            <button
+                onClick={() => loadMore(kind)}
+                disabled={loadingMore === kind}
+                style={{
+                    padding: "10px 24px",
+                    backgroundColor: colors.primary,
+                    color: "white",
+                    border: "none",
+                    borderRadius: "8px",
+                    cursor: loadingMore === kind ? "default" : "pointer",
+                    fontSize: "14px",
+                    fontWeight: "600",
+                    opacity: loadingMore === kind ? 0.7 : 1
+                }}
+            >
+                {loadingMore === kind ? "Loading..." : "Load more"}
+            </button>
+        </div>
+    );
     
     // Sort comments with solutions first, then by creation date
     const sortedComments = comments ? comments.sort((a, b) => {
@@ -720,15 +780,15 @@ function UserProfile() {
                 justifyContent: "center"
             }}>
                 <div style={{ textAlign: "center", padding: "15px", backgroundColor: "#e3f2fd", borderRadius: "8px", minWidth: "100px" }}>
-                    <div style={{ fontSize: "24px", fontWeight: "bold", color: "#1976d2" }}>{problems.length}</div>
+                    <div style={{ fontSize: "24px", fontWeight: "bold", color: "#1976d2" }}>{counts.problems}</div>
                     <div style={{ fontSize: "14px", color: "#666" }}>Problems</div>
                 </div>
                 <div style={{ textAlign: "center", padding: "15px", backgroundColor: "#f3e5f5", borderRadius: "8px", minWidth: "100px" }}>
-                    <div style={{ fontSize: "24px", fontWeight: "bold", color: "#7b1fa2" }}>{comments.length}</div>
+                    <div style={{ fontSize: "24px", fontWeight: "bold", color: "#7b1fa2" }}>{counts.comments}</div>
                     <div style={{ fontSize: "14px", color: "#666" }}>Comments</div>
                 </div>
                 <div style={{ textAlign: "center", padding: "15px", backgroundColor: "#fff3e0", borderRadius: "8px", minWidth: "100px" }}>
-                    <div style={{ fontSize: "24px", fontWeight: "bold", color: "#f57c00" }}>{bookmarks.length}</div>
+                    <div style={{ fontSize: "24px", fontWeight: "bold", color: "#f57c00" }}>{counts.bookmarks}</div>
                     <div style={{ fontSize: "14px", color: "#666" }}>Bookmarks</div>
                 </div>
             </div>
@@ -770,7 +830,7 @@ function UserProfile() {
                         }
                     }}
                 >
-                    My Problems ({problems.length})
+                    My Problems ({counts.problems})
                 </button>
                 <button
                     onClick={() => setActiveTab("comments")}
@@ -799,7 +859,7 @@ function UserProfile() {
                         }
                     }}
                 >
-                    My Comments ({sortedComments.length})
+                    My Comments ({counts.comments})
                 </button>
                 <button
                     onClick={() => setActiveTab("bookmarks")}
@@ -828,7 +888,7 @@ function UserProfile() {
                         }
                     }}
                 >
-                    My Bookmarks ({bookmarks.length})
+                    My Bookmarks ({counts.bookmarks})
                 </button>
                 <button
                     onClick={() => {
@@ -1040,6 +1100,7 @@ function UserProfile() {
                                 ))}
                             </div>
                         )}
+                        {renderLoadMore("problems")}
                     </div>
                 )}
 
@@ -1074,7 +1135,7 @@ function UserProfile() {
                                         }
                                     }}
                                 >
-                                    All ({sortedComments.length})
+                                    All ({counts.comments})
                                 </button>
                                 <button
                                     onClick={() => setCommentsSubTab("solutions")}
@@ -1102,7 +1163,7 @@ function UserProfile() {
                                         }
                                     }}
                                 >
-                                    Solutions ({sortedComments.filter(comment => comment.is_solution).length})
+                                    Solutions ({counts.solutions})
                                 </button>
                             </div>
                         </div>
@@ -1194,6 +1255,7 @@ function UserProfile() {
                                 </div>
                             )
                         )}
+                        {renderLoadMore("comments")}
                     </div>
                 )}
 
@@ -1362,6 +1424,7 @@ function UserProfile() {
                                 ))}
                             </div>
                         )}
+                        {renderLoadMore("bookmarks")}
                     </div>
                 )}
                 {activeTab === "drafts" && (
@@ -0,0 +1,212 @@
+// Forum chat push channel
+import axios from 'axios';
+
+const apiUrl = () => process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
+
+// Wait this long before each reconnect attempt; once they run out the caller falls back to polling
+const RECONNECT_DELAYS = [1000, 2000, 5000, 10000];
+
+// The server closes with these for a bad token (4401) or a lost membership (4403); reconnecting won't help
+const FINAL_CLOSE_CODES = [4401, 4403];
+
+const MESSAGES_PAGE_SIZE = 100;
+const CHANGES_PAGE_SIZE = 200;
+
+/**
+ * Open the WebSocket for a forum's chat events and keep it open.
+ * Calls onEvent with each event ({ type, forum_id, data }) and onOpen every time the
+ * socket (re)connects, so the caller can catch up on whatever it missed while it was
+ * down. A dropped socket is reconnected a few times, then onFallback is called once so
+ * the caller can go back to polling.
+ * Returns a function that closes the socket.
+ */
+export const openForumSocket = (forumId, { onEvent, onOpen = () => {}, onFallback }) => {
+    const token = localStorage.getItem("token");
+    if (!token || typeof WebSocket === "undefined") {
+        onFallback();
+        return () => {};
+    }
+
+    const socketUrl = `${apiUrl().replace(/^http/, 'ws')}/ws/forums/${forumId}?token=${encodeURIComponent(token)}`;
+    let socket = null;
+    let keepalive = null;
+    let reconnectTimer = null;
+    let attempts = 0;
+    let closedByClient = false;
+
+    const connect = () => {
+        socket = new WebSocket(socketUrl);
+
+        socket.onopen = () => {
+            attempts = 0;
+            onOpen();
+        };
+
+        socket.onmessage = (message) => {
+            if (message.data === "pong") return;
+            try {
+                onEvent(JSON.parse(message.data));
+            } catch (error) {
+                console.error("Error handling forum event:", error);
+            }
+        };
+
+        socket.onclose = (event) => {
+            clearInterval(keepalive);
+            if (closedByClient) return;
+            if (FINAL_CLOSE_CODES.includes(event.code) || attempts >= RECONNECT_DELAYS.length) {
+                onFallback();
+                return;
+            }
+            reconnectTimer = setTimeout(connect, RECONNECT_DELAYS[attempts++]);
+        };
+
+        // Keep idle connections open through proxies
+        keepalive = setInterval(() => {
+            if (socket.readyState === WebSocket.OPEN) {
+                socket.send("ping");
+            }
+        }, 25000);
+    };
+
+    connect();
+
+    return () => {
+        closedByClient = true;
+        clearTimeout(reconnectTimer);
+        clearInterval(keepalive);
+        socket.close();
+    };
+};
+
+const patchMessage = (messages, messageId, patch) =>
+    messages.map(message => message.id === messageId ? { ...message, ...patch(message) } : message);
+
+/**
+ * Append messages (oldest first) that aren't in the list yet.
+ */
+export const mergeMessages = (messages, incoming) => {
+    const known = new Set(messages.map(message => message.id));
+    const added = incoming.filter(message => !known.has(message.id));
+    return added.length ? [...messages, ...added] : messages;
+};
+
+/**
+ * Apply one socket event to a message list (oldest first) and return the new list.
+ */
+export const applyForumEvent = (messages, { type, data }) => {
+    switch (type) {
+        case 'message.created':
+            return mergeMessages(messages, [data]);
+        case 'message.edited':
+            return patchMessage(messages, data.id, () => ({
+                content: data.content,
+                is_edited: true,
+                edited_at: data.edited_at
+            }));
+        case 'message.deleted':
+            return messages.filter(message => message.id !== data.id);
+        case 'message.pinned':
+            // Only one message is pinned at a time
+            return messages.map(message => message.is_pinned !== (message.id === data.id)
+                ? { ...message, is_pinned: message.id === data.id }
+                : message);
+        case 'message.unpinned':
+            return messages.map(message => message.is_pinned ? { ...message, is_pinned: false } : message);
+        case 'reply.created':
+            return patchMessage(messages, data.parent_message_id, message => ({
+                reply_count: (message.reply_count || 0) + 1,
+                latest_reply: {
+                    id: data.id,
+                    content: data.content,
+                    author_id: data.author_id,
+                    author_username: data.author?.username,
+                    created_at: data.created_at
+                }
+            }));
+        case 'reply.deleted':
+            return patchMessage(messages, data.parent_message_id, message => ({
+                reply_count: Math.max((message.reply_count || 0) - 1, 0)
+            }));
+        default:
+            return messages;
+    }
+};
+
+/**
+ * Apply entries from the messages/changes feed (oldest first) to a message list.
+ * Entries carry current values, so applying one twice is harmless.
+ */
+export const applyMessageChanges = (messages, changes) => changes.reduce((list, change) => {
+    switch (change.change_type) {
+        case 'edited':
+            return applyForumEvent(list, { type: 'message.edited', data: { id: change.message_id, content: change.content, edited_at: change.edited_at } });
+        case 'deleted':
+            return applyForumEvent(list, { type: 'message.deleted', data: { id: change.message_id } });
+        case 'pinned':
+            return applyForumEvent(list, { type: 'message.pinned', data: { id: change.message_id } });
+        case 'unpinned':
+            return patchMessage(list, change.message_id, () => ({ is_pinned: false }));
+        case 'replied':
+            return patchMessage(list, change.message_id, () => ({ reply_count: change.reply_count }));
+        default:
+            return list;
+    }
+}, messages);
+
+/**
+ * Where a full load of a forum's messages (oldest first) left off, for fetchForumUpdates.
+ */
+export const forumCursor = (messages, response) => ({
+    lastMessageId: messages.reduce((latest, message) => Math.max(latest, message.id), 0),
+    lastChangeId: Number(response.headers['x-last-change-id']) || 0,
+    etag: response.headers.etag
+});
+
+/**
+ * Fetch what changed in a forum's chat since the cursor: messages newer than
+ * lastMessageId (oldest first) and the change feed after lastChangeId. Advances the
+ * cursor and returns { messages, changes }, or null if nothing changed at all.
+ */
+export const fetchForumUpdates = async (forumId, cursor) => {
+    const headers = { Authorization: `Bearer ${localStorage.getItem("token")}` };
+    const messagesUrl = `${apiUrl()}/auth/forums/${forumId}/messages`;
+
+    // The room's ETag covers new messages and changes alike, so an idle room costs one 304
+    let response = await axios.get(messagesUrl, {
+        headers: cursor.etag ? { ...headers, 'If-None-Match': cursor.etag } : headers,
+        params: { after_id: cursor.lastMessageId, limit: MESSAGES_PAGE_SIZE },
+        validateStatus: status => (status >= 200 && status < 300) || status === 304
+    });
+    if (response.status === 304) return null;
+    cursor.etag = response.headers.etag;
+
+    const messages = [];
+    for (;;) {
+        const page = response.data.reverse();
+        messages.push(...page);
+        if (page.length < MESSAGES_PAGE_SIZE) break;
+        cursor.lastMessageId = page[page.length - 1].id;
+        response = await axios.get(messagesUrl, {
+            headers,
+            params: { after_id: cursor.lastMessageId, limit: MESSAGES_PAGE_SIZE }
+        });
+    }
+    if (messages.length) {
+        cursor.lastMessageId = Math.max(cursor.lastMessageId, messages[messages.length - 1].id);
+    }
+
+    const changes = [];
+    let hasMore = true;
+    while (hasMore) {
+        const { data } = await axios.get(`${messagesUrl}/changes`, {
+            headers,
+            params: { after: cursor.lastChangeId, limit: CHANGES_PAGE_SIZE }
+        });
+        changes.push(...data.changes);
+        cursor.lastChangeId = data.last_change_id;
+        hasMore = data.has_more;
+    }
+
+    return { messages, changes };
+};